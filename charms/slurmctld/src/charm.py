@@ -16,6 +16,7 @@
 
 """Charmed operator for `slurmctld`, Slurm's controller service."""
 
+import json
 import logging
 import secrets
 
@@ -82,9 +83,18 @@ from integrations import SlurmctldPeer, SlurmctldPeerConnectedEvent
 from interface_influxdb import InfluxDB, InfluxDBAvailableEvent, InfluxDBUnavailableEvent
 from psutil import net_if_addrs
 from pydantic import ValidationError
-from slurm_ops import SecretManager, SlurmctldManager, SlurmOpsError, scontrol
+from slurm_ops import (
+    ReconfigureAction,
+    SecretManager,
+    SlurmctldManager,
+    SlurmOpsError,
+    classify_changes,
+    scontrol,
+)
 from slurmutils import (
     AcctGatherConfig,
+    GresList,
+    GresMapping,
     ModelError,
     NodeSet,
     SlurmConfig,
@@ -116,6 +126,13 @@ class SlurmctldCharm(ops.CharmBase):
 
         # Required to track if this unit is departing during relation broken events
         self._stored.set_default(unit_departing=False)
+        # Required to determine the cheapest action that will apply new configuration changes.
+        # Stored as a JSON string as `StoredState` does not support nested mappings well.
+        self._stored.set_default(applied_config="")
+
+        # Reconfigure requests are coalesced and applied once when the framework commits.
+        self._reconfigure_requested = False
+        self._restart_requested = False
 
         self.slurmctld = SlurmctldManager(snap=False)
         try:
@@ -135,6 +152,7 @@ class SlurmctldCharm(ops.CharmBase):
             )
             return
 
+        framework.observe(framework.on.pre_commit, self._on_pre_commit)
         framework.observe(self.on.install, self._on_install)
         framework.observe(self.on.leader_elected, self._on_leader_elected)
         framework.observe(self.on.start, self._on_start)
@@ -207,6 +225,16 @@ class SlurmctldCharm(ops.CharmBase):
             recurse_rules_dirs=True,
         )
 
+    def _on_pre_commit(self, event: ops.PreCommitEvent) -> None:
+        """Apply reconfigure requests made by event handlers during this dispatch."""
+        if self._reconfigure_requested:
+            self._commit_reconfigure(event)
+
+    @refresh
+    def _commit_reconfigure(self, _: ops.PreCommitEvent) -> None:
+        """Reconfigure `slurmctld` and refresh the unit's status."""
+        self._flush_reconfigure()
+
     @refresh
     def _on_install(self, event: ops.InstallEvent) -> None:
         """Install `slurmctld` after charm is deployed on the unit."""
@@ -333,6 +361,9 @@ class SlurmctldCharm(ops.CharmBase):
                 ops.BlockedStatus("Failed to start `slurmctld`. See `juju debug-log` for details")
             )
 
+        # A fresh start of `slurmctld` applies the current configuration in its entirety.
+        self._stored.applied_config = json.dumps(self.slurmctld.get_config_state())
+
     @refresh
     def _on_config_changed(self, _: ops.ConfigChangedEvent) -> None:
         """Update the `slurmctld` application's configuration."""
@@ -348,8 +379,9 @@ class SlurmctldCharm(ops.CharmBase):
 
         # Only the leader handles configuration changes for the slurmctld service. Non-leader units
         # read configuration managed by the leader.
+        changed = False
         if self.unit.is_leader():
-            self.slurmctld.overrides.dump(self.configmgr.slurm_conf_parameters)
+            changed |= self.slurmctld.overrides.dump(self.configmgr.slurm_conf_parameters)
 
             current_default_partition = self.slurmctld.get_default_partition()
             if self.configmgr.default_partition == current_default_partition:
@@ -369,6 +401,7 @@ class SlurmctldCharm(ops.CharmBase):
                     self.configmgr.default_partition,
                     current_default_partition,
                 )
+                changed = True
                 logger.info("default partition configuration updated successfully")
 
             # Slurm's `proctrack/cgroup` process tracking plugin cannot be used if
@@ -381,9 +414,17 @@ class SlurmctldCharm(ops.CharmBase):
                 )
             else:
                 logger.info("updating `%s` configuration", self.slurmctld.cgroup.name)
-                self.slurmctld.cgroup.dump(self.configmgr.cgroup_parameters)
+                changed |= self.slurmctld.cgroup.dump(self.configmgr.cgroup_parameters)
                 logger.info("`%s` configuration updated successfully", self.slurmctld.cgroup.name)
 
+            # `slurm.conf` is not generated until `slurmctld` is installed.
+            if self.slurmctld.config.exists():
+                self._update_topology()
+
+            if not changed:
+                logger.debug("slurmctld configuration has not changed. skipping reconfigure")
+                return
+
         self._reconfigure()
 
     @refresh
@@ -443,15 +484,16 @@ class SlurmctldCharm(ops.CharmBase):
         if name == self.configmgr.default_partition:
             data.partition.default = True
 
-        with self.slurmctld.config.includes[include].edit() as config:
+        with self.slurmctld.config.transaction() as transaction:
+            config = transaction.edit(include)
             config.nodesets[name] = NodeSet(nodeset=name, feature=name)
             config.partitions[name] = data.partition
 
-        try:
-            with self.slurmctld.config.edit() as config:
+            config = transaction.edit()
+            try:
                 config.include = [include] + config.include
-        except ModelError:
-            pass
+            except ModelError:
+                pass
 
         new_endpoints = [f"{c}:{SLURMCTLD_PORT}" for c in self._get_controllers()]
         self.slurmd.set_controller_data(
@@ -462,7 +504,11 @@ class SlurmctldCharm(ops.CharmBase):
             integration_id=event.relation.id,
         )
 
-        self._reconfigure()
+        self._update_gres()
+        self._update_topology()
+
+        if transaction.changed:
+            self._reconfigure()
 
     @refresh
     @block_unless(slurmctld_installed)
@@ -478,6 +524,8 @@ class SlurmctldCharm(ops.CharmBase):
             pass
 
         self.slurmctld.config.includes[include].delete()
+        self._update_gres(exclude=event.relation.id)
+        self._update_topology(exclude=event.relation.id)
         self._reconfigure()
 
     @refresh
@@ -506,8 +554,10 @@ class SlurmctldCharm(ops.CharmBase):
             config.accounting_storage_port = 6819
             config.accounting_storage_type = "accounting_storage/slurmdbd"
 
-        # Restore `acct_gather.conf` configuration if a snapshot exists.
-        self.slurmctld.acct_gather.restore()
+        # Restore `acct_gather.conf` configuration if it was removed when `slurmdbd` was
+        # disconnected and a snapshot exists.
+        if not self.slurmctld.acct_gather.exists():
+            self.slurmctld.acct_gather.restore()
         try:
             with self.slurmctld.config.edit() as config:
                 config.include = [self.slurmctld.profiling.name] + config.include
@@ -680,7 +730,8 @@ class SlurmctldCharm(ops.CharmBase):
         # slurmrestd databag. This prevents a SecretNotFoundError.
         # TODO: This will not be necessary once merging of values into the databag is implemented
         # and the secret ID no longer needs set in _reconfigure.
-        self._reconfigure()
+        self._reconfigure(restart=True)
+        self._flush_reconfigure()
 
         event.remove_revision()
 
@@ -844,40 +895,148 @@ class SlurmctldCharm(ops.CharmBase):
         logger.debug("current controllers: %s", controllers)
         return controllers
 
-    def _reconfigure(self) -> None:
+    def _update_gres(self, *, exclude: int | None = None) -> None:
+        """Update the node-specific `gres.conf` entries published by `slurmd` units.
+
+        Args:
+            exclude: (Optional) ID of a `slurmd` integration to drop the entries of.
+
+        Notes:
+            - Entries scoped to a node with `NodeName=` are regenerated from the node data of
+              every `slurmd` unit so that entries for removed units are dropped. Global entries
+              and other `gres.conf` options, such as `AutoDetect`, are preserved.
+            - `slurmctld` is only reconfigured if the regenerated `gres.conf` file has changed.
+        """
+        entries = [
+            entry
+            for integration in self.slurmd.integrations
+            if integration.id != exclude
+            for data in self.slurmd.get_node_data(integration.id)
+            for entry in data.gres
+        ]
+
+        with self.slurmctld.gres.transaction() as transaction:
+            config = transaction.edit()
+            gres = {
+                name: [entry for entry in current if entry.nodename is None]
+                for name, current in config.gres.items()
+            }
+            for entry in sorted(entries, key=lambda e: e.nodename):
+                gres.setdefault(entry.name, []).append(entry)
+
+            config.gres = GresMapping(
+                {name: GresList(current) for name, current in gres.items() if current}
+            )
+
+        if transaction.changed:
+            self._reconfigure()
+
+    def _update_topology(self, *, exclude: int | None = None) -> None:
+        """Update the network topology of the cluster from the node data of `slurmd` units.
+
+        Args:
+            exclude: (Optional) ID of a `slurmd` integration to drop the compute nodes of.
+
+        Notes:
+            - `topology.conf` is only generated if at least one compute node is connected to an
+              InfiniBand fabric. Otherwise, `topology.conf` is removed and the topology plugin
+              is unset so that Slurm falls back to its default flat topology.
+            - Compute nodes that are not connected to an InfiniBand fabric are grouped under an
+              `unknown` leaf switch so that they can still be allocated.
+            - Changing the topology plugin requires that `slurmctld` is restarted. This is
+              detected when the change is applied. See `_reconfigure`.
+        """
+        nodes = [
+            data
+            for integration in self.slurmd.integrations
+            if integration.id != exclude
+            for data in self.slurmd.get_node_data(integration.id)
+            if data.node_name
+        ]
+
+        switches: dict[str | None, list[str]] = {}
+        plugin = self.configmgr.network_topology
+        if plugin != "none" and any(data.switch for data in nodes):
+            for data in nodes:
+                switches.setdefault(data.switch, []).append(data.node_name)
+
+        changed = self.slurmctld.set_topology(switches, block=plugin == "block")
+        with self.slurmctld.config.transaction() as transaction:
+            config = transaction.edit()
+            if switches:
+                config.topology_plugin = [f"topology/{plugin}"]
+            else:
+                del config.topology_plugin
+
+        if changed or transaction.changed:
+            self._reconfigure()
+
+    def _reconfigure(self, *, restart: bool = False) -> None:
+        """Request that `slurmctld` is reconfigured when the framework commits.
+
+        Args:
+            restart: If `True`, restart `slurmctld` even if no configuration changes require it.
+
+        Notes:
+            - Requests are coalesced so that `slurmctld` is reconfigured at most once per
+              dispatch, including when multiple deferred events are re-emitted before the
+              current event. Use `_flush_reconfigure` to apply a request immediately.
+        """
+        self._reconfigure_requested = True
+        self._restart_requested |= restart
+
+    def _flush_reconfigure(self) -> None:
         """Reconfigure the `slurmctld` and update integration databags.
 
         Notes:
+            - The current configuration is compared against the configuration last applied
+              by this unit to determine the cheapest action that will apply the changes:
+              nothing, `scontrol reconfigure`, or a restart of `slurmctld`.
             - In a `slurmctld` high availability setup, all `slurmctld` services across all
-              `slurmctld` units in the cluster are restarted by this function. This ensures all
-              `slurm.conf` changes are picked up, including those not re-read by an
-              `scontrol reconfigure` command. If a restart is not done, removal of a controller
-              will result in a malfunctioning cluster as `SlurmctldHost` lines are not
-              re-read and an availability event may cause a failover attempt to
-              a nonexistent backup.
+              `slurmctld` units in the cluster are restarted, one at a time, if a restart is
+              required. This ensures that changes not re-read by an `scontrol reconfigure` command
+              are picked up. If a restart is not done, removal of a controller will result in a
+              malfunctioning cluster as `SlurmctldHost` lines are not re-read and an availability
+              event may cause a failover attempt to a nonexistent backup.
 
         Raises:
             StopCharm: Raised if an error occurs when reconfiguring the `slurmctld` service.
         """
+        if not self._reconfigure_requested:
+            return
+
+        restart = self._restart_requested
+        self._reconfigure_requested = False
+        self._restart_requested = False
+
         if not slurmctld_ready(self):
             return
 
-        # This must occur before `scontrol reconfigure` in case the primary `slurmctld` has been
-        # removed and this unit is a backup being promoted to the new primary.
-        #
-        # If the `scontrol reconfigure` is performed first in this situation, it fails with:
-        #   '['scontrol', 'reconfigure']' failed with exit code 1. reason: slurm_reconfigure error:
-        #   Slurm backup controller in standby mode
-        try:
-            self.slurmctld.reconfigure(restart=True)
-        except SlurmOpsError as e:
-            logger.error(e.message)
-            raise StopCharm(
-                ops.BlockedStatus(
-                    "Failed to restart `slurmctld.service`. See `juju debug-log` for details"
+        state = self.slurmctld.get_config_state()
+        previous = json.loads(self._stored.applied_config) if self._stored.applied_config else {}
+        action = ReconfigureAction.RESTART if restart else classify_changes(previous, state)
+        if action == ReconfigureAction.NONE:
+            logger.debug("slurm configuration has not changed. skipping reconfigure")
+            return
+
+        if action == ReconfigureAction.RESTART:
+            logger.info("configuration changes require restart. restarting `slurmctld`")
+            # This must occur before `scontrol reconfigure` in case the primary `slurmctld` has
+            # been removed and this unit is a backup being promoted to the new primary.
+            #
+            # If the `scontrol reconfigure` is performed first in this situation, it fails with:
+            #   '['scontrol', 'reconfigure']' failed with exit code 1. reason: slurm_reconfigure
+            #   error: Slurm backup controller in standby mode
+            try:
+                self.slurmctld.reconfigure(restart=True)
+            except SlurmOpsError as e:
+                logger.error(e.message)
+                raise StopCharm(
+                    ops.BlockedStatus(
+                        "Failed to restart `slurmctld.service`. See `juju debug-log` for details"
+                    )
                 )
-            )
-        self.slurmctld_peer.signal_slurmctld_restart()
+            self.slurmctld_peer.signal_slurmctld_restart()
 
         try:
             self.slurmctld.reconfigure()
@@ -889,6 +1048,8 @@ class SlurmctldCharm(ops.CharmBase):
                 )
             )
 
+        self._stored.applied_config = json.dumps(state)
+
         if self.slurmrestd.is_joined():
             # Workaround for: https://github.com/canonical/slurm-charms/issues/203
             # TODO: Remove setting of key ID once merging of databag info is implemented. Only the
@@ -964,7 +1125,9 @@ class SlurmctldCharm(ops.CharmBase):
         content = manager.generate()
         try:
             manager.apply(content)
-            self._reconfigure()
+            # The new key must be loaded by `slurmctld` before it is published to other units.
+            self._reconfigure(restart=True)
+            self._flush_reconfigure()
         except (SlurmOpsError, ValueError) as e:
             logger.error("failed to update %s key. reason:\n%s", name, e)
             event.fail(f"Failed to update {name} key. See `juju debug-log` for details.")
@@ -14,6 +14,8 @@
 
 """Manage the configuration of the `slurmctld` charmed operator."""
 
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, field_validator
 from slurmutils import CGroupConfig, ModelError, SlurmConfig
 
@@ -30,6 +32,7 @@ class ConfigManager(BaseModel):
     cluster_name: str
     default_partition: str
     email_from_name: str
+    network_topology: Literal["tree", "block", "none"]
     slurm_conf_parameters: SlurmConfig
 
     @field_validator("slurm_conf_parameters", mode="before")
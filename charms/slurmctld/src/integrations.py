@@ -22,8 +22,9 @@ __all__ = [
 
 import json
 import logging
+import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Any
 
 import ops
@@ -36,6 +37,10 @@ if TYPE_CHECKING:
 
 _logger = logging.getLogger(__name__)
 
+# Time in seconds to wait for a restarted `slurmctld` service to respond to `scontrol ping`
+# before deferring the rolling restart to a later hook.
+_RESTART_PING_TIMEOUT = 10
+
 
 @dataclass(frozen=True)
 class ControllerPeerAppData:
@@ -43,7 +48,13 @@ class ControllerPeerAppData:
 
     Attributes:
         cluster_name: The unique name of this cluster.
-        restart_signal: A nonce to indicate all controllers should restart `slurmctld.service`.
+        restart_signal: A nonce identifying the current rolling restart of `slurmctld.service`.
+        restart_order: Units to restart, one at a time, during the current rolling restart.
+        restart_unit: Unit permitted to restart. Empty if no rolling restart is in progress.
+        restart_started: Time, in seconds since the epoch, the current rolling restart started.
+        restart_progress: Seconds elapsed since the rolling restart started when each
+            restarted unit reported that its `slurmctld` service is healthy.
+        restart_duration: Total time in seconds taken by the last completed rolling restart.
 
     Warnings:
         - The cluster name should only be set once during the entire lifetime of
@@ -54,6 +65,11 @@ class ControllerPeerAppData:
 
     cluster_name: str = ""
     restart_signal: str = ""
+    restart_order: list[str] = field(default_factory=list)
+    restart_unit: str = ""
+    restart_started: float = 0.0
+    restart_progress: dict[str, float] = field(default_factory=dict)
+    restart_duration: float = 0.0
 
 
 @dataclass(frozen=True)
@@ -62,9 +78,13 @@ class ControllerPeerUnitData:
 
     Attributes:
         hostname: The hostname for this unit.
+        restarting: The last rolling restart signal this unit restarted its service for.
+        restarted: The last rolling restart signal this unit completed successfully.
     """
 
     hostname: str = ""
+    restarting: str = ""
+    restarted: str = ""
 
 
 class SlurmctldPeerConnectedEvent(ops.RelationEvent):
@@ -107,16 +127,11 @@ class SlurmctldPeer(Interface):
     """Integration interface implementation for `slurmctld` peers."""
 
     on = _SlurmctldPeerEvents()  # type: ignore
-    _stored = ops.StoredState()
     charm: "SlurmctldCharm"
 
     def __init__(self, charm: "SlurmctldCharm", integration_name: str) -> None:
         super().__init__(charm, integration_name)
 
-        self._stored.set_default(
-            last_restart_signal=str(),  # nonce to indicate slurmctld service restart required
-        )
-
         self.charm.framework.observe(
             self.charm.on[self._integration_name].relation_created,
             self._on_relation_created,
@@ -147,17 +162,18 @@ class SlurmctldPeer(Interface):
             _logger.debug("no application data set in peer relation. ignoring change event")
             return
 
-        # A slurmctld.service restart signal has been sent by the leader.
-        if data.restart_signal != self._stored.last_restart_signal:
-            _logger.debug("restart signal found. restarting slurmctld")
-            self._stored.last_restart_signal = data.restart_signal
-
-            # Leader already restarted its service when reconfiguring
-            if not self.unit.is_leader():
-                # Emits if a start event is not already in the defer queue
-                self.charm.on.start.emit()
+        # It is this unit's turn to restart `slurmctld.service` in a rolling restart.
+        # Leader already restarted its service when reconfiguring.
+        if not self.unit.is_leader() and data.restart_unit == self.unit.name:
+            self._restart(event, data)
             return
 
+        # A backup controller may have completed its turn in a rolling restart.
+        # Units may also have joined while the rolling restart is in progress,
+        # so continue on to check for joined units.
+        if self.unit.is_leader() and data.restart_unit:
+            self._advance_restart(data)
+
         # Unit(s) have joined the relation.
         # Fire once the leader unit has observed relation-joined for all units
         if self.unit.is_leader() and all_units_observed(self.charm).ok:
@@ -174,8 +190,99 @@ class SlurmctldPeer(Interface):
                 )
                 return
 
+            # Do not stall a rolling restart waiting on a unit that has departed.
+            data = self.get_controller_peer_app_data()
+            if data and data.restart_unit == event.departing_unit.name:
+                self._advance_restart(data)
+
             self.on.slurmctld_peer_departed.emit(event.relation)
 
+    def _restart(self, event: ops.RelationChangedEvent, data: ControllerPeerAppData) -> None:
+        """Restart this unit's `slurmctld` service as part of a rolling restart."""
+        current = self.get_controller_peer_unit_data(self.unit)
+        if current and current.restarted == data.restart_signal:
+            _logger.debug("rolling restart '%s' already completed. ignoring", data.restart_signal)
+            return
+
+        # Only restart once per rolling restart. If the restarted service was not yet
+        # healthy, the deferred event only checks the health of the service again.
+        if not current or current.restarting != data.restart_signal:
+            _logger.info(
+                "restarting slurmctld as part of rolling restart '%s'", data.restart_signal
+            )
+            # Emits if a start event is not already in the defer queue
+            self.charm.on.start.emit()
+            self.update_controller_peer_unit_data(restarting=data.restart_signal)
+
+        # Only report that the restart is complete once this controller is healthy so that the
+        # next controller does not restart while this controller is still starting.
+        if not self.charm.slurmctld.wait_for_ping(timeout=_RESTART_PING_TIMEOUT):
+            _logger.warning(
+                "slurmctld did not respond to `scontrol ping` after restarting. "
+                "deferring rolling restart '%s'",
+                data.restart_signal,
+            )
+            event.defer()
+            return
+
+        _logger.info("slurmctld is healthy. rolling restart '%s' complete", data.restart_signal)
+        self.update_controller_peer_unit_data(restarted=data.restart_signal)
+
+    @leader
+    def _advance_restart(self, data: ControllerPeerAppData) -> bool:
+        """Allow the next unit to restart once the current unit has completed its restart.
+
+        Returns:
+            `True` if the rolling restart progressed, otherwise `False`.
+        """
+        integration = self.get_integration()
+        if not integration:
+            return False
+
+        units = {unit.name: unit for unit in integration.units}
+        progress = dict(data.restart_progress)
+        if data.restart_unit in units:
+            current = self.get_controller_peer_unit_data(units[data.restart_unit])
+            if not current or current.restarted != data.restart_signal:
+                _logger.debug("waiting on unit '%s' to restart slurmctld", data.restart_unit)
+                return False
+
+            progress[data.restart_unit] = round(time.time() - data.restart_started, 1)
+            _logger.info(
+                "unit '%s' restarted slurmctld %s seconds after rolling restart '%s' started",
+                data.restart_unit,
+                progress[data.restart_unit],
+                data.restart_signal,
+            )
+        else:
+            _logger.warning(
+                "unit '%s' is no longer a backup controller. skipping its restart",
+                data.restart_unit,
+            )
+
+        remaining = [
+            unit
+            for unit in data.restart_order
+            if unit in units and unit not in progress and unit != data.restart_unit
+        ]
+        if remaining:
+            self.update_controller_peer_app_data(
+                restart_unit=remaining[0], restart_progress=progress
+            )
+            return True
+
+        duration = round(time.time() - data.restart_started, 1)
+        _logger.info(
+            "rolling restart '%s' of %s backup controller(s) completed in %s seconds",
+            data.restart_signal,
+            len(progress),
+            duration,
+        )
+        self.update_controller_peer_app_data(
+            restart_unit="", restart_progress=progress, restart_duration=duration
+        )
+        return True
+
     def get_controller_peer_app_data(self) -> ControllerPeerAppData | None:
         """Get controller peer from the `slurmctld-peer` application databag."""
         return self._get_peer_data(self.app, ControllerPeerAppData)
@@ -220,14 +327,35 @@ class SlurmctldPeer(Interface):
 
     @leader
     def signal_slurmctld_restart(self) -> None:
-        """Add a message to the peer relation to indicate all peers should restart slurmctld.service.
+        """Start a rolling restart of `slurmctld.service` across all peers.
 
         This is a workaround for `scontrol reconfigure` not instructing all slurmctld daemons to
         re-read SlurmctldHost lines from slurm.conf.
+
+        Notes:
+            - Backup controllers restart one at a time. Each controller must respond to
+              `scontrol ping` before the next controller is permitted to restart. This prevents
+              all controllers being unavailable at once.
+            - A new rolling restart supersedes any rolling restart still in progress.
         """
+        integration = self.get_integration()
+        order = (
+            sorted((unit.name for unit in integration.units), key=lambda n: int(n.split("/")[1]))
+            if integration
+            else []
+        )
+
         # The value written to the relation must be unique on each call.
         signal = str(uuid.uuid4())
-        self.update_controller_peer_app_data(restart_signal=signal)
+        _logger.info("starting rolling restart '%s' of backup controllers %s", signal, order)
+        self.update_controller_peer_app_data(
+            restart_signal=signal,
+            restart_order=order,
+            restart_unit=order[0] if order else "",
+            restart_started=time.time(),
+            restart_progress={},
+            restart_duration=0.0,
+        )
 
     @leader
     def update_controller_peer_app_data(
@@ -235,26 +363,40 @@ class SlurmctldPeer(Interface):
         *,
         cluster_name: str | None = None,
         restart_signal: str | None = None,
+        restart_order: list[str] | None = None,
+        restart_unit: str | None = None,
+        restart_started: float | None = None,
+        restart_progress: dict[str, float] | None = None,
+        restart_duration: float | None = None,
     ) -> None:
         """Update the controller peer data in the `slurmctld-peer` application databag.
 
-        Args:
-            cluster_name: The unique name of this cluster.
-            restart_signal: A nonce to indicate all controllers should restart `slurmctld.service`.
+        Only updates fields that are not None. See `ControllerPeerAppData` for a description
+        of each field.
 
         Warnings:
             - Only the `slurmctld` application leader can update controller peer app data.
         """
         current = self.get_controller_peer_app_data() or ControllerPeerAppData()
-        data = ControllerPeerAppData(
-            cluster_name=cluster_name if cluster_name is not None else current.cluster_name,
-            restart_signal=(
-                restart_signal if restart_signal is not None else current.restart_signal
-            ),
-        )
+        changes = {
+            "cluster_name": cluster_name,
+            "restart_signal": restart_signal,
+            "restart_order": restart_order,
+            "restart_unit": restart_unit,
+            "restart_started": restart_started,
+            "restart_progress": restart_progress,
+            "restart_duration": restart_duration,
+        }
+        data = replace(current, **{k: v for k, v in changes.items() if v is not None})
         self._set_peer_data(self.app, data)
 
-    def update_controller_peer_unit_data(self, *, hostname: str | None = None) -> None:
+    def update_controller_peer_unit_data(
+        self,
+        *,
+        hostname: str | None = None,
+        restarting: str | None = None,
+        restarted: str | None = None,
+    ) -> None:
         """Update the controller peer data in this unit's databag.
 
         Only updates fields that are not None.
@@ -262,6 +404,8 @@ class SlurmctldPeer(Interface):
         current = self.get_controller_peer_unit_data(self.unit) or ControllerPeerUnitData()
         data = ControllerPeerUnitData(
             hostname=hostname if hostname is not None else current.hostname,
+            restarting=restarting if restarting is not None else current.restarting,
+            restarted=restarted if restarted is not None else current.restarted,
         )
         self._set_peer_data(self.unit, data)
 
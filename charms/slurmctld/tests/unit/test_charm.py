@@ -15,6 +15,7 @@
 
 """Unit tests for the `slurmctld` charmed operator."""
 
+import json
 import textwrap
 from pathlib import Path
 
@@ -26,11 +27,12 @@ from constants import (
     MAIL_INTEGRATION_NAME,
     OCI_RUNTIME_INTEGRATION_NAME,
     PEER_INTEGRATION_NAME,
+    SLURMD_INTEGRATION_NAME,
 )
 from ops import testing
 from pytest_mock import MockerFixture
 from slurm_ops import SlurmOpsError
-from slurmutils import OCIConfig
+from slurmutils import Gres, GresConfig, OCIConfig, SlurmConfig
 
 EXAMPLE_OCI_CONFIG = OCIConfig(
     ignorefileconfigjson=False,
@@ -180,6 +182,113 @@ class TestSlurmctldCharm:
                 for event in mock_charm.emitted_events
             )
 
+    def test_update_gres(self, mock_charm, mocker: MockerFixture, leader) -> None:
+        """Test that node-specific `gres.conf` entries are regenerated from `slurmd` units."""
+        gres = [
+            Gres(name="gpu", type="a100", file=f"/dev/nvidia{i}", cores=[f"{i * 8}-{i * 8 + 7}"])
+            for i in range(2)
+        ]
+        integration = testing.Relation(
+            endpoint=SLURMD_INTEGRATION_NAME,
+            interface="slurmd",
+            remote_app_name="slurmd",
+            remote_units_data={
+                0: {"gres": json.dumps([{**gres[0].dict(), "nodename": "compute-0"}])},
+                1: {"gres": json.dumps([{**gres[1].dict(), "nodename": "compute-1"}])},
+            },
+        )
+
+        with mock_charm(
+            mock_charm.on.update_status(),
+            testing.State(leader=leader, relations={integration}),
+        ) as manager:
+            slurmctld = manager.charm.slurmctld
+            slurmctld.gres.dump(
+                GresConfig.from_str(
+                    textwrap.dedent(
+                        """
+                        autodetect=nvidia
+                        name=gpu type=t4 file=/dev/nvidia0
+                        name=gpu type=a100 file=/dev/nvidia0 nodename=compute-2
+                        """
+                    ).strip()
+                )
+            )
+
+            manager.charm._update_gres()
+            config = slurmctld.gres.load()
+
+            # Entries for `compute-2` are dropped as no `slurmd` unit publishes them anymore.
+            assert config.auto_detect == "nvidia"
+            assert [(entry.type, entry.nodename, entry.cores) for entry in config.gres["gpu"]] == [
+                ("t4", None, None),
+                ("a100", "compute-0", ["0-7"]),
+                ("a100", "compute-1", ["8-15"]),
+            ]
+
+            manager.charm._update_gres(exclude=integration.id)
+            assert [entry.type for entry in slurmctld.gres.load().gres["gpu"]] == ["t4"]
+
+    @pytest.mark.parametrize(
+        "network_topology,expected",
+        (
+            pytest.param(
+                "tree",
+                (
+                    "SwitchName=ib-1 Nodes=compute-0,compute-1\n"
+                    + "SwitchName=unknown Nodes=compute-2\n"
+                    + "SwitchName=root Switches=ib-1,unknown\n"
+                ),
+                id="tree",
+            ),
+            pytest.param(
+                "block",
+                "BlockName=ib-1 Nodes=compute-0,compute-1\nBlockName=unknown Nodes=compute-2\n",
+                id="block",
+            ),
+            pytest.param("none", None, id="none"),
+        ),
+    )
+    def test_update_topology(
+        self, mock_charm, mocker: MockerFixture, leader, network_topology, expected
+    ) -> None:
+        """Test that `topology.conf` is generated from the leaf switches of `slurmd` units."""
+        integration = testing.Relation(
+            endpoint=SLURMD_INTEGRATION_NAME,
+            interface="slurmd",
+            remote_app_name="slurmd",
+            remote_units_data={
+                0: {"node_name": json.dumps("compute-0"), "switch": json.dumps("ib-1")},
+                1: {"node_name": json.dumps("compute-1"), "switch": json.dumps("ib-1")},
+                2: {"node_name": json.dumps("compute-2")},
+            },
+        )
+
+        with mock_charm(
+            mock_charm.on.update_status(),
+            testing.State(
+                leader=leader,
+                relations={integration},
+                config={"network-topology": network_topology},
+            ),
+        ) as manager:
+            slurmctld = manager.charm.slurmctld
+            slurmctld.config.dump(SlurmConfig(clustername="charmed-hpc"))
+
+            manager.charm._update_topology()
+
+            if expected is None:
+                assert not slurmctld.topology.exists()
+                assert slurmctld.config.load().topology_plugin is None
+            else:
+                assert slurmctld.topology.read_text() == expected
+                assert slurmctld.config.load().topology_plugin == [f"topology/{network_topology}"]
+
+            # The network topology is removed once no compute node is connected to a fabric.
+            manager.charm._update_topology(exclude=integration.id)
+            assert not slurmctld.topology.exists()
+            assert slurmctld.config.load().topology_plugin is None
+
     @pytest.mark.parametrize(
         "params,expected",
         (
@@ -273,6 +382,7 @@ class TestSlurmctldCharm:
             mocker.patch.object(manager.charm.slurmctld.service, "is_active", return_value=True)
             mocker.patch.object(manager.charm.slurmdbd, "is_ready", return_value=True)
             mocker.patch.object(manager.charm.slurmctld.key, "get", return_value=EXAMPLE_KEY_ENTRY)
+            mocker.patch.object(manager.charm.slurmctld.backend, "reconfigure")
             state = manager.run()
 
         mock_remove_package.assert_called_once_with("slurm-mail")
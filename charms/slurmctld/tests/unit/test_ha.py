@@ -15,12 +15,13 @@
 
 """Unit tests for the `slurmctld` charmed operator."""
 
+import json
 import textwrap
 from pathlib import Path
 from unittest.mock import call
 
 import pytest
-from constants import HA_MOUNT_INTEGRATION_NAME, HA_MOUNT_LOCATION
+from constants import HA_MOUNT_INTEGRATION_NAME, HA_MOUNT_LOCATION, PEER_INTEGRATION_NAME
 from ops import testing
 from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
@@ -134,3 +135,69 @@ class TestSlurmctldHA:
         assert (ha_etc_slurm / "slurm.conf").read_text() == slurm_conf_target
         for call_args, _ in mock_subprocess_run.call_args_list:
             assert call_args[0][0] != "/usr/bin/rsync", "rsync was called: migration was attempted"
+
+    def test_rolling_restart(self, mock_charm, leader) -> None:
+        """Test that backup controllers are restarted one at a time."""
+        peer_integration = testing.PeerRelation(
+            endpoint=PEER_INTEGRATION_NAME,
+            interface="slurmctld-peer",
+            local_app_data={
+                "cluster_name": '"charmed-hpc"',
+                "restart_signal": '"3e5b2c2a"',
+                "restart_order": '["slurmctld/1", "slurmctld/2"]',
+                "restart_unit": '"slurmctld/1"',
+                "restart_started": "1700000000.0",
+                "restart_progress": "{}",
+            },
+            peers_data={
+                1: {"hostname": "juju-c9c6f-1", "restarted": '"3e5b2c2a"'},
+                2: {"hostname": "juju-c9c6f-2"},
+            },
+        )
+
+        state = mock_charm.run(
+            mock_charm.on.relation_changed(peer_integration, remote_unit=1),
+            testing.State(leader=leader, relations={peer_integration}),
+        )
+
+        data = state.get_relation(peer_integration.id).local_app_data
+        if leader:
+            # `slurmctld/1` has reported that it is healthy. `slurmctld/2` is next to restart.
+            assert json.loads(data["restart_unit"]) == "slurmctld/2"
+            assert "slurmctld/1" in json.loads(data["restart_progress"])
+        else:
+            # Only the leader can advance a rolling restart.
+            assert json.loads(data["restart_unit"]) == "slurmctld/1"
+            assert json.loads(data["restart_progress"]) == {}
+
+    def test_rolling_restart_unhealthy(self, mock_charm, mocker: MockerFixture, leader) -> None:
+        """Test that an unhealthy backup controller defers without restarting again."""
+        if leader:
+            pytest.skip("only backup controllers restart when signalled")
+
+        peer_integration = testing.PeerRelation(
+            endpoint=PEER_INTEGRATION_NAME,
+            interface="slurmctld-peer",
+            local_app_data={
+                "cluster_name": '"charmed-hpc"',
+                "restart_signal": '"3e5b2c2a"',
+                "restart_order": '["slurmctld/0"]',
+                "restart_unit": '"slurmctld/0"',
+            },
+            local_unit_data={"hostname": "juju-c9c6f-0", "restarting": '"3e5b2c2a"'},
+            peers_data={1: {"hostname": "juju-c9c6f-1"}},
+        )
+
+        with mock_charm(
+            mock_charm.on.relation_changed(peer_integration, remote_unit=1),
+            testing.State(leader=leader, relations={peer_integration}),
+        ) as manager:
+            mock_start = mocker.patch.object(manager.charm.on.start, "emit")
+            mocker.patch.object(manager.charm.slurmctld, "wait_for_ping", return_value=False)
+
+            state = manager.run()
+
+        mock_start.assert_not_called()
+        assert len(state.deferred) == 1
+        data = state.get_relation(peer_integration.id).local_unit_data
+        assert "restarted" not in data
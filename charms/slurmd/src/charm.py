@@ -16,7 +16,11 @@
 
 """Charmed operator for `slurmd`, Slurm's compute node service."""
 
+import json
 import logging
+import os
+from dataclasses import asdict
+from typing import Any
 
 import ops
 import rdma
@@ -25,6 +29,7 @@ from charmed_hpc_libs.ops import StopCharm, block_unless, refresh, wait_unless
 from charmed_slurm_slurmd_interface import (
     AUTH_KEY_LABEL,
     ComputeData,
+    NodeData,
     SlurmctldConnectedEvent,
     SlurmctldDisconnectedEvent,
     SlurmctldReadyEvent,
@@ -33,16 +38,26 @@ from charmed_slurm_slurmd_interface import (
 )
 from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
 from config import ConfigManager
-from constants import PROMETHEUS_SCRAPE_INTEGRATION_NAME, SLURMD_INTEGRATION_NAME, SLURMD_PORT
+from constants import (
+    PROMETHEUS_SCRAPE_INTEGRATION_NAME,
+    SLURMD_INTEGRATION_NAME,
+    SLURMD_PORT,
+    SYSTEM_SERVICES,
+)
 from gpu import DCGM_EXPORTER_SCRAPE_CONFIG, GPUOpsError, NvidiaGPUManager
 from pydantic import ValidationError
+from registration import RegistrationScheduler
 from slurm_ops import (
     NODE_EXPORTER_COLLECTORS,
     NODE_EXPORTER_PLUGS,
     NODE_EXPORTER_PORT,
     NODE_EXPORTER_SCRAPE_CONFIG,
+    InstallPlan,
+    PackageMirror,
+    ReconfigureAction,
     SlurmdManager,
     SlurmOpsError,
+    classify_node_changes,
 )
 from slurmutils import ModelError, Node
 from state import check_slurmd, reboot_if_required, slurmd_installed
@@ -55,8 +70,11 @@ refresh.__doc__ = """Refresh status of the `slurmd` unit after an event handler
 class SlurmdCharm(ops.CharmBase):
     """Charmed operator for `slurmd`, Slurm's compute node service."""
 
+    _stored = ops.StoredState()
+
     def __init__(self, framework: ops.Framework) -> None:
         super().__init__(framework)
+        self._stored.set_default(package_mirror="", applied_hardware="")
 
         self.slurmd = SlurmdManager(self.app.name, snap=False)
         self.gpu = NvidiaGPUManager()
@@ -77,11 +95,15 @@ class SlurmdCharm(ops.CharmBase):
             )
             return
 
+        self.slurmd.reservation_policy = self.configmgr.system_reservation
+
         framework.observe(self.on.install, self._on_install)
         framework.observe(self.on.config_changed, self._on_config_changed)
         framework.observe(self.on.update_status, self._on_update_status)
         framework.observe(self.on.secret_changed, self._on_secret_changed)
         framework.observe(self.on.set_node_config_action, self._on_set_node_config_action)
+        framework.observe(self.on.set_mig_config_action, self._on_set_mig_config_action)
+        framework.observe(self.on.prefetch_packages_action, self._on_prefetch_packages_action)
 
         self.slurmctld = SlurmdProvider(self, SLURMD_INTEGRATION_NAME)
         framework.observe(
@@ -122,39 +144,38 @@ class SlurmdCharm(ops.CharmBase):
               restarted after the reboot completes. This preemptive reboot is performed to
               prevent issues such as device drivers or kernel modules being installed for a
               running kernel pending replacement by a kernel version on reboot.
+            - All Debian packages are installed in a single transaction while snaps are
+              installed at the same time. The time taken by each provisioning phase is logged.
+              See `InstallPlan` for the provisioning phases.
+            - Debian packages are installed from the package mirror set by `package-mirror`
+              instead of the upstream package repositories if a mirror is configured.
         """
         reboot_if_required(self, now=True)
 
         try:
-            self.unit.status = ops.MaintenanceStatus("Installing `slurmd`")
-            self.slurmd.install()
-            self.slurmd.service.stop()
-            self.slurmd.service.disable()
-            self.slurmd.conf = self.slurmd.build_node()
-            self.slurmd.dynamic = True
-            self.slurmd.name = self.unit.name.replace("/", "-")
-            self.unit.open_port("tcp", SLURMD_PORT)
-            self.unit.set_workload_version(self.slurmd.version())
+            self.unit.status = ops.MaintenanceStatus(
+                "Installing `slurmd`, GPU drivers, RDMA drivers, and `node-exporter`"
+            )
+            mirror = self.configmgr.package_mirror
+            self._install_plan(mirror=mirror).execute()
+            self._stored.package_mirror = mirror.uri if mirror is not None else ""
 
-            self.unit.status = ops.MaintenanceStatus("Installing GPU drivers")
-            gpu_enabled = self.gpu.autoinstall()
-            if gpu_enabled:
+            if self.gpu.drivers:
                 self.unit.status = ops.MaintenanceStatus("Successfully installed GPU drivers")
             else:
                 self.unit.status = ops.MaintenanceStatus(
                     "No GPUs detected. Skipping driver installation"
                 )
 
-            self.unit.status = ops.MaintenanceStatus("Installing RDMA drivers")
-            rdma.install()
-
-            self.unit.status = ops.MaintenanceStatus("Installing `node-exporter`")
-            self.slurmd.node_exporter.install()
-            for plug in NODE_EXPORTER_PLUGS:
-                self.slurmd.node_exporter.connect(plug)
-            self.slurmd.node_exporter.set_web_listen_address(f":{NODE_EXPORTER_PORT}")
-            self.slurmd.node_exporter.set_collectors(NODE_EXPORTER_COLLECTORS)
-            self.slurmd.node_exporter.service.enable()
+            self.slurmd.service.stop()
+            self.slurmd.service.disable()
+            with self.slurmd.options_session():
+                self.slurmd.conf = self.slurmd.build_node()
+                self.slurmd.dynamic = True
+                self.slurmd.name = self.unit.name.replace("/", "-")
+            self._stored.applied_hardware = self._hardware_state()
+            self.unit.open_port("tcp", SLURMD_PORT)
+            self.unit.set_workload_version(self.slurmd.version())
         except (SlurmOpsError, GPUOpsError, rdma.RDMAOpsError, SnapError) as e:
             # FIXME: https://github.com/canonical/charmed-hpc-libs/issues/134
             #  Investigate how to provide more granular status messages
@@ -163,7 +184,7 @@ class SlurmdCharm(ops.CharmBase):
             error_message = {
                 SlurmOpsError: "Failed to install `slurmd`",
                 GPUOpsError: "Failed to install GPU packages",
-                rdma.RDMAOpsError: "Failed to install RDMA drivers",
+                rdma.RDMAOpsError: "Failed to configure RDMA drivers",
                 SnapError: "Failed to install `node-exporter`",
             }
 
@@ -175,14 +196,90 @@ class SlurmdCharm(ops.CharmBase):
 
         reboot_if_required(self)
 
+    def _install_plan(self, mirror: PackageMirror | None = None) -> InstallPlan:
+        """Plan the installation of `slurmd`, GPU drivers, RDMA drivers, and `node-exporter`."""
+        plan = InstallPlan(mirror=mirror)
+        self.slurmd.plan_install(plan)
+        self.gpu.plan_install(plan)
+        rdma.plan_install(plan)
+        plan.add_snap("node-exporter", self.slurmd.node_exporter.install)
+        plan.add_configure(self._configure_node_exporter)
+        return plan
+
+    def _configure_node_exporter(self) -> None:
+        """Configure and start the `node-exporter` service.
+
+        Raises:
+            SnapError: Raised if `node-exporter` cannot be configured or started.
+        """
+        for plug in NODE_EXPORTER_PLUGS:
+            self.slurmd.node_exporter.connect(plug)
+        self.slurmd.node_exporter.set_web_listen_address(f":{NODE_EXPORTER_PORT}")
+        self.slurmd.node_exporter.set_collectors(NODE_EXPORTER_COLLECTORS)
+        self.slurmd.node_exporter.service.enable()
+
     @refresh
-    def _on_config_changed(self, _: ops.ConfigChangedEvent) -> None:
+    def _on_config_changed(self, event: ops.ConfigChangedEvent) -> None:
         """Update the `slurmd` application's configuration."""
         self.slurmctld.set_compute_data(ComputeData(partition=self.configmgr.partition_config))
 
+        if not self.slurmd.is_installed():
+            return
+
+        try:
+            # Install packages from the package mirror set by `package-mirror`. The mirror's
+            # package index is only downloaded again if the mirror has changed.
+            mirror = self.configmgr.package_mirror
+            uri = mirror.uri if mirror is not None else ""
+            if uri != self._stored.package_mirror:
+                if mirror is not None:
+                    mirror.enable()
+                else:
+                    PackageMirror.disable()
+                self._stored.package_mirror = uri
+
+            # Apply the resources reserved for system services by `system-reservation`.
+            if not self._apply_hardware_profile():
+                event.defer()
+        except (SlurmOpsError, rdma.RDMAOpsError) as e:
+            logger.error(e.message)
+            raise StopCharm(
+                ops.BlockedStatus(
+                    "Failed to apply updated node configuration. See `juju debug-log` for details"
+                )
+            )
+
     @refresh
     def _on_update_status(self, _: ops.UpdateStatusEvent) -> None:
-        """Handle update status."""
+        """Handle update status.
+
+        Notes:
+            - Checking for hardware changes only requires computing a cheap fingerprint of the
+              machine. See `_apply_hardware_profile` for how rediscovered hardware is applied.
+              Hardware changes that could not be applied while jobs were running are retried.
+            - The InfiniBand leaf switch is rediscovered as compute nodes may be recabled
+              without any change to their hardware fingerprint.
+        """
+        if not self.slurmd.is_installed():
+            return
+
+        try:
+            if self._hardware_state() != self._stored.applied_hardware:
+                logger.info("hardware change detected. updating node configuration")
+                self._apply_hardware_profile()
+                return
+
+            switch = self.slurmd.leaf_switch()
+            if self.slurmd.leaf_switch(refresh=True) != switch and self.slurmctld.is_joined():
+                self.slurmctld.set_node_data(self._node_data())
+        except (SlurmOpsError, rdma.RDMAOpsError) as e:
+            logger.error(e.message)
+            raise StopCharm(
+                ops.BlockedStatus(
+                    "Failed to apply updated hardware configuration. "
+                    "See `juju debug-log` for details"
+                )
+            )
 
     @refresh
     @block_unless(slurmd_installed)
@@ -203,16 +300,23 @@ class SlurmdCharm(ops.CharmBase):
         self.slurmd.key.set({"key": data.auth_key, "keyid": data.auth_key_id})
         self.slurmd.conf_server = data.controllers
 
-        # Set default state and reason if this compute node is being added to a Slurm cluster.
-        params = {}
-        if not self.slurmd.exists():
-            params = {
-                "state": self.configmgr.default_node_state,
-                "reason": self.configmgr.default_node_reason,
-            }
-
+        # Spread the registrations of new compute nodes out as every unit receives
+        # controller data at the same time when the application is deployed or scaled out.
+        scheduler = RegistrationScheduler(
+            int(self.unit.name.split("/")[1]), self.app.planned_units()
+        )
         try:
-            self.slurmd.reconfigure(**params)
+            # Set default state and reason if this compute node is being added to a Slurm cluster.
+            params = {}
+            first = not self.slurmd.exists()
+            if first:
+                params = {
+                    "state": self.configmgr.default_node_state,
+                    "reason": self.configmgr.default_node_reason,
+                }
+
+            scheduler.register(lambda: self.slurmd.reconfigure(**params), first=first)
+            self.slurmctld.set_node_data(self._node_data(), integration_id=event.relation.id)
         except SlurmOpsError as e:
             logger.error(e.message)
             raise StopCharm(
@@ -266,7 +370,15 @@ class SlurmdCharm(ops.CharmBase):
 
     @refresh
     def _on_set_node_config_action(self, event: ops.ActionEvent) -> None:
-        """Handle when the `set-node-config` action is run."""
+        """Handle when the `set-node-config` action is run.
+
+        Notes:
+            - Parameters that can be changed on a registered node, such as `Weight`, `Features`,
+              or `Gres`, are updated with `scontrol update` without restarting `slurmd`.
+              See `classify_node_changes`.
+            - The node is only deleted and registered again if other parameters are changed,
+              e.g. `RealMemory`. Such changes are refused while jobs are running on the node.
+        """
         try:
             custom = Node.from_str(event.params["parameters"])
         except (ModelError, ValueError) as e:
@@ -294,36 +406,286 @@ class SlurmdCharm(ops.CharmBase):
             event.set_results({"accepted": False})
             return
 
-        if event.params["reset"]:
-            self.slurmd.conf = self.slurmd.build_node()
-
-        config = self.slurmd.conf
+        config = self.slurmd.build_node() if event.params["reset"] else self.slurmd.conf
         config.update(custom)
-        self.slurmd.conf = config
 
-        if self.slurmd.exists():
-            try:
-                info = self.slurmd.show_node()
-                # Index '0' contains the desired state information.
-                # The value of index '1' is "DYNAMIC_NORM" to show that this node is dynamic.
-                state = info["state"][0].lower()
-                reason = info["reason"]
-
-                # Node must be deleted and reregistered if changing hardware configuration like
-                # `RealMemory` or `MemSpecLimit`.
-                self.slurmd.delete()
-                self.slurmd.reconfigure(state=state, reason=reason)
-            except SlurmOpsError as e:
-                logger.error(e.message)
+        try:
+            if not self._apply_node_config(config):
                 event.fail(
-                    "Failed to apply node configuration parameters. "
-                    "See `juju debug-log` for further details."
+                    f"Cannot apply node configuration parameters '{event.params['parameters']}'. "
+                    "Reason: Changed parameters require the node to be re-registered while jobs "
+                    f"are running. Run `scontrol update nodename={self.slurmd.name} state=drain` "
+                    "and wait for running jobs to complete first."
                 )
                 event.set_results({"accepted": False})
                 return
+        except SlurmOpsError as e:
+            logger.error(e.message)
+            event.fail(
+                "Failed to apply node configuration parameters. "
+                "See `juju debug-log` for further details."
+            )
+            event.set_results({"accepted": False})
+            return
 
         event.set_results({"accepted": True})
 
+    def _on_set_mig_config_action(self, event: ops.ActionEvent) -> None:
+        """Handle when the `set-mig-config` action is run."""
+        profiles = [p.strip() for p in event.params["profiles"].split(",") if p.strip()]
+        try:
+            gpus = (
+                [int(gpu) for gpu in event.params["gpus"].split(",")]
+                if event.params["gpus"]
+                else None
+            )
+        except ValueError:
+            event.fail(f"Invalid GPU indices '{event.params['gpus']}'")
+            event.set_results({"accepted": False})
+            return
+
+        try:
+            if self.slurmd.exists() and not _drained(self.slurmd.show_node()):
+                event.fail(
+                    "Cannot reconfigure MIG devices. Reason: Node must be drained. "
+                    f"Run `scontrol update nodename={self.slurmd.name} state=drain` first."
+                )
+                event.set_results({"accepted": False})
+                return
+
+            event.log("Configuring MIG devices")
+            self.gpu.configure_mig(profiles, gpus)
+            self.slurmd.hardware_profile(refresh=True)
+            self._apply_hardware_profile(refresh=True)
+        except (SlurmOpsError, GPUOpsError, rdma.RDMAOpsError) as e:
+            logger.error(e.message)
+            event.fail("Failed to reconfigure MIG devices. See `juju debug-log` for details.")
+            event.set_results({"accepted": False})
+            return
+
+        event.set_results({"accepted": True, "gres": ",".join(self.slurmd.get_gpu_info())})
+
+    def _on_prefetch_packages_action(self, event: ops.ActionEvent) -> None:
+        """Handle when the `prefetch-packages` action is run."""
+        try:
+            mirror = PackageMirror.from_str(event.params["path"]) or self.configmgr.package_mirror
+        except ValueError as e:
+            event.fail(f"Invalid package mirror path '{event.params['path']}'. Reason: {e}")
+            return
+
+        if mirror is None or mirror.path is None:
+            event.fail(
+                "Cannot prefetch packages. Reason: No local package mirror directory. "
+                "Set the `path` parameter or a local directory with `package-mirror`"
+            )
+            return
+
+        try:
+            event.log(f"Prefetching packages into package mirror {mirror.path}")
+            versions = self._install_plan().prefetch(mirror)
+        except (SlurmOpsError, GPUOpsError) as e:
+            logger.error(e.message)
+            event.fail("Failed to prefetch packages. See `juju debug-log` for details.")
+            return
+
+        event.set_results(
+            {
+                "path": str(mirror.path),
+                "packages": len(versions),
+                "slurm-version": versions.get("slurmd", ""),
+            }
+        )
+
+    def _apply_hardware_profile(self, *, refresh: bool = False) -> bool:
+        """Apply the hardware profile of this compute node to its Slurm configuration.
+
+        Args:
+            refresh:
+                If `True`, rebuild the node configuration from the hardware profile even if
+                the hardware has not changed since it was last applied.
+
+        Returns:
+            `False` if the updated node configuration requires this compute node to be
+            re-registered while jobs are running on it, otherwise `True`.
+
+        Raises:
+            SlurmOpsError: Raised if the updated node configuration cannot be applied.
+            RDMAOpsError: Raised if the UCX profile cannot be configured.
+
+        Notes:
+            - The hardware fingerprint and `system-reservation` policy last applied to the node
+              configuration are stored. The node configuration is only updated if either
+              has changed since, so parameters set with `set-node-config` are preserved.
+            - If only `system-reservation` has changed, only `CpuSpecList` and `MemSpecLimit`
+              are updated, and system services are pinned to the reserved CPUs. If the
+              hardware has changed, the node configuration is also rebuilt from the hardware
+              profile, the UCX profile is regenerated, and the node data of this compute node
+              is republished to `slurmctld`.
+            - Compute nodes upgraded from a revision that did not store the applied hardware
+              profile keep their node configuration until the hardware or
+              `system-reservation` changes.
+        """
+        state = self._hardware_state()
+        if not refresh:
+            if not self._stored.applied_hardware:
+                logger.debug("no hardware profile applied. keeping current node configuration")
+                self._stored.applied_hardware = state
+                return True
+            if state == self._stored.applied_hardware:
+                return True
+
+        node = self.slurmd.build_node()
+        config = self.slurmd.conf
+        hardware_changed = refresh or (
+            json.loads(state)["fingerprint"]
+            != json.loads(self._stored.applied_hardware)["fingerprint"]
+        )
+        if hardware_changed:
+            # Keep the partition and any features added with `set-node-config`.
+            del node.features
+            config.update(node)
+
+        # Resources that are no longer reserved for system services must be released.
+        if node.cpu_spec_list is None:
+            del config.cpu_spec_list
+        else:
+            config.cpu_spec_list = node.cpu_spec_list
+        if node.mem_spec_limit is None:
+            del config.mem_spec_limit
+        else:
+            config.mem_spec_limit = node.mem_spec_limit
+
+        if not self._apply_node_config(config):
+            logger.warning(
+                "cannot apply updated hardware profile to node %s while jobs are running. "
+                "drain the node to apply the update",
+                self.slurmd.name,
+            )
+            return False
+
+        self._stored.applied_hardware = state
+
+        services = list(SYSTEM_SERVICES)
+        if machine := os.environ.get("JUJU_MACHINE_ID"):
+            services.append(f"jujud-machine-{machine}")
+        self.slurmd.pin_services(services)
+
+        if hardware_changed:
+            rdma.configure_ucx()
+            if self.slurmctld.is_joined():
+                self.slurmctld.set_node_data(self._node_data())
+
+        return True
+
+    def _apply_node_config(self, config: Node) -> bool:
+        """Apply an updated node configuration to this compute node.
+
+        Args:
+            config: Updated node configuration.
+
+        Returns:
+            `False` if the updated node configuration requires this compute node to be
+            re-registered while jobs are running on it, otherwise `True`.
+
+        Raises:
+            SlurmOpsError: Raised if the updated node configuration cannot be applied.
+
+        Notes:
+            - Parameters that can be changed on a registered node are updated without
+              restarting `slurmd`. The node is only deleted and registered again if other
+              parameters are changed. See `classify_node_changes`.
+            - The previous node configuration is restored if the updated node configuration
+              cannot be applied, so that it matches the node registered with Slurm.
+        """
+        previous_config = self.slurmd.conf
+        previous = previous_config.dict()
+        current = config.dict()
+        action = classify_node_changes(previous, current)
+        info = None
+        if action == ReconfigureAction.RESTART and self.slurmd.exists():
+            info = self.slurmd.show_node()
+            if _running_jobs(info):
+                return False
+
+        # `slurmd` reads the node configuration when it registers with Slurm, so it must be
+        # written before this compute node is re-registered.
+        self.slurmd.conf = config
+        try:
+            match action:
+                case ReconfigureAction.RECONFIGURE if self.slurmd.exists():
+                    self.slurmd.update(
+                        {
+                            parameter: current.get(parameter)
+                            for parameter in previous.keys() | current.keys()
+                            if previous.get(parameter) != current.get(parameter)
+                        }
+                    )
+                case ReconfigureAction.RESTART if info is not None:
+                    self._reregister_node(info)
+        except SlurmOpsError:
+            self.slurmd.conf = previous_config
+            raise
+
+        return True
+
+    def _hardware_state(self) -> str:
+        """Get the hardware fingerprint and reservation policy of this compute node.
+
+        Raises:
+            SlurmOpsError: Raised if the command `slurmd -C` fails.
+        """
+        return json.dumps(
+            {
+                "fingerprint": self.slurmd.hardware_profile().fingerprint,
+                "policy": asdict(self.configmgr.system_reservation),
+            },
+            sort_keys=True,
+        )
+
+    def _node_data(self) -> NodeData:
+        """Build the node data of this compute node to publish to `slurmctld`.
+
+        Notes:
+            - The InfiniBand leaf switch of this compute node is read from its hardware profile
+              so that `slurmctld` can place it in the network topology. The leaf switch is
+              rediscovered on `update-status`.
+        """
+        return NodeData(
+            gres=self.slurmd.build_gres(),
+            node_name=self.slurmd.name,
+            switch=self.slurmd.leaf_switch(),
+        )
+
+    def _reregister_node(self, info: dict[str, Any]) -> None:
+        """Re-register this compute node with Slurm to apply an updated node configuration.
+
+        Args:
+            info: Information about this compute node, as returned by `show_node`.
+
+        Raises:
+            SlurmOpsError: Raised if the compute node fails to re-register with Slurm.
+        """
+        # Index '0' contains the desired state information.
+        # The value of index '1' is "DYNAMIC_NORM" to show that this node is dynamic.
+        state = info["state"][0].lower()
+        reason = info["reason"]
+
+        # Node must be deleted and reregistered if changing hardware configuration like
+        # `RealMemory` or `MemSpecLimit`.
+        self.slurmd.delete()
+        self.slurmd.reconfigure(state=state, reason=reason)
+
+
+def _drained(info: dict[str, Any]) -> bool:
+    """Check if a node is drained with no jobs running on it."""
+    return "DRAIN" in {flag.upper() for flag in info["state"]} and not _running_jobs(info)
+
+
+def _running_jobs(info: dict[str, Any]) -> bool:
+    """Check if a node has jobs running on it."""
+    state = {flag.upper() for flag in info["state"]}
+    return bool(state & {"ALLOCATED", "MIXED", "COMPLETING"})
+
 
 if __name__ == "__main__":  # pragma: nocover
     ops.main(SlurmdCharm)
@@ -18,6 +18,7 @@ import logging
 from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, ValidationInfo, field_validator
+from slurm_ops import PackageMirror, ReservationPolicy
 from slurmutils import ModelError, Partition
 
 _logger = logging.getLogger(__name__)
@@ -35,6 +36,8 @@ class ConfigManager(BaseModel):
     default_node_reason: str
     partition_name: str
     partition_config: Partition
+    system_reservation: ReservationPolicy
+    package_mirror: PackageMirror | None
 
     @field_validator("default_node_reason", mode="after")
     @classmethod
@@ -61,3 +64,19 @@ class ConfigManager(BaseModel):
         partition.partition_name = name
         partition.nodes = [name]
         return partition
+
+    @field_validator("system_reservation", mode="before")
+    @classmethod
+    def _build_reservation_policy(cls, value: str) -> ReservationPolicy:
+        try:
+            return ReservationPolicy.from_str(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid system reservation: {value}. Reason:\n{e}")
+
+    @field_validator("package_mirror", mode="before")
+    @classmethod
+    def _build_package_mirror(cls, value: str) -> PackageMirror | None:
+        try:
+            return PackageMirror.from_str(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid package mirror: {value}. Reason:\n{e}")
@@ -18,3 +18,11 @@ SLURMD_INTEGRATION_NAME = "slurmctld"
 PROMETHEUS_SCRAPE_INTEGRATION_NAME = "metrics-endpoint"
 
 SLURMD_PORT = 6818
+
+# systemd units of system services pinned to the CPUs reserved for system services.
+# The Juju machine agent, `jujud-machine-<id>`, is pinned as well.
+SYSTEM_SERVICES = (
+    "snap.node-exporter.node-exporter",
+    "snap.dcgm.dcgm-exporter",
+    "snap.dcgm.nv-hostengine",
+)
@@ -17,15 +17,16 @@
 __all__ = ["DCGM_EXPORTER_SCRAPE_CONFIG", "GPUOpsError", "NvidiaGPUManager"]
 
 import logging
+import subprocess
+from collections.abc import Iterable
 from functools import cached_property
 
 # ubuntu-drivers requires apt_pkg for package operations
 import apt_pkg  # pyright: ignore [reportMissingImports]
 import UbuntuDrivers.detect  # pyright: ignore [reportMissingImports]
 from charmed_hpc_libs.errors import SnapError
-from charmed_hpc_libs.ops import DCGMManager
-from charmlibs import apt
-from slurm_ops import UNIT_TO_NODE_NAME_RELABEL_CONFIG
+from charmed_hpc_libs.ops import DCGMManager, call
+from slurm_ops import UNIT_TO_NODE_NAME_RELABEL_CONFIG, InstallPlan
 
 _logger = logging.getLogger(__name__)
 
@@ -49,26 +50,50 @@ class GPUOpsError(Exception):
 
 
 class NvidiaGPUManager:
-    """Manage Nvidia GPU resources on Slurm compute nodes."""
+    """Manage Nvidia GPU resources on Slurm compute nodes.
+
+    Attributes:
+        drivers: GPU driver packages detected when the install plan was resolved.
+    """
+
+    def __init__(self) -> None:
+        self.drivers: list[str] = []
 
     @cached_property
     def dcgm(self) -> DCGMManager:
         """Get the DCGM (Nvidia's Data Center GPU Manager) lifecycle manager."""
         return DCGMManager()
 
-    def autoinstall(self) -> bool:
-        """Autodetect available GPUs and install drivers.
+    def plan_install(self, plan: InstallPlan) -> None:
+        """Add the steps to autodetect available GPUs and install their drivers to a plan.
 
-        Returns:
-            True if drivers were installed, False otherwise.
-
-        Raises:
-            GPUOpsError: Raised if error is encountered during package install.
+        Notes:
+            - GPUs are detected once the package repositories of the plan are configured.
+              If drivers are required, the driver packages and the `dcgm` snap are added to
+              the plan. See `drivers` for the detected driver packages.
         """
-        _logger.info("detecting GPUs and installing drivers")
+        plan.add_resolver(self._resolve_drivers)
 
+    def _resolve_drivers(self, plan: InstallPlan) -> None:
+        """Detect available GPUs and add their drivers to a plan."""
+        _logger.info("detecting GPUs and resolving drivers")
+        self.drivers = self._driver_packages()
+        if not self.drivers:
+            _logger.info("no GPU drivers requiring installation")
+            return
+
+        _logger.info("planning install of GPU driver packages: %s", self.drivers)
+        plan.add_packages(*self.drivers)
+        plan.add_snap("dcgm", self._install_dcgm)
+        plan.add_configure(self._configure_dcgm)
+
+    @staticmethod
+    def _driver_packages() -> list[str]:
+        """Get the driver and kernel module packages recommended for the available GPUs."""
         apt_pkg.init()
         packages = UbuntuDrivers.detect.system_gpgpu_driver_packages()
+        # The apt cache is expensive to build, so it is only built once for all drivers.
+        cache = None
         # Gather list of driver and kernel modules to install.
         install_packages = []
         for driver_package in packages:
@@ -80,27 +105,36 @@ class NvidiaGPUManager:
 
                 # Retrieve modules metapackage for combination of current kernel and recommended driver,
                 # For example, linux-modules-nvidia-535-server-aws
+                if cache is None:
+                    cache = apt_pkg.Cache(None)
                 modules_metapackage = UbuntuDrivers.detect.get_linux_modules_metapackage(
-                    apt_pkg.Cache(None), driver_package
+                    cache, driver_package
                 )
 
                 # Add to list of packages to install
                 install_packages += [driver_metapackage, modules_metapackage]
 
-        targets = [p for p in install_packages if p]
-        if len(targets) == 0:
-            _logger.info("no GPU drivers requiring installation")
-            return False
+        return [p for p in install_packages if p]
 
-        _logger.info("installing GPU driver packages: %s", targets)
-        try:
-            apt.add_package(targets)
-        except (apt.PackageNotFoundError, apt.PackageError) as e:
-            raise GPUOpsError(f"failed to install packages {targets}. reason: {e}")
+    def _install_dcgm(self) -> None:
+        """Install the `dcgm` snap.
 
+        Raises:
+            GPUOpsError: Raised if the `dcgm` snap fails to install.
+        """
         _logger.info("installing `dcgm` snap")
         try:
             self.dcgm.install()
+        except SnapError as e:
+            raise GPUOpsError(f"failed to install `dcgm` snap. reason: {e}")
+
+    def _configure_dcgm(self) -> None:
+        """Configure and start the `dcgm-exporter` service.
+
+        Raises:
+            GPUOpsError: Raised if the `dcgm-exporter` service fails to start.
+        """
+        try:
             self.dcgm.set_dcgm_exporter_address(f":{DCGM_EXPORTER_PORT}")
             # Restart `dcgm-exporter` if it's already running to apply new port configuration.
             self.dcgm.exporter.restart()
@@ -108,4 +142,60 @@ class NvidiaGPUManager:
         except SnapError as e:
             raise GPUOpsError(f"failed to install and start `dcgm-exporter` service. reason: {e}")
 
-        return True
+    def configure_mig(self, profiles: Iterable[str], gpus: Iterable[int] | None = None) -> None:
+        """Partition GPUs into MIG devices.
+
+        Args:
+            profiles:
+                MIG profiles of the GPU instances to create on each GPU, e.g.
+                `["3g.40gb", "1g.10gb", "1g.10gb"]`. MIG is disabled if no profiles are passed.
+            gpus: (Optional) Indices of the GPUs to partition. Default: all GPUs.
+
+        Raises:
+            GPUOpsError: Raised if the MIG layout of the GPUs cannot be configured.
+
+        Warnings:
+            - All existing MIG devices on the GPUs are destroyed, so no jobs can be running on
+              the GPUs. GPUs that need to be reset to change their MIG mode are reset.
+        """
+        profiles = list(profiles)
+        target = ["-i", ",".join(str(gpu) for gpu in gpus)] if gpus is not None else []
+
+        try:
+            # Destroying instances fails if none exist, so failures are ignored.
+            call("nvidia-smi", "mig", *target, "-dci", check=False)
+            call("nvidia-smi", "mig", *target, "-dgi", check=False)
+
+            call("nvidia-smi", *target, "-mig", "1" if profiles else "0")
+            self._reset_pending_mig(target)
+
+            if profiles:
+                call("nvidia-smi", "mig", *target, "-cgi", ",".join(profiles), "-C")
+        except subprocess.CalledProcessError as e:
+            raise GPUOpsError(
+                f"failed to configure MIG devices with command '{' '.join(e.cmd)}'. "
+                + f"reason: {e.stderr}"
+            )
+
+    @staticmethod
+    def _reset_pending_mig(target: list[str]) -> None:
+        """Reset GPUs whose MIG mode change is pending a GPU reset.
+
+        Raises:
+            subprocess.CalledProcessError: Raised if `nvidia-smi` fails.
+        """
+        result = call(
+            "nvidia-smi",
+            *target,
+            "--query-gpu=index,mig.mode.current,mig.mode.pending",
+            "--format=csv,noheader",
+        )
+        pending = []
+        for line in (result.stdout or "").splitlines():
+            index, current, requested = (field.strip() for field in line.split(","))
+            if current != requested:
+                pending.append(index)
+
+        if pending:
+            _logger.info("resetting GPUs %s to apply pending MIG mode change", pending)
+            call("nvidia-smi", "-i", ",".join(pending), "--gpu-reset")
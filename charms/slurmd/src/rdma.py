@@ -16,14 +16,20 @@
 
 import logging
 from pathlib import Path
+from typing import NamedTuple
 
-from charmlibs import apt
+from slurm_ops import InstallPlan
 
 _logger = logging.getLogger(__name__)
 
+_RDMA_PACKAGES = ["rdma-core", "infiniband-diags"]
+_INFINIBAND_PATH = Path("/sys/class/infiniband")
+_UCX_CONF = Path("/etc/ucx/ucx.conf")
+_UCX_CONF_HEADER = "# Generated by the slurmd charm. Do not edit."
+
 
 class RDMAOpsError(Exception):
-    """Exception raised when an RDMA package installation operation failed."""
+    """Exception raised when an RDMA configuration operation failed."""
 
     @property
     def message(self) -> str:
@@ -31,16 +37,6 @@ class RDMAOpsError(Exception):
         return self.args[0]
 
 
-def _install_rdma() -> None:
-    """Install the given list of packages."""
-    install_packages = ["rdma-core", "infiniband-diags"]
-    _logger.info("installing RDMA packages: %s", install_packages)
-    try:
-        apt.add_package(install_packages)
-    except (apt.PackageNotFoundError, apt.PackageError) as e:
-        raise RDMAOpsError(f"failed to install packages {install_packages}. reason: {e}")
-
-
 def _override_ompi_conf() -> None:
     """Re-enable UCX/UCT transport protocol by overriding system OpenMPI configuration.
 
@@ -82,11 +78,160 @@ def _override_ompi_conf() -> None:
     file.write_text("\n".join(filter(None, content)) + "\n")
 
 
-def install() -> None:
-    """Install RDMA packages.
+class RDMAPort(NamedTuple):
+    """Active port of an RDMA device.
+
+    Attributes:
+        device: Name of the RDMA device, e.g. `mlx5_0`.
+        port: Number of the port on the RDMA device, e.g. `1`.
+        model: Model of the host channel adapter, e.g. `MT4123` for a ConnectX-6.
+        link_layer: Link layer of the port: `InfiniBand` or `Ethernet` for RoCE.
+        rate: Link rate of the port in Gb/s, e.g. `200` for 4X HDR.
+    """
+
+    device: str
+    port: int
+    model: str
+    link_layer: str
+    rate: int
+
+
+def rdma_ports() -> list[RDMAPort]:
+    """Get the active ports of the RDMA devices on this compute node, ordered by device name.
+
+    Notes:
+        - Port state and link rate are read from `/sys/class/infiniband`, e.g. `4: ACTIVE`
+          and `200 Gb/sec (2X NDR)`. Ports that are not active are ignored.
+    """
+    ports = []
+    for device in sorted(_INFINIBAND_PATH.glob("*")):
+        try:
+            model = (device / "hca_type").read_text().strip()
+        except OSError:
+            model = ""
+
+        for port in sorted((device / "ports").glob("*"), key=lambda p: int(p.name)):
+            try:
+                state = (port / "state").read_text().strip()
+                link_layer = (port / "link_layer").read_text().strip()
+                rate = (port / "rate").read_text().split()[0]
+            except (OSError, IndexError):
+                continue
+
+            if not state.endswith("ACTIVE"):
+                continue
+
+            ports.append(
+                RDMAPort(
+                    device=device.name,
+                    port=int(port.name),
+                    model=model,
+                    link_layer=link_layer,
+                    rate=int(float(rate)),
+                )
+            )
+
+    return ports
+
+
+def ucx_profile(ports: list[RDMAPort]) -> dict[str, str]:
+    """Generate a tuned UCX environment profile for the RDMA ports of a compute node.
+
+    Args:
+        ports: Active RDMA ports of the compute node. See `rdma_ports`.
+
+    Returns:
+        Mapping of UCX environment variables to their values. Empty if there are no ports.
+
+    Notes:
+        - Only the fastest ports are used, so that jobs are not slowed down by a slower
+          secondary adapter. InfiniBand ports are preferred over RoCE ports.
+        - `mlx5` devices use the accelerated `rc_x` and `dc_x` transports. Dynamically
+          connected transport keeps memory usage flat as jobs scale out. Other devices use
+          the verbs `rc` and `ud` transports. Transports are selected by device family rather
+          than link rate so that EDR and HDR compute nodes in a partition stay compatible.
+        - The rendezvous threshold scales with the link rate, as faster links amortize the
+          rendezvous handshake over smaller messages: 8 KiB for 100 Gb/s links, 16 KiB for
+          200 Gb/s links, and so on.
+    """
+    infiniband = [port for port in ports if port.link_layer == "InfiniBand"]
+    candidates = infiniband or ports
+    if not candidates:
+        return {}
+
+    rate = max(port.rate for port in candidates)
+    selected = [port for port in candidates if port.rate == rate]
+    accelerated = all(port.device.startswith("mlx5") for port in selected)
+
+    if infiniband:
+        transports = ["rc_x", "dc_x"] if accelerated else ["rc", "ud"]
+    else:
+        transports = ["rc_x"] if accelerated else ["rc"]
+
+    return {
+        "UCX_NET_DEVICES": ",".join(f"{port.device}:{port.port}" for port in selected),
+        "UCX_TLS": ",".join(["self", "sm", *transports]),
+        "UCX_RNDV_THRESH": str(max(1024, 8192 * rate // 100) // 1024 * 1024),
+    }
+
+
+def configure_ucx() -> None:
+    """Configure UCX with a profile tuned for the RDMA ports of this compute node.
 
     Raises:
-        RDMAOpsError: Raised if error is encountered during package install.
+        RDMAOpsError: Raised if the UCX configuration file cannot be written.
+
+    Notes:
+        - The profile is written to UCX's system configuration file, which UCX reads in every
+          process, so it applies to all job tasks on this compute node including those
+          launched with `srun` or `mpirun`. UCX variables set in a job's environment
+          take precedence over the profile.
+        - If no RDMA port is active, a previously generated profile is removed.
+        - An existing UCX configuration file that was not generated by this charm, e.g. one
+          provided by the administrator or by a UCX package, is never overwritten or removed.
+    """
+    ports = rdma_ports()
+    profile = ucx_profile(ports)
+    try:
+        try:
+            current = _UCX_CONF.read_text()
+        except FileNotFoundError:
+            current = None
+
+        if current is not None and not current.startswith(_UCX_CONF_HEADER):
+            _logger.warning(
+                "UCX configuration file %s is not managed by this charm. skipping UCX profile",
+                _UCX_CONF,
+            )
+            return
+
+        if not profile:
+            if current is not None:
+                _logger.info("no active RDMA ports found. removing UCX profile %s", _UCX_CONF)
+                _UCX_CONF.unlink()
+            return
+
+        models = sorted({f"{port.device} ({port.model}, {port.rate} Gb/s)" for port in ports})
+        lines = [_UCX_CONF_HEADER, f"# RDMA ports: {', '.join(models)}"]
+        lines.extend(f"{name}={value}" for name, value in profile.items())
+        content = "\n".join(lines) + "\n"
+        if content == current:
+            _logger.debug("UCX profile %s is unchanged. skipping write", _UCX_CONF)
+            return
+
+        _logger.info("configuring UCX profile %s in %s", profile, _UCX_CONF)
+        _UCX_CONF.parent.mkdir(parents=True, exist_ok=True)
+        _UCX_CONF.write_text(content)
+    except OSError as e:
+        raise RDMAOpsError(f"failed to configure UCX profile {_UCX_CONF}. reason: {e}")
+
+
+def plan_install(plan: InstallPlan) -> None:
+    """Add the steps to install RDMA packages and configure MPI transports to a plan.
+
+    Notes:
+        - The configuration steps raise `RDMAOpsError` if the UCX profile cannot be configured.
     """
-    _install_rdma()
-    _override_ompi_conf()
+    plan.add_packages(*_RDMA_PACKAGES)
+    plan.add_configure(_override_ompi_conf)
+    plan.add_configure(configure_ucx)
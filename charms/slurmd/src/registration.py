@@ -0,0 +1,128 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Schedule the registration of compute nodes with Slurm."""
+
+__all__ = ["RegistrationInfo", "RegistrationScheduler"]
+
+import logging
+import math
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+from slurm_ops import scontrol
+
+_logger = logging.getLogger(__name__)
+
+# Multiples of the golden ratio modulo 1 are evenly spread over [0, 1) for any number of
+# consecutive unit numbers, so units added in any order still register at distinct times.
+_GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+class RegistrationInfo(NamedTuple):
+    """Statistics for the registration of a compute node with Slurm.
+
+    Attributes:
+        delay: Time in seconds waited before registering.
+        latency: Time in seconds spent registering, excluding `delay`.
+    """
+
+    delay: float
+    latency: float
+
+
+class RegistrationScheduler:
+    """Spread the registration of new compute nodes with Slurm over a time window.
+
+    Args:
+        unit_number: Number of the unit, e.g. `7` for `slurmd/7`.
+        units: Number of units in the `slurmd` application.
+        spacing: Time in seconds between registrations. The window grows by `spacing` per unit.
+        max_window: Maximum time in seconds to spread registrations over.
+
+    Notes:
+        - When many units are deployed at the same time, each unit restarts `slurmd` and
+          registers its node with `slurmctld` once it receives controller data. Registering
+          all units at once can fill up `slurmctld`'s RPC queue, which then backs off as per
+          `max_rpc_cnt`.
+        - Each unit waits for a deterministic delay derived from its unit number, so the
+          delay of a unit is the same in every hook and registrations do not bunch up by chance.
+          Applications with a single unit register immediately.
+        - Only the first registration of a node is delayed. Nodes that are already registered,
+          e.g. when the controllers change, reconfigure immediately.
+        - Failed registrations are not retried here. Transient `scontrol` errors are already
+          retried by `ScontrolRunner`.
+    """
+
+    def __init__(
+        self,
+        unit_number: int,
+        units: int,
+        *,
+        spacing: float = 0.5,
+        max_window: float = 120,
+    ) -> None:
+        self.unit_number = unit_number
+        self.units = units
+        self.spacing = spacing
+        self.max_window = max_window
+
+    @property
+    def offset(self) -> float:
+        """Get the offset of this unit within the registration window, between 0 and 1."""
+        return (self.unit_number * _GOLDEN_RATIO) % 1
+
+    @property
+    def window(self) -> float:
+        """Get the time in seconds that registrations are spread over."""
+        return min(self.max_window, self.spacing * max(0, self.units - 1))
+
+    @property
+    def delay(self) -> float:
+        """Get the time in seconds that this unit waits before registering."""
+        return self.offset * self.window
+
+    def register(self, register: Callable[[], None], *, first: bool = True) -> RegistrationInfo:
+        """Register this compute node with Slurm once its registration slot is reached.
+
+        Args:
+            register: Step that registers this compute node with Slurm.
+            first:
+                If `True`, this compute node is not registered with Slurm yet, and waits for
+                its registration slot. Otherwise, `register` is run immediately.
+
+        Raises:
+            SlurmOpsError: Raised if the registration fails.
+        """
+        delay = self.delay if first else 0
+        if delay:
+            _logger.info("waiting %.1f seconds before registering node with slurm", delay)
+            time.sleep(delay)
+
+        start = time.monotonic()
+        register()
+
+        info = RegistrationInfo(delay, time.monotonic() - start)
+        _logger.info(
+            "registered node with slurm in %.1f seconds (delay %.1f seconds). "
+            "scontrol latency: %s",
+            info.latency,
+            info.delay,
+            ", ".join(
+                f"{command}={latency.total / latency.count:.3f}s avg ({latency.count})"
+                for command, latency in scontrol.latency.items()
+            ),
+        )
+        return info
@@ -16,6 +16,7 @@
 """Unit tests for the `slurmd` charmed operator."""
 
 import json
+from pathlib import Path
 
 import ops
 import pytest
@@ -23,12 +24,34 @@ from charmed_hpc_libs.errors import SystemdError
 from constants import SLURMD_INTEGRATION_NAME, SLURMD_PORT
 from ops import testing
 from pytest_mock import MockerFixture
-from slurm_ops import SlurmOpsError
-from slurmutils import Node
+from slurm_ops import HardwareProfile, PackageMirror, SlurmOpsError
+from slurmutils import Gres, Node
 
 EXAMPLE_AUTH_KEY = "xyz123=="
 EXAMPLE_AUTH_CONTENT_ID = "12345678-90ab-cdef-1234-567890abcdef"
 EXAMPLE_CONTROLLERS = ["juju-988225-0:6817", "juju-988225-1:6817"]
+EXAMPLE_FINGERPRINT = "f1b5a2"
+
+
+def applied_hardware(fingerprint: str = EXAMPLE_FINGERPRINT, **policy) -> testing.StoredState:
+    """Mock the hardware profile and reservation policy last applied to the node configuration."""
+    return testing.StoredState(
+        owner_path="SlurmdCharm",
+        content={
+            "applied_hardware": json.dumps(
+                {
+                    "fingerprint": fingerprint,
+                    "policy": {"enabled": True, "cores": None, "memory": None} | policy,
+                },
+                sort_keys=True,
+            )
+        },
+    )
+
+
+def hardware_profile(fingerprint: str = EXAMPLE_FINGERPRINT) -> HardwareProfile:
+    """Mock the hardware profile of a compute node."""
+    return HardwareProfile(fingerprint=fingerprint, node="NodeName=compute-0 CPUs=32")
 
 
 @pytest.mark.parametrize(
@@ -49,7 +72,7 @@ class TestSlurmdCharm:
         ),
     )
     @pytest.mark.parametrize(
-        "mock_gpu_autoinstall_success",
+        "gpu_detected",
         (pytest.param(True, id="gpu detected"), pytest.param(False, id="gpu not detected")),
     )
     def test_on_install(
@@ -58,40 +81,44 @@ class TestSlurmdCharm:
         mocker: MockerFixture,
         mock_install,
         install_success,
-        mock_gpu_autoinstall_success,
+        gpu_detected,
         leader,
     ) -> None:
         """Test the `_on_install` event handler."""
         with mock_charm(mock_charm.on.install(), testing.State(leader=leader)) as manager:
             slurmd = manager.charm.slurmd
 
+            # Patch install plan. Packages and snaps are installed when the plan executes.
+            mock_execute = mocker.patch("charm.InstallPlan.execute", side_effect=mock_install)
+
             # Patch `slurmd` manager.
-            mocker.patch.object(slurmd, "install", side_effect=mock_install)
             mocker.patch.object(slurmd, "is_installed", lambda: install_success)
             mocker.patch.object(slurmd, "version", return_value="25.11")
             mocker.patch.object(slurmd.service, "stop")
             mocker.patch.object(slurmd.service, "disable")
             mocker.patch.object(slurmd, "build_node")
-
-            # Patch `rdma` module.
-            mocker.patch("rdma.install")
+            mocker.patch.object(slurmd, "hardware_profile", return_value=hardware_profile())
 
             # Patch `gpu` module.
-            mocker.patch(
-                "gpu.NvidiaGPUManager.autoinstall", lambda _: mock_gpu_autoinstall_success
-            )
+            gpu = manager.charm.gpu
+            gpu.drivers = ["nvidia-headless-no-dkms-580"] if gpu_detected else []
 
             state = manager.run()
 
+        mock_execute.assert_called_once()
+
         if install_success:
             assert slurmd.name == manager.charm.unit.name.replace("/", "-")
             assert slurmd.dynamic is True
             assert state.workload_version == "25.11"
+            # The hardware profile applied to the node configuration is stored.
+            stored = state.get_stored_state("_stored", owner_path="SlurmdCharm")
+            assert EXAMPLE_FINGERPRINT in stored.content["applied_hardware"]
             assert state.opened_ports == frozenset(
                 {testing.TCPPort(port=SLURMD_PORT, protocol="tcp")}
             )
 
-            if mock_gpu_autoinstall_success:
+            if gpu_detected:
                 assert (
                     ops.MaintenanceStatus("Successfully installed GPU drivers")
                     in mock_charm.unit_status_history
@@ -116,6 +143,110 @@ class TestSlurmdCharm:
         with mock_charm(mock_charm.on.config_changed(), testing.State(leader=leader)) as manager:
             manager.run()
 
+    @pytest.mark.parametrize(
+        "applied,enabled",
+        (
+            pytest.param("file:/srv/slurm-mirror", False, id="mirror unchanged"),
+            pytest.param("", True, id="mirror changed"),
+        ),
+    )
+    def test_on_config_changed_package_mirror(
+        self, mock_charm, mocker: MockerFixture, applied, enabled, leader
+    ) -> None:
+        """Test that `package-mirror` is only applied when the mirror changes."""
+        stored_state = testing.StoredState(
+            owner_path="SlurmdCharm", content={"package_mirror": applied}
+        )
+
+        with mock_charm(
+            mock_charm.on.config_changed(),
+            testing.State(
+                leader=leader,
+                config={"package-mirror": "/srv/slurm-mirror"},
+                stored_states={stored_state},
+            ),
+        ) as manager:
+            mocker.patch.object(manager.charm.slurmd, "is_installed", return_value=True)
+            mocker.patch.object(manager.charm, "_apply_hardware_profile")
+            mock_enable = mocker.patch.object(PackageMirror, "enable")
+
+            state = manager.run()
+
+        assert mock_enable.called == enabled
+        stored = state.get_stored_state("_stored", owner_path="SlurmdCharm")
+        assert stored.content["package_mirror"] == "file:/srv/slurm-mirror"
+
+    @pytest.mark.parametrize(
+        "reservation,state,expected,reregistered",
+        (
+            pytest.param(
+                "auto",
+                ["IDLE"],
+                "cpus=32 features=compute,nvme cpuspeclist=30,31 memspeclimit=2048",
+                True,
+                id="auto",
+            ),
+            pytest.param("none", ["IDLE"], "cpus=32 features=compute,nvme", True, id="none"),
+            pytest.param(
+                "auto",
+                ["ALLOCATED"],
+                "cpus=32 features=compute,nvme cpuspeclist=14,15 memspeclimit=1024",
+                False,
+                id="jobs running",
+            ),
+            pytest.param(
+                "cores=1 memory=1024",
+                ["IDLE"],
+                "cpus=32 features=compute,nvme cpuspeclist=14,15 memspeclimit=1024",
+                False,
+                id="reservation unchanged",
+            ),
+        ),
+    )
+    def test_on_config_changed_reservation(
+        self, mock_charm, mocker: MockerFixture, reservation, state, expected, reregistered, leader
+    ) -> None:
+        """Test that `system-reservation` updates the resources reserved for system services."""
+        stored_state = applied_hardware(cores=1, memory=1024)
+
+        with mock_charm(
+            mock_charm.on.config_changed(),
+            testing.State(
+                leader=leader,
+                config={"system-reservation": reservation},
+                stored_states={stored_state},
+            ),
+        ) as manager:
+            slurmd = manager.charm.slurmd
+            node = Node(cpus=32, features=["compute"])
+            if reservation == "auto":
+                node.cpu_spec_list = [30, 31]
+                node.mem_spec_limit = 2048
+            mocker.patch.object(slurmd, "is_installed", return_value=True)
+            mocker.patch.object(slurmd, "hardware_profile", return_value=hardware_profile())
+            mocker.patch.object(slurmd, "build_node", return_value=node)
+            mocker.patch.object(slurmd, "exists", return_value=True)
+            mocker.patch.object(slurmd, "show_node", return_value={"state": state, "reason": ""})
+            mock_delete = mocker.patch.object(slurmd, "delete")
+            mocker.patch.object(slurmd, "reconfigure")
+            mock_pin = mocker.patch.object(slurmd, "pin_services")
+            mock_ucx = mocker.patch("rdma.configure_ucx")
+            slurmd.conf = Node.from_str(
+                "cpus=32 features=compute,nvme cpuspeclist=14,15 memspeclimit=1024"
+            )
+
+            result = manager.run()
+
+        # Features added with `set-node-config` are kept.
+        assert slurmd.conf.dict() == Node.from_str(expected).dict()
+        assert mock_delete.called == reregistered
+        assert mock_pin.called == reregistered
+        if reregistered:
+            assert "snap.node-exporter.node-exporter" in mock_pin.call_args[0][0]
+        # The UCX profile is only regenerated if the hardware changes.
+        mock_ucx.assert_not_called()
+        assert bool(result.deferred) == (state == ["ALLOCATED"])
+
     def test_on_slurmctld_connected(self, mock_charm, mocker: MockerFixture, leader) -> None:
         """Test the `_on_slurmd_connected` event handler."""
         integration_id = 1
@@ -214,6 +345,10 @@ class TestSlurmdCharm:
             mocker.patch.object(slurmd, "is_installed", return_value=True)
             mocker.patch.object(slurmd.service, "is_active")
             mocker.patch.object(slurmd, "build_node", return_value=Node(cpus=8))
+            mocker.patch.object(slurmd, "build_gres", return_value=[])
+            mocker.patch.object(slurmd, "leaf_switch", return_value=None)
+            mocker.patch.object(slurmd, "exists", return_value=False)
+            mocker.patch.object(slurmd.backend, "update_node")
             mocker.patch("shutil.chown")  # User/group `slurm` doesn't exist on host.
 
             state = manager.run()
@@ -261,6 +396,7 @@ class TestSlurmdCharm:
             slurmd = manager.charm.slurmd
             mocker.patch.object(slurmd.service, "stop", side_effect=mock_stop)
             mocker.patch.object(slurmd, "is_installed", return_value=True)
+            mocker.patch.object(slurmd.backend, "delete_node")
 
             state = manager.run()
 
@@ -318,6 +454,259 @@ class TestSlurmdCharm:
             except testing.ActionFailed:
                 assert mock_charm.action_results == {"accepted": False}
 
+    @pytest.mark.parametrize(
+        "parameters,state,accepted,updated,reregistered",
+        (
+            pytest.param("weight=200", ["MIXED"], True, True, False, id="live update"),
+            pytest.param("cpus=8", ["MIXED"], True, False, False, id="unchanged"),
+            pytest.param("realmemory=4096", ["IDLE"], True, False, True, id="re-register"),
+            pytest.param("realmemory=4096", ["ALLOCATED"], False, False, False, id="jobs running"),
+        ),
+    )
+    def test_on_set_node_config_action_hot(
+        self,
+        mock_charm,
+        mocker: MockerFixture,
+        parameters,
+        state,
+        accepted,
+        updated,
+        reregistered,
+        leader,
+    ) -> None:
+        """Test that `set-node-config` only re-registers the node when required."""
+        with mock_charm(
+            mock_charm.on.action(
+                "set-node-config", params={"parameters": parameters, "reset": False}
+            ),
+            testing.State(leader=leader),
+        ) as manager:
+            slurmd = manager.charm.slurmd
+            slurmd.conf = Node(cpus=8)
+            mocker.patch.object(slurmd, "exists", return_value=True)
+            mocker.patch.object(slurmd, "show_node", return_value={"state": state, "reason": ""})
+            mock_update = mocker.patch.object(slurmd, "update")
+            mock_delete = mocker.patch.object(slurmd, "delete")
+            mocker.patch.object(slurmd, "reconfigure")
+
+            try:
+                manager.run()
+            except testing.ActionFailed:
+                pass
+
+        assert mock_charm.action_results["accepted"] == accepted
+        assert mock_update.called == updated
+        if updated:
+            mock_update.assert_called_once_with({"weight": 200})
+        assert mock_delete.called == reregistered
+        if not accepted:
+            assert slurmd.conf.dict() == {"cpus": 8}
+
+    @pytest.mark.parametrize(
+        "parameters",
+        (
+            pytest.param("weight=200", id="live update"),
+            pytest.param("realmemory=4096", id="re-register"),
+        ),
+    )
+    def test_on_set_node_config_action_restore(
+        self, mock_charm, mocker: MockerFixture, parameters, leader
+    ) -> None:
+        """Test that `set-node-config` restores the node configuration if it fails to apply."""
+        with mock_charm(
+            mock_charm.on.action(
+                "set-node-config", params={"parameters": parameters, "reset": False}
+            ),
+            testing.State(leader=leader),
+        ) as manager:
+            slurmd = manager.charm.slurmd
+            slurmd.conf = Node(cpus=8)
+            mocker.patch.object(slurmd, "exists", return_value=True)
+            mocker.patch.object(
+                slurmd, "show_node", return_value={"state": ["IDLE"], "reason": ""}
+            )
+            mocker.patch.object(slurmd, "update", side_effect=SlurmOpsError("update failed"))
+            mocker.patch.object(slurmd, "delete")
+            mocker.patch.object(
+                slurmd, "reconfigure", side_effect=SlurmOpsError("reconfigure failed")
+            )
+
+            with pytest.raises(testing.ActionFailed):
+                manager.run()
+
+        assert mock_charm.action_results == {"accepted": False}
+        assert slurmd.conf.dict() == {"cpus": 8}
+
+    @pytest.mark.parametrize(
+        "state,accepted",
+        (
+            pytest.param(["IDLE", "DRAIN"], True, id="drained"),
+            pytest.param(["MIXED", "DRAIN"], False, id="draining"),
+            pytest.param(["IDLE"], False, id="not drained"),
+        ),
+    )
+    def test_on_set_mig_config_action(
+        self, mock_charm, mocker: MockerFixture, state, accepted, leader
+    ) -> None:
+        """Test that the `set-mig-config` action only reconfigures MIG on drained nodes."""
+        with mock_charm(
+            mock_charm.on.action(
+                "set-mig-config", params={"profiles": "1g.10gb,3g.40gb", "gpus": ""}
+            ),
+            testing.State(leader=leader),
+        ) as manager:
+            slurmd = manager.charm.slurmd
+            mock_configure = mocker.patch.object(manager.charm.gpu, "configure_mig")
+            mocker.patch.object(slurmd, "exists", return_value=True)
+            mocker.patch.object(slurmd, "show_node", return_value={"state": state, "reason": ""})
+            mocker.patch.object(slurmd, "hardware_profile", return_value=hardware_profile())
+            mocker.patch.object(slurmd, "build_node", return_value=Node(cpus=8))
+            mocker.patch.object(slurmd, "get_gpu_info", return_value=["gpu:a100_1g.10gb:1"])
+            mocker.patch.object(slurmd, "delete")
+            mocker.patch.object(slurmd, "reconfigure")
+            mocker.patch.object(slurmd, "pin_services")
+
+            try:
+                manager.run()
+            except testing.ActionFailed:
+                pass
+
+        assert mock_charm.action_results["accepted"] == accepted
+        if accepted:
+            mock_configure.assert_called_once_with(["1g.10gb", "3g.40gb"], None)
+            assert mock_charm.action_results["gres"] == "gpu:a100_1g.10gb:1"
+        else:
+            mock_configure.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "params,config,path",
+        (
+            pytest.param({"path": "/srv/slurm-mirror"}, {}, "/srv/slurm-mirror", id="path"),
+            pytest.param(
+                {"path": ""},
+                {"package-mirror": "/nfs/slurm-mirror"},
+                "/nfs/slurm-mirror",
+                id="config",
+            ),
+            pytest.param(
+                {"path": ""}, {"package-mirror": "http://mirror.local/slurm"}, None, id="remote"
+            ),
+            pytest.param({"path": ""}, {}, None, id="no mirror"),
+        ),
+    )
+    def test_on_prefetch_packages_action(
+        self, mock_charm, mocker: MockerFixture, params, config, path, leader
+    ) -> None:
+        """Test that the `prefetch-packages` action only prefetches into local mirrors."""
+        with mock_charm(
+            mock_charm.on.action("prefetch-packages", params=params),
+            testing.State(leader=leader, config=config),
+        ) as manager:
+            mock_prefetch = mocker.patch(
+                "charm.InstallPlan.prefetch",
+                return_value={"slurmd": "25.11.0-1", "slurm-client": "25.11.0-1"},
+            )
+
+            try:
+                manager.run()
+            except testing.ActionFailed:
+                pass
+
+        if path:
+            assert mock_prefetch.call_args[0][0].path == Path(path)
+            assert mock_charm.action_results == {
+                "path": path,
+                "packages": 2,
+                "slurm-version": "25.11.0-1",
+            }
+        else:
+            mock_prefetch.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "changed,conf,state,reregistered",
+        (
+            pytest.param(False, "cpus=4", ["IDLE"], False, id="hardware unchanged"),
+            pytest.param(True, "cpus=8", ["IDLE"], False, id="node configuration unchanged"),
+            pytest.param(True, "cpus=4", ["IDLE"], True, id="node configuration changed"),
+            pytest.param(True, "cpus=4", ["MIXED"], False, id="jobs running"),
+        ),
+    )
+    def test_on_update_status(
+        self, mock_charm, mocker: MockerFixture, changed, conf, state, reregistered, leader
+    ) -> None:
+        """Test that `_on_update_status` re-registers the node if its hardware changed."""
+        integration = testing.Relation(
+            endpoint=SLURMD_INTEGRATION_NAME, interface="slurmd", remote_app_name="slurmctld"
+        )
+        gres = Gres(name="gpu", type="a100", file="/dev/nvidia0", cores=["0-7"])
+        fingerprint = "0c4a9e" if changed else EXAMPLE_FINGERPRINT
+
+        with mock_charm(
+            mock_charm.on.update_status(),
+            testing.State(
+                leader=leader, relations={integration}, stored_states={applied_hardware()}
+            ),
+        ) as manager:
+            slurmd = manager.charm.slurmd
+            mocker.patch.object(slurmd, "is_installed", return_value=True)
+            mocker.patch.object(
+                slurmd, "hardware_profile", return_value=hardware_profile(fingerprint)
+            )
+            mocker.patch.object(slurmd, "build_node", return_value=Node(cpus=8))
+            mocker.patch.object(slurmd, "build_gres", return_value=[gres])
+            mocker.patch.object(slurmd, "leaf_switch", return_value="ib-0c42a10300a0b000")
+            mocker.patch.object(slurmd, "exists", return_value=True)
+            mocker.patch.object(slurmd, "show_node", return_value={"state": state, "reason": ""})
+            mock_delete = mocker.patch.object(slurmd, "delete")
+            mocker.patch.object(slurmd, "reconfigure")
+            mocker.patch.object(slurmd, "pin_services")
+            mocker.patch("rdma.configure_ucx")
+            slurmd.conf = Node.from_str(conf)
+
+            result = manager.run()
+
+        applied = changed and state == ["IDLE"]
+        assert slurmd.conf.cpus == (8 if applied else int(conf.removeprefix("cpus=")))
+        assert mock_delete.called == reregistered
+        # Node data is republished whenever a hardware change is applied.
+        local_unit_data = result.get_relation(integration.id).local_unit_data
+        assert ("gres" in local_unit_data) == applied
+        if applied:
+            assert json.loads(local_unit_data["switch"]) == "ib-0c42a10300a0b000"
+        # Hardware changes that cannot be applied while jobs are running are retried.
+        stored = result.get_stored_state("_stored", owner_path="SlurmdCharm")
+        assert (fingerprint in stored.content["applied_hardware"]) == (applied or not changed)
+
+    def test_on_update_status_recabled(self, mock_charm, mocker: MockerFixture, leader) -> None:
+        """Test that `_on_update_status` republishes node data if the leaf switch changed."""
+        integration = testing.Relation(
+            endpoint=SLURMD_INTEGRATION_NAME, interface="slurmd", remote_app_name="slurmctld"
+        )
+
+        with mock_charm(
+            mock_charm.on.update_status(),
+            testing.State(
+                leader=leader, relations={integration}, stored_states={applied_hardware()}
+            ),
+        ) as manager:
+            slurmd = manager.charm.slurmd
+            mocker.patch.object(slurmd, "is_installed", return_value=True)
+            mocker.patch.object(slurmd, "hardware_profile", return_value=hardware_profile())
+            mocker.patch.object(slurmd, "build_gres", return_value=[])
+            # The node is moved from one leaf switch to another when the switch is refreshed.
+            mocker.patch.object(
+                slurmd,
+                "leaf_switch",
+                side_effect=["ib-0c42a10300a0b000", "ib-0c42a10300a0b100", "ib-0c42a10300a0b100"],
+            )
+            mock_delete = mocker.patch.object(slurmd, "delete")
+
+            state = manager.run()
+
+        mock_delete.assert_not_called()
+        local_unit_data = state.get_relation(integration.id).local_unit_data
+        assert json.loads(local_unit_data["switch"]) == "ib-0c42a10300a0b100"
+
     def test_bad_configuration(self, mock_charm, leader) -> None:
         """Test if the `slurmd` charm successfully blocks if a configuration field is invalid."""
         state = mock_charm.run(
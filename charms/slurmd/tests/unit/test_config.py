@@ -19,6 +19,7 @@ import pytest
 from config import ConfigManager
 from ops import ConfigData
 from pydantic import ValidationError
+from slurm_ops import PackageMirror, ReservationPolicy
 from slurmutils import Partition
 
 APP_NAME = "compute"
@@ -35,6 +36,8 @@ class TestConfigManager:
                     "default_node_state": "idle",
                     "default_node_reason": "",
                     "partition_config": "state=up maxtime=30-00:00:00",
+                    "system_reservation": "auto",
+                    "package_mirror": "",
                 },
                 id="idle no reason",
             ),
@@ -43,6 +46,8 @@ class TestConfigManager:
                     "default_node_state": "down",
                     "default_node_reason": "maintenance",
                     "partition_config": "state=up maxtime=10-00:00:00",
+                    "system_reservation": "none",
+                    "package_mirror": "/srv/slurm-mirror",
                 },
                 id="down with reason",
             ),
@@ -51,6 +56,8 @@ class TestConfigManager:
                     "default_node_state": "down",
                     "default_node_reason": "",
                     "partition_config": "state=down",
+                    "system_reservation": "cores=2 memory=4096",
+                    "package_mirror": "http://mirror.local/slurm",
                 },
                 id="down empty reason",
             ),
@@ -77,6 +84,12 @@ class TestConfigManager:
             assert config.default_node_reason == default_node_reason
 
         assert config.partition_config.dict() == partition_config.dict()
+        assert config.system_reservation == ReservationPolicy.from_str(
+            valid_charm_config["system_reservation"]
+        )
+        assert config.package_mirror == PackageMirror.from_str(
+            valid_charm_config["package_mirror"]
+        )
 
     @pytest.mark.parametrize(
         "invalid_charm_config",
@@ -86,6 +99,8 @@ class TestConfigManager:
                     "default_node_state": "invalid",
                     "default_node_reason": "",
                     "partition_config": "state=up",
+                    "system_reservation": "auto",
+                    "package_mirror": "",
                 },
                 id="invalid state",
             ),
@@ -94,9 +109,31 @@ class TestConfigManager:
                     "default_node_state": "idle",
                     "default_node_reason": "",
                     "partition_config": "invalidkey=value",
+                    "system_reservation": "auto",
+                    "package_mirror": "",
                 },
                 id="invalid partition",
             ),
+            pytest.param(
+                {
+                    "default_node_state": "idle",
+                    "default_node_reason": "",
+                    "partition_config": "state=up",
+                    "system_reservation": "cores=all",
+                    "package_mirror": "",
+                },
+                id="invalid system reservation",
+            ),
+            pytest.param(
+                {
+                    "default_node_state": "idle",
+                    "default_node_reason": "",
+                    "partition_config": "state=up",
+                    "system_reservation": "auto",
+                    "package_mirror": "slurm-mirror",
+                },
+                id="invalid package mirror",
+            ),
         ),
     )
     def test_load_invalid_config(self, invalid_charm_config: ConfigData) -> None:
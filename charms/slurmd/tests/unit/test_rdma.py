@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `slurmd` charmed operators `rdma` module."""
+
+from pathlib import Path
+
+import pytest
+import rdma
+from pyfakefs.fake_filesystem import FakeFilesystem
+from rdma import RDMAPort
+
+
+def _create_port(
+    fs: FakeFilesystem, device: str, model: str, link_layer: str, state: str, rate: str
+) -> None:
+    """Create the sysfs entries of an RDMA device with a single port."""
+    path = Path("/sys/class/infiniband") / device
+    fs.create_file(path / "hca_type", contents=f"{model}\n")
+    fs.create_file(path / "ports" / "1" / "link_layer", contents=f"{link_layer}\n")
+    fs.create_file(path / "ports" / "1" / "state", contents=f"{state}\n")
+    fs.create_file(path / "ports" / "1" / "rate", contents=f"{rate}\n")
+
+
+def test_rdma_ports(fs: FakeFilesystem) -> None:
+    """Test that only active RDMA ports are listed."""
+    _create_port(fs, "mlx5_0", "MT4123", "InfiniBand", "4: ACTIVE", "200 Gb/sec (4X HDR)")
+    _create_port(fs, "mlx5_1", "MT4119", "Ethernet", "4: ACTIVE", "25 Gb/sec (1X EDR)")
+    _create_port(fs, "mlx5_2", "MT4123", "InfiniBand", "1: DOWN", "10 Gb/sec (4X SDR)")
+
+    assert rdma.rdma_ports() == [
+        RDMAPort("mlx5_0", 1, "MT4123", "InfiniBand", 200),
+        RDMAPort("mlx5_1", 1, "MT4119", "Ethernet", 25),
+    ]
+
+
+@pytest.mark.parametrize(
+    "ports,expected",
+    (
+        pytest.param(
+            [
+                RDMAPort("mlx5_0", 1, "MT4123", "InfiniBand", 200),
+                RDMAPort("mlx5_1", 1, "MT4123", "InfiniBand", 200),
+                RDMAPort("mlx5_2", 1, "MT4115", "InfiniBand", 100),
+                RDMAPort("mlx5_3", 1, "MT4119", "Ethernet", 100),
+            ],
+            {
+                "UCX_NET_DEVICES": "mlx5_0:1,mlx5_1:1",
+                "UCX_TLS": "self,sm,rc_x,dc_x",
+                "UCX_RNDV_THRESH": "16384",
+            },
+            id="hdr",
+        ),
+        pytest.param(
+            [RDMAPort("mlx5_0", 1, "MT4115", "InfiniBand", 100)],
+            {
+                "UCX_NET_DEVICES": "mlx5_0:1",
+                "UCX_TLS": "self,sm,rc_x,dc_x",
+                "UCX_RNDV_THRESH": "8192",
+            },
+            id="edr",
+        ),
+        pytest.param(
+            [RDMAPort("mlx5_0", 1, "MT4119", "Ethernet", 25)],
+            {"UCX_NET_DEVICES": "mlx5_0:1", "UCX_TLS": "self,sm,rc_x", "UCX_RNDV_THRESH": "2048"},
+            id="roce",
+        ),
+        pytest.param(
+            [RDMAPort("qib0", 1, "InfiniPath_QLE7340", "InfiniBand", 40)],
+            {"UCX_NET_DEVICES": "qib0:1", "UCX_TLS": "self,sm,rc,ud", "UCX_RNDV_THRESH": "3072"},
+            id="verbs",
+        ),
+        pytest.param([], {}, id="no ports"),
+    ),
+)
+def test_ucx_profile(ports, expected) -> None:
+    """Test generating UCX profiles for RDMA ports."""
+    assert rdma.ucx_profile(ports) == expected
+
+
+def test_configure_ucx(fs: FakeFilesystem) -> None:
+    """Test that the UCX profile is written, and removed once no RDMA ports are active."""
+    _create_port(fs, "mlx5_0", "MT4123", "InfiniBand", "4: ACTIVE", "200 Gb/sec (4X HDR)")
+
+    rdma.configure_ucx()
+
+    content = Path("/etc/ucx/ucx.conf").read_text().splitlines()
+    assert content[1] == "# RDMA ports: mlx5_0 (MT4123, 200 Gb/s)"
+    assert content[2:] == [
+        "UCX_NET_DEVICES=mlx5_0:1",
+        "UCX_TLS=self,sm,rc_x,dc_x",
+        "UCX_RNDV_THRESH=16384",
+    ]
+
+    Path("/sys/class/infiniband/mlx5_0/ports/1/state").write_text("1: DOWN\n")
+    rdma.configure_ucx()
+
+    assert not Path("/etc/ucx/ucx.conf").exists()
+
+
+def test_configure_ucx_unmanaged(fs: FakeFilesystem) -> None:
+    """Test that UCX configuration files not generated by the charm are left untouched."""
+    _create_port(fs, "mlx5_0", "MT4123", "InfiniBand", "4: ACTIVE", "200 Gb/sec (4X HDR)")
+    fs.create_file("/etc/ucx/ucx.conf", contents="UCX_TLS=rc\n")
+
+    rdma.configure_ucx()
+    assert Path("/etc/ucx/ucx.conf").read_text() == "UCX_TLS=rc\n"
+
+    Path("/sys/class/infiniband/mlx5_0/ports/1/state").write_text("1: DOWN\n")
+    rdma.configure_ucx()
+    assert Path("/etc/ucx/ucx.conf").exists()
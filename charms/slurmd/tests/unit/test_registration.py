@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `slurmd` charmed operators `registration` module."""
+
+from unittest.mock import Mock
+
+import pytest
+from pytest_mock import MockerFixture
+from registration import RegistrationScheduler
+from slurm_ops import SlurmOpsError
+
+
+def test_delay() -> None:
+    """Test that registrations are spread deterministically over the registration window."""
+    schedulers = [RegistrationScheduler(unit, 100) for unit in range(100)]
+    delays = sorted(scheduler.delay for scheduler in schedulers)
+
+    assert schedulers[0].window == 49.5
+    assert all(0 <= delay < 49.5 for delay in delays)
+    # Consecutive unit numbers are spread evenly, so no two units register at the same time.
+    assert min(b - a for a, b in zip(delays, delays[1:])) > 0.1
+    assert RegistrationScheduler(7, 100).delay == schedulers[7].delay
+    assert RegistrationScheduler(1000, 10000).window == 120
+    assert RegistrationScheduler(3, 1).delay == 0
+
+
+def test_register(mocker: MockerFixture) -> None:
+    """Test that only the first registration of a node waits for its registration slot."""
+    sleep = mocker.patch("time.sleep")
+    register = Mock()
+    scheduler = RegistrationScheduler(1, 11, spacing=1)
+
+    info = scheduler.register(register)
+
+    assert info.delay == pytest.approx(scheduler.offset * 10)
+    sleep.assert_called_once_with(info.delay)
+    register.assert_called_once()
+
+    sleep.reset_mock()
+    assert scheduler.register(register, first=False).delay == 0
+    sleep.assert_not_called()
+    assert register.call_count == 2
+
+
+def test_register_fail(mocker: MockerFixture) -> None:
+    """Test that failed registrations are not retried."""
+    mocker.patch("time.sleep")
+    register = Mock(side_effect=SlurmOpsError("scontrol timed out"))
+
+    with pytest.raises(SlurmOpsError):
+        RegistrationScheduler(0, 1).register(register)
+
+    register.assert_called_once()
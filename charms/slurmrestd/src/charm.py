@@ -39,9 +39,14 @@ refresh.__doc__ = """Refresh status of the `slurmrestd` unit after an event hand
 class SlurmrestdCharm(ops.CharmBase):
     """Charmed operator for `slurmrestd`, Slurm's REST API service."""
 
+    _stored = ops.StoredState()
+
     def __init__(self, framework: ops.Framework) -> None:
         super().__init__(framework)
 
+        # Required to skip restarting `slurmrestd` if the Slurm configuration has not changed.
+        self._stored.set_default(slurmconfig_hash="")
+
         self.slurmrestd = SlurmrestdManager(snap=False)
         framework.observe(self.on.install, self._on_install)
         framework.observe(self.on.update_status, self._on_update_status)
@@ -93,9 +98,23 @@ class SlurmrestdCharm(ops.CharmBase):
     def _on_slurmctld_ready(self, event: SlurmctldReadyEvent) -> None:
         """Handle when controller data is ready from `slurmctld`."""
         data = self.slurmctld.get_controller_data(event.relation.id)
-
         try:
+            # `slurmrestd` must be restarted to load a new auth key, even if the
+            # Slurm configuration is unchanged.
+            key_ids = [entry.get("kid") for entry in self.slurmrestd.key.get()["keys"]]
+            key_changed = key_ids != [data.auth_key_id]
             self.slurmrestd.key.set({"key": data.auth_key, "keyid": data.auth_key_id})
+            if (
+                not key_changed
+                and data.slurmconfig_hash == self._stored.slurmconfig_hash
+                and self.slurmrestd.service.is_active()
+            ):
+                logger.debug(
+                    "slurm configuration '%s' has already been applied. skipping restart",
+                    data.slurmconfig_hash,
+                )
+                return
+
             for name, config in data.slurmconfig.items():
                 self.slurmrestd.config.includes[name].dump(config)
             self.slurmrestd.service.enable()
@@ -107,6 +126,8 @@ class SlurmrestdCharm(ops.CharmBase):
                 ops.BlockedStatus("Failed to start `slurmrestd`. See `juju debug-log` for details")
             )
 
+        self._stored.slurmconfig_hash = data.slurmconfig_hash
+
     @refresh
     def _on_slurmctld_disconnected(self, event: SlurmctldDisconnectedEvent) -> None:
         """Handle when unit is disconnected from `slurmctld`."""
@@ -20,14 +20,18 @@ from pathlib import Path
 
 import ops
 import pytest
-from charmed_slurm_slurmctld_interface import AUTH_KEY_LABEL
+from charmed_slurm_slurmctld_interface import AUTH_KEY_LABEL, ControllerData, encoder
 from constants import SLURMRESTD_INTEGRATION_NAME
 from ops import testing
 from pytest_mock import MockerFixture
+from slurmutils import SlurmConfig
 
 EXAMPLE_AUTH_KEY = "xyz123=="
 EXAMPLE_AUTH_KEY_ID = "12345678-90ab-cdef-1234-567890abcdef"
 EXAMPLE_CONTROLLERS = ["juju-988225-0:6817", "juju-988225-1:6817"]
+EXAMPLE_SLURM_CONFIG = {
+    "slurm.conf": SlurmConfig(clustername="charmed-hpc", slurmctldhost=["juju-988225-0"]),
+}
 
 
 @pytest.fixture
@@ -49,6 +53,74 @@ def auth_key_secret() -> testing.Secret:
 class TestSlurmrestdCharm:
     """Unit tests for the `slurmrestd` charmed operator."""
 
+    @pytest.mark.parametrize(
+        "applied,key_id,restarted",
+        (
+            pytest.param(True, EXAMPLE_AUTH_KEY_ID, False, id="configuration applied"),
+            pytest.param(False, EXAMPLE_AUTH_KEY_ID, True, id="configuration not applied"),
+            pytest.param(True, "old-key-id", True, id="auth key changed"),
+        ),
+    )
+    def test_on_slurmctld_ready(
+        self,
+        mock_charm,
+        mocker: MockerFixture,
+        leader,
+        auth_key_secret,
+        applied,
+        key_id,
+        restarted,
+    ) -> None:
+        """Test that `_on_slurmctld_ready` only restarts `slurmrestd` on config or auth key changes."""
+        data = ControllerData(slurmconfig=EXAMPLE_SLURM_CONFIG)
+        key_file_path = Path("/etc/slurm/slurm.jwks")
+        key_file_path.write_text(json.dumps({"keys": [{"kid": key_id, "k": "old"}]}))
+        integration = testing.Relation(
+            endpoint=SLURMRESTD_INTEGRATION_NAME,
+            interface="slurmrestd",
+            remote_app_name="slurmctld",
+            remote_app_data={
+                "auth_secret_id": json.dumps(auth_key_secret.id),
+                "slurmconfig": encoder(data.slurmconfig),
+                "slurmconfig_hash": encoder(data.slurmconfig_hash),
+            },
+        )
+        stored_state = testing.StoredState(
+            owner_path="SlurmrestdCharm",
+            content={"slurmconfig_hash": data.slurmconfig_hash if applied else ""},
+        )
+
+        with mock_charm(
+            mock_charm.on.relation_changed(integration),
+            testing.State(
+                leader=leader,
+                relations={integration},
+                secrets={auth_key_secret},
+                stored_states={stored_state},
+            ),
+        ) as manager:
+            slurmrestd = manager.charm.slurmrestd
+            mocker.patch.object(slurmrestd, "is_installed", return_value=True)
+            mocker.patch.object(slurmrestd.service, "is_active", return_value=True)
+            mock_restart = mocker.patch.object(slurmrestd.service, "restart")
+            mocker.patch("shutil.chown")  # User/group `slurm` doesn't exist on host.
+
+            state = manager.run()
+
+        if restarted:
+            mock_restart.assert_called_once()
+            assert Path("/etc/slurm/slurm.conf").exists()
+        else:
+            mock_restart.assert_not_called()
+            assert not Path("/etc/slurm/slurm.conf").exists()
+
+        # The auth key is always set, even if `slurmrestd` is not restarted.
+        assert [entry["kid"] for entry in json.loads(key_file_path.read_text())["keys"]] == [
+            EXAMPLE_AUTH_KEY_ID
+        ]
+        stored = state.get_stored_state("_stored", owner_path="SlurmrestdCharm")
+        assert stored.content["slurmconfig_hash"] == data.slurmconfig_hash
+
     def test_on_secret_changed_success(
         self, mock_charm, mocker: MockerFixture, leader, auth_key_secret
     ) -> None:
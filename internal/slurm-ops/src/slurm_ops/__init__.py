@@ -28,12 +28,38 @@ __all__ = [
     "SLURMRESTD_GROUP",
     "SLURMRESTD_USER",
     "UNIT_TO_NODE_NAME_RELABEL_CONFIG",
+    "InstallPlan",
+    "PackageMirror",
+    "ReconfigureAction",
     "SlurmOpsError",
+    "classify_changes",
+    "classify_node_changes",
+    # From `control.py`
+    "ControlBackend",
+    "ScontrolBackend",
+    # From `fabric.py`
+    "FabricNode",
+    # From `hardware.py`
+    "GPUDevice",
+    "HardwareProfile",
+    "LogicalCPU",
+    "MIGDevice",
+    # From `nodes.py`
+    "NodeInventory",
+    # From `reservation.py`
+    "Reservation",
+    "ReservationPolicy",
+    # From `restapi.py`
+    "SlurmrestdBackend",
+    "SlurmrestdClient",
     # From `sackd.py`
     "SackdManager",
     # From `scontrol.py`
+    "LatencyInfo",
+    "ScontrolRunner",
     "scontrol",
     # From `slurmctld.py`
+    "PartitionEntry",
     "SlurmctldManager",
     # From `slurmd.py`
     "SlurmdManager",
@@ -43,6 +69,7 @@ __all__ = [
     "SlurmrestdManager",
 ]
 
+from .control import ControlBackend, ScontrolBackend
 from .core import (
     NODE_EXPORTER_COLLECTORS,
     NODE_EXPORTER_PLUGS,
@@ -55,12 +82,22 @@ from .core import (
     SLURMRESTD_GROUP,
     SLURMRESTD_USER,
     UNIT_TO_NODE_NAME_RELABEL_CONFIG,
+    InstallPlan,
+    PackageMirror,
+    ReconfigureAction,
     SecretManager,
     SlurmOpsError,
+    classify_changes,
+    classify_node_changes,
 )
+from .fabric import FabricNode
+from .hardware import GPUDevice, HardwareProfile, LogicalCPU, MIGDevice
+from .nodes import NodeInventory
+from .reservation import Reservation, ReservationPolicy
+from .restapi import SlurmrestdBackend, SlurmrestdClient
 from .sackd import SackdManager
-from .scontrol import scontrol
-from .slurmctld import SlurmctldManager
+from .scontrol import LatencyInfo, ScontrolRunner, scontrol
+from .slurmctld import PartitionEntry, SlurmctldManager
 from .slurmd import SlurmdManager
 from .slurmdbd import SlurmdbdManager
 from .slurmrestd import SlurmrestdManager
@@ -0,0 +1,116 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Backends for querying and controlling a running Slurm cluster."""
+
+__all__ = ["ControlBackend", "ScontrolBackend"]
+
+import json
+from collections.abc import Mapping
+from typing import Any, Protocol
+
+from slurm_ops.core import SlurmOpsError
+from slurm_ops.scontrol import scontrol
+
+
+class ControlBackend(Protocol):  # pragma: no cover
+    """Protocol for defining backends that query and control a running Slurm cluster."""
+
+    def ping(self) -> list[dict[str, Any]]:
+        """Get the ping status of all controllers."""
+        raise NotImplementedError
+
+    def show_nodes(self, name: str | None = None) -> list[dict[str, Any]]:
+        """Get the information of all nodes, or of a single node if `name` is set.
+
+        An empty list is returned if `name` is set, but the node is not registered.
+        """
+        raise NotImplementedError
+
+    def update_node(self, name: str, *, state: str, reason: str = "") -> None:
+        """Update the state of a node."""
+        raise NotImplementedError
+
+    def configure_node(self, name: str, config: Mapping[str, Any]) -> None:
+        """Update the configuration of a registered node, e.g. its `weight` or `features`."""
+        raise NotImplementedError
+
+    def delete_node(self, name: str) -> None:
+        """Delete a node."""
+        raise NotImplementedError
+
+    def reconfigure(self) -> None:
+        """Instruct all Slurm daemons to re-read their configuration files."""
+        raise NotImplementedError
+
+
+class ScontrolBackend(ControlBackend):
+    """Query and control a running Slurm cluster with `scontrol ...` commands."""
+
+    def ping(self) -> list[dict[str, Any]]:
+        """Get the ping status of all controllers with `scontrol ping`."""
+        # Callers such as `SlurmctldManager.wait_for_ping` poll on their own interval,
+        # so don't retry failed pings here.
+        stdout, _ = scontrol("ping", "--json", retries=0)
+        return json.loads(stdout)["pings"]
+
+    def show_nodes(self, name: str | None = None) -> list[dict[str, Any]]:
+        """Get the information of nodes with `scontrol --json show node[s]`.
+
+        Raises:
+            SlurmOpsError: Raised if `scontrol` output cannot be parsed.
+        """
+        if name is None:
+            stdout, _ = scontrol("--json", "show", "nodes")
+        else:
+            # A non-zero exit code means that the node is not registered with Slurm.
+            stdout, returncode = scontrol("--json", "show", "node", name, check=False)
+            if returncode != 0:
+                return []
+
+        try:
+            return json.loads(stdout)["nodes"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise SlurmOpsError(f"failed to parse node information from scontrol. reason: {e}")
+
+    def update_node(self, name: str, *, state: str, reason: str = "") -> None:
+        """Update the state of a node with `scontrol update`."""
+        cmd = ["update", f"nodename={name}", f"state={state}"]
+        if reason:
+            # Wrap reason with quotes if it isn't. Slurm requires reasons to be in quotes.
+            if not (reason.startswith(("'", '"')) and reason.endswith(("'", '"'))):
+                reason = f"'{reason}'"
+
+            cmd.append(f"reason={reason}")
+
+        scontrol(*cmd)
+
+    def configure_node(self, name: str, config: Mapping[str, Any]) -> None:
+        """Update the configuration of a registered node with `scontrol update`."""
+        cmd = ["update", f"nodename={name}"]
+        for parameter, value in config.items():
+            if isinstance(value, list):
+                value = ",".join(str(v) for v in value)
+
+            cmd.append(f"{parameter}={value}")
+
+        scontrol(*cmd)
+
+    def delete_node(self, name: str) -> None:
+        """Delete a node with `scontrol delete`."""
+        scontrol("delete", f"nodename={name}")
+
+    def reconfigure(self) -> None:
+        """Instruct all Slurm daemons to re-read their configuration files with `scontrol`."""
+        scontrol("reconfigure")
@@ -19,6 +19,8 @@ __all__ = [
     "SecretManager",
     "SlurmManager",
     # From `config.py`
+    "CacheInfo",
+    "ConfigTransaction",
     "SlurmConfigManager",
     # From `constants.py`
     "NODE_EXPORTER_COLLECTORS",
@@ -34,13 +36,26 @@ __all__ = [
     "UNIT_TO_NODE_NAME_RELABEL_CONFIG",
     # From `errors.py`
     "SlurmOpsError",
+    # From `mirror.py`
+    "PackageMirror",
     # From `options.py`
     "marshal_options",
     "parse_options",
+    # From `provision.py`
+    "InstallPlan",
+    # From `reconfigure.py`
+    "LIVE_NODE_PARAMETERS",
+    "RESTART_REQUIRED_PARAMETERS",
+    "ReconfigureAction",
+    "classify_changes",
+    "classify_node_changes",
+    # From `snapshot.py`
+    "Snapshot",
+    "SnapshotStore",
 ]
 
 from .base import SecretManager, SlurmManager
-from .config import SlurmConfigManager
+from .config import CacheInfo, ConfigTransaction, SlurmConfigManager
 from .constants import (
     NODE_EXPORTER_COLLECTORS,
     NODE_EXPORTER_PLUGS,
@@ -55,4 +70,14 @@ from .constants import (
     UNIT_TO_NODE_NAME_RELABEL_CONFIG,
 )
 from .errors import SlurmOpsError
+from .mirror import PackageMirror
 from .options import marshal_options, parse_options
+from .provision import InstallPlan
+from .reconfigure import (
+    LIVE_NODE_PARAMETERS,
+    RESTART_REQUIRED_PARAMETERS,
+    ReconfigureAction,
+    classify_changes,
+    classify_node_changes,
+)
+from .snapshot import Snapshot, SnapshotStore
@@ -23,12 +23,13 @@ import base64
 import datetime
 import json
 import logging
+import os
 import secrets
 import shutil
 import socket
 import textwrap
 from abc import ABC, abstractmethod
-from collections.abc import Iterator, Mapping
+from collections.abc import Callable, Iterator, Mapping
 from contextlib import contextmanager
 from functools import cached_property
 from pathlib import Path
@@ -55,6 +56,7 @@ from cryptography.hazmat.primitives.asymmetric import rsa
 
 from .errors import SlurmOpsError
 from .options import marshal_options, parse_options
+from .provision import InstallPlan
 
 _logger = logging.getLogger(__name__)
 UBUNTU_HPC_PPA_KEY = """
@@ -90,6 +92,43 @@ fy6i2AnB3kUI27D4HY2YSlXLSRbjiSxTfVwNCzDsIh7Czefsm6ITK2+cVWs0hNQ=
 -----END PGP PUBLIC KEY BLOCK-----
 """
 UBUNTU_HPC_SLURM_PPA_URI = "https://ppa.launchpadcontent.net/ubuntu-hpc/slurm-wlm-25.11/ubuntu"
+DPKG_STATUS_FILE = Path("/var/lib/dpkg/status")
+SNAP_CURRENT_REVISION = Path("/snap/slurm/current")
+
+# Cache of installed versions keyed on package name. Each entry records the state of the package
+# database the version was retrieved from, and either the version or the lookup error message.
+_version_cache: dict[str, tuple[Any, str | SlurmOpsError]] = {}
+
+
+def _cached_version(package: str, key: Any, lookup: Callable[[], str]) -> str:
+    """Get the installed version of a package, only looking it up if the package database changed.
+
+    Args:
+        package: Name of the package.
+        key: State of the package database, e.g. the modification time of the dpkg status file.
+            If `None`, the state cannot be determined and the version is always looked up.
+        lookup: Function to look up the installed version of the package.
+
+    Raises:
+        SlurmOpsError: Raised if the version of the package cannot be looked up.
+    """
+    if key is None:
+        return lookup()
+
+    entry = _version_cache.get(package)
+    if entry is None or entry[0] != key:
+        try:
+            result: str | SlurmOpsError = lookup()
+        except SlurmOpsError as e:
+            result = e
+
+        entry = (key, result)
+        _version_cache[package] = entry
+
+    if isinstance(entry[1], SlurmOpsError):
+        raise SlurmOpsError(entry[1].message)
+
+    return entry[1]
 
 
 class OpsManager(Protocol):  # pragma: no cover
@@ -104,6 +143,9 @@ class OpsManager(Protocol):  # pragma: no cover
     def install(self) -> None:  # noqa D102
         raise NotImplementedError
 
+    def plan_install(self, plan: InstallPlan) -> None:  # noqa D102
+        raise NotImplementedError
+
     def version(self) -> str:  # noqa D102
         raise NotImplementedError
 
@@ -172,8 +214,29 @@ class _AptManager(OpsManager):
         self._create_state_save_location()
         self._apply_overrides()
 
+    def plan_install(self, plan: InstallPlan) -> None:
+        """Add the steps to install Slurm using the `slurm-wlm` Debian package set to a plan."""
+        plan.add_repository(lambda: self._init_ppa(UBUNTU_HPC_SLURM_PPA_URI))
+        plan.add_packages(*self._packages())
+        plan.add_configure(self._create_state_save_location)
+        plan.add_configure(self._apply_overrides)
+
     def version(self) -> str:
-        """Get the current version of Slurm installed on the system."""
+        """Get the current version of Slurm installed on the system.
+
+        Notes:
+            - The version is cached until the dpkg status file is modified, e.g. when
+              packages are installed, upgraded, or removed.
+        """
+        try:
+            key = DPKG_STATUS_FILE.stat().st_mtime_ns
+        except FileNotFoundError:
+            key = None
+
+        return _cached_version(self._service_name, key, self._version)
+
+    def _version(self) -> str:
+        """Look up the current version of Slurm installed on the system."""
         try:
             return apt.DebianPackage.from_installed_package(self._service_name).version.number
         except apt.PackageNotFoundError as e:
@@ -237,6 +300,15 @@ class _AptManager(OpsManager):
         Raises:
             SlurmOpsError: Raised if `apt` fails to install the required Slurm packages.
         """
+        packages = self._packages()
+        _logger.debug("installing packages %s with apt", packages)
+        try:
+            apt.add_package(packages)
+        except (apt.PackageNotFoundError, apt.PackageError) as e:
+            raise SlurmOpsError(f"failed to install {self._service_name}. reason: {e}")
+
+    def _packages(self) -> list[str]:
+        """Get the Slurm service package and other necessary packages."""
         packages = [self._service_name]
         match self._service_name:
             case "sackd":
@@ -253,11 +325,7 @@ class _AptManager(OpsManager):
                     self._service_name,
                 )
 
-        _logger.debug("installing packages %s with apt", packages)
-        try:
-            apt.add_package(packages)
-        except (apt.PackageNotFoundError, apt.PackageError) as e:
-            raise SlurmOpsError(f"failed to install {self._service_name}. reason: {e}")
+        return packages
 
     def _create_state_save_location(self) -> None:
         """Create `StateSaveLocation` for Slurm services.
@@ -414,6 +482,14 @@ class _SnapManager(OpsManager):
         self._create_state_save_location()
         self._apply_overrides()
 
+    def plan_install(self, plan: InstallPlan) -> None:
+        """Add the steps to install Slurm using the `slurm` snap to a plan."""
+        plan.add_snap(
+            "slurm", lambda: snap("install", "slurm", "--channel", "23.11/stable", "--classic")
+        )
+        plan.add_configure(self._create_state_save_location)
+        plan.add_configure(self._apply_overrides)
+
     def is_installed(self) -> bool:
         """Check if the Slurm snap is installed."""
         try:
@@ -423,7 +499,21 @@ class _SnapManager(OpsManager):
             return False
 
     def version(self) -> str:
-        """Get the current version of the `slurm` snap installed on the system."""
+        """Get the current version of the `slurm` snap installed on the system.
+
+        Notes:
+            - The version is cached until the revision of the installed `slurm` snap changes.
+        """
+        try:
+            key = os.readlink(SNAP_CURRENT_REVISION)
+        except OSError:
+            key = None
+
+        return _cached_version("slurm", key, self._version)
+
+    @staticmethod
+    def _version() -> str:
+        """Look up the current version of the `slurm` snap installed on the system."""
         info = yaml.safe_load(snap("info", "slurm")[0])
         version = info.get("installed")
         if version is None:
@@ -736,11 +826,13 @@ class SlurmManager(ABC):
         self._service = service
         self._ops_manager = _SnapManager() if snap else _AptManager(service)
         self._env_manager = self._ops_manager.env_manager_for(service)
+        self._options: dict[str, Any] | None = None
 
         self.service = self._ops_manager.service_manager_for(service)
         self.key = _SlurmSecretManager(self._ops_manager, user=self.user, group=self.group)
         self.jwt = _JWTSecretManager(self._ops_manager, user=self.user, group=self.group)
         self.install = self._ops_manager.install
+        self.plan_install = self._ops_manager.plan_install
         self.is_installed = self._ops_manager.is_installed
         self.version = self._ops_manager.version
 
@@ -776,15 +868,52 @@ class SlurmManager(ABC):
         except (SystemdError, SnapError) as e:
             raise SlurmOpsError(f"failed to reconfigure Slurm service '{self._service}'") from e
 
+    @contextmanager
+    def options_session(self) -> Iterator[None]:
+        """Batch reads and writes of `<SERVICE>_OPTIONS` in the service environment file.
+
+        Notes:
+            - `<SERVICE>_OPTIONS` is loaded once when the session starts. Options read and
+              set within the session use the loaded options rather than the environment file.
+            - The environment file is written once when the session ends, and only if the
+              options were changed. Changes are discarded if the session exits with an error.
+            - Nested sessions are merged into the outermost session.
+
+        Examples:
+            >>> with slurmd.options_session():
+            ...     slurmd.conf = slurmd.build_node()
+            ...     slurmd.dynamic = True
+            ...     slurmd.name = "slurmd-0"
+        """
+        if self._options is not None:
+            yield
+            return
+
+        options = self._load_options()
+        self._options = dict(options)
+        try:
+            yield
+            if self._options != options:
+                self._save_options(self._options)
+        finally:
+            self._options = None
+
     @contextmanager
     def _edit_options(self) -> Iterator[dict[str, Any]]:
         """Edit `<SERVICE>_OPTIONS` in the service environment file."""
+        if self._options is not None:
+            yield self._options
+            return
+
         options = self._load_options()
         yield options
         self._save_options(options)
 
     def _load_options(self) -> dict[str, Any]:
         """Load `<SERVICE>_OPTIONS` from the service environment file."""
+        if self._options is not None:
+            return dict(self._options)
+
         return parse_options(self._env_manager.get(f"{self._service.upper()}_OPTIONS") or "")
 
     def _save_options(self, options: Mapping[str, Any]) -> None:
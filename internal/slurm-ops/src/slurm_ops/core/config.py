@@ -14,16 +14,180 @@
 
 """Configuration managers for Slurm operations managers."""
 
+import copy
+import logging
+import os
 import shutil
+import threading
 from collections.abc import Iterable, Iterator, Mapping
 from contextlib import contextmanager
 from os import PathLike
 from pathlib import Path
 from types import MappingProxyType
-from typing import Any
+from typing import Any, NamedTuple
 
 from slurmutils import BaseEditor
 
+from .snapshot import Snapshot, SnapshotStore
+
+_logger = logging.getLogger(__name__)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for the parsed configuration cache.
+
+    Attributes:
+        hits: Number of loads served from the cache.
+        misses: Number of loads that required the configuration file to be parsed.
+        size: Number of parsed configuration files currently held in the cache.
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+
+class _ParseCache:
+    """Process-wide cache of parsed configuration files.
+
+    Notes:
+        - Entries are keyed on the editor type and path of the configuration file, and are
+          only valid while the file's inode, modification time, and size are unchanged.
+        - Callers are always handed a deep copy of the cached model so that mutating a loaded
+          configuration cannot corrupt the cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[type, Path], tuple[tuple[int, int, int], Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, editor: Any, file: Path) -> Any:
+        """Load a configuration file, parsing it only if the cached model is stale."""
+        try:
+            info = file.stat()
+        except FileNotFoundError:
+            # Let the editor raise its own error for missing files.
+            return editor.load(file)
+
+        key = (type(editor), file.absolute())
+        identity = (info.st_ino, info.st_mtime_ns, info.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == identity:
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            self.misses += 1
+
+        config = editor.load(file)
+        with self._lock:
+            self._entries[key] = (identity, config)
+
+        return copy.deepcopy(config)
+
+    def invalidate(self, file: Path) -> None:
+        """Drop all cached models for a configuration file."""
+        file = file.absolute()
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == file]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached models and reset cache statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Get cache statistics."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, len(self._entries))
+
+
+_parse_cache = _ParseCache()
+
+
+class _DirectoryIndex:
+    """Index of the file names within a configuration directory.
+
+    Notes:
+        - The index is built with a single directory scan and is then updated incrementally
+          as configuration managers create and delete files. The directory is only rescanned
+          if its modification time no longer matches the last time the index was updated,
+          e.g. if a file was created or removed by another process.
+        - `version` is incremented whenever the set of indexed file names changes so that
+          views built on top of the index can be cached until the directory changes.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+        self._mtime: int | None = None
+        self._names: set[str] = set()
+        self.version = 0
+
+    @property
+    def names(self) -> set[str]:
+        """Get the file names within the directory."""
+        self._refresh()
+        return self._names
+
+    def add(self, name: str) -> None:
+        """Add a file created by a configuration manager to the index."""
+        if self.version == 0:
+            self._refresh()
+
+        if name not in self._names:
+            self._names.add(name)
+            self.version += 1
+        self._mtime = self._stat()
+
+    def discard(self, name: str) -> None:
+        """Remove a file deleted by a configuration manager from the index."""
+        if self.version == 0:
+            self._refresh()
+
+        if name in self._names:
+            self._names.discard(name)
+            self.version += 1
+        self._mtime = self._stat()
+
+    def _stat(self) -> int | None:
+        try:
+            return self._directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> None:
+        mtime = self._stat()
+        if mtime == self._mtime and self.version > 0:
+            return
+
+        try:
+            with os.scandir(self._directory) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            names = set()
+
+        self._mtime = mtime
+        if names != self._names or self.version == 0:
+            self._names = names
+            self.version += 1
+
+
+_directory_indexes: dict[Path, _DirectoryIndex] = {}
+
+
+def _directory_index(directory: Path) -> _DirectoryIndex:
+    """Get the process-wide index for a configuration directory."""
+    directory = directory.absolute()
+    if directory not in _directory_indexes:
+        _directory_indexes[directory] = _DirectoryIndex(directory)
+
+    return _directory_indexes[directory]
+
 
 class IncludeMapping[T: BaseEditor](Mapping):
     """Map of include file names to `SlurmConfigManager` instances.
@@ -96,10 +260,20 @@ class SlurmConfigManager[T: BaseEditor]:
         mode: File access mode to assign the configuration file.
         user: System user that owns the managed configuration file.
         group: System group that owns the managed configuration file.
+        store:
+            (Optional) Store to save snapshots of the configuration file to. If not set,
+            snapshots are saved as `.snapshot` copies next to the configuration file.
     """
 
     def __init__(
-        self, editor: type[T], file: str | PathLike, mode: int, user: str, group: str
+        self,
+        editor: type[T],
+        file: str | PathLike,
+        mode: int,
+        user: str,
+        group: str,
+        *,
+        store: SnapshotStore | None = None,
     ) -> None:
         # Cast to `Any` as we only want `editor` to be subtype of `BaseEditor`,
         # but not be a `BaseEditor` object.
@@ -108,6 +282,13 @@ class SlurmConfigManager[T: BaseEditor]:
         self._mode = mode
         self._user = user
         self._group = group
+        self._store = store
+        self._includes: tuple[int, MappingProxyType[str, SlurmConfigManager]] | None = None
+        self._snapshots: tuple[int, MappingProxyType[str, SlurmConfigManager]] | None = None
+
+    @property
+    def _index(self) -> _DirectoryIndex:
+        return _directory_index(self.path.parent)
 
     @property
     def name(self) -> str:
@@ -122,36 +303,47 @@ class SlurmConfigManager[T: BaseEditor]:
     @property
     def includes(self) -> MappingProxyType[str, "SlurmConfigManager"]:
         """Get paths to additional configuration files."""
-        return MappingProxyType(
-            IncludeMapping(
-                [
-                    p
-                    for p in self.path.parent.glob(f"{self.path.name}.*")
-                    if p.suffix != ".snapshot"
-                ],
-                self._editor.__class__,
-                path=self.path.parent,
-                mode=self._mode,
-                user=self._user,
-                group=self._group,
-            )
-        )
-
-    @property
-    def snapshots(self) -> MappingProxyType[str, "SlurmConfigManager"]:
-        """Get paths to configuration file snapshots."""
-        return MappingProxyType(
-            {
-                p.name: SlurmConfigManager(
+        names = self._index.names
+        if self._includes is None or self._includes[0] != self._index.version:
+            includes = MappingProxyType(
+                IncludeMapping(
+                    [
+                        self.path.parent / n
+                        for n in sorted(names)
+                        if n.startswith(f"{self.name}.") and not n.endswith(".snapshot")
+                    ],
                     self._editor.__class__,
-                    file=p,
+                    path=self.path.parent,
                     mode=self._mode,
                     user=self._user,
                     group=self._group,
                 )
-                for p in self.path.parent.glob(f"{self.path.name}*.snapshot")
-            }
-        )
+            )
+            self._includes = (self._index.version, includes)
+
+        return self._includes[1]
+
+    @property
+    def snapshots(self) -> MappingProxyType[str, "SlurmConfigManager"]:
+        """Get paths to configuration file snapshots."""
+        names = self._index.names
+        if self._snapshots is None or self._snapshots[0] != self._index.version:
+            snapshots = MappingProxyType(
+                {
+                    n: SlurmConfigManager(
+                        self._editor.__class__,
+                        file=self.path.parent / n,
+                        mode=self._mode,
+                        user=self._user,
+                        group=self._group,
+                    )
+                    for n in sorted(names)
+                    if n.startswith(self.name) and n.endswith(".snapshot")
+                }
+            )
+            self._snapshots = (self._index.version, snapshots)
+
+        return self._snapshots[1]
 
     def exists(self) -> bool:
         """Check whether the configuration file exists."""
@@ -159,33 +351,62 @@ class SlurmConfigManager[T: BaseEditor]:
 
     def create(self) -> None:
         """Create an empty configuration file with file mode and user/group ownership."""
-        # This "odd" context manager invocation enables us to ensure that the configuration
-        # file is created with the correct owner, group, and mode, but not overwrite any
-        # pre-existing content if the file already exists.
-        with self.edit() as _:
-            pass
+        # Do not overwrite any pre-existing content if the file already exists,
+        # but still ensure that the file has the correct owner, group, and mode.
+        if self.exists():
+            self._set_permissions(self.path)
+        else:
+            self.dump(self._editor.__model__())
 
     def load(self) -> Any:
-        """Load the configuration file."""
-        return self._editor.load(self._file)
+        """Load the configuration file.
+
+        Notes:
+            - Parsed configuration is cached process-wide until the configuration file is
+              modified. Each call returns a new copy that is safe to mutate.
+        """
+        return _parse_cache.load(self._editor, self.path)
 
-    def dump(self, config: Any) -> None:
+    def dump(self, config: Any) -> bool:
         """Dump a new configuration into the configuration file.
 
+        Returns:
+            True if the configuration file was changed, False if the current content of the
+            configuration file already matches `config`.
+
         Warnings:
             - This method will overwrite the entire content of the configuration file.
               If you just want to update the content of the current configuration file,
               use the `edit` method instead.
         """
-        self._editor.dump(config, self._file, mode=self._mode, user=self._user, group=self._group)
+        content = self._render(config)
+        if content is None:
+            return False
+
+        _replace([(self, content)])
+        return True
+
+    @contextmanager
+    def transaction(self) -> Iterator["ConfigTransaction"]:
+        """Stage edits to the configuration file and its includes, then commit them atomically.
+
+        Notes:
+            - Staged edits are only written if the `with` block exits without an exception.
+            - See `ConfigTransaction` for how staged edits are committed.
+        """
+        transaction = ConfigTransaction(self)
+        yield transaction
+        transaction.commit()
 
     @contextmanager
     def edit(self) -> Iterator[Any]:
-        """Edit the contents of the current configuration file."""
-        with self._editor.edit(
-            self._file, mode=self._mode, user=self._user, group=self._group
-        ) as config:
-            yield config
+        """Edit the contents of the current configuration file.
+
+        Notes:
+            - The configuration file is not rewritten if the edited configuration is unchanged.
+        """
+        with self.transaction() as transaction:
+            yield transaction.edit()
 
     def merge(self) -> None:
         """Merge 'include' files into the main configuration file."""
@@ -195,18 +416,209 @@ class SlurmConfigManager[T: BaseEditor]:
                 config.update(include)
 
     def save(self) -> None:
-        """Create a snapshot of the current configuration file."""
-        for p in [self.path] + [include.path for include in self.includes.values()]:
+        """Create a snapshot of the current configuration file and its includes."""
+        files = [self.path] + [include.path for include in self.includes.values()]
+        if self._store is not None:
+            self._store.save(files, label=self.name)
+            return
+
+        for p in files:
+            snapshot = p.with_suffix(p.suffix + ".snapshot")
             try:
-                shutil.copy(p, p.with_suffix(p.suffix + ".snapshot"))
+                shutil.copy(p, snapshot)
             except FileNotFoundError:
-                pass
+                continue
+
+            self._index.add(snapshot.name)
+
+    def restore(self, snapshot_id: str | None = None) -> None:
+        """Restore the current configuration file and its includes from a snapshot.
+
+        Args:
+            snapshot_id:
+                (Optional) ID of the snapshot to restore. If not set, the most recent
+                snapshot is restored. Only supported if the manager has a snapshot store.
+
+        Notes:
+            - If the snapshot store does not contain a snapshot of the configuration file,
+              `.snapshot` copies next to the configuration file are restored instead. This
+              enables snapshots taken before the store was in use to still be restored.
+        """
+        if self._store is not None:
+            if snapshot_id is not None:
+                snapshot = self._store.get(snapshot_id)
+            else:
+                snapshot = self._store.latest(self.name)
+
+            if snapshot is not None:
+                self._restore_from(self._store, snapshot)
+                return
 
-    def restore(self) -> None:
-        """Restore the current configuration file from a snapshot."""
         for snapshot in self.snapshots.values():
-            shutil.copy(snapshot.path, snapshot.path.parent / snapshot.path.stem)
+            target = snapshot.path.parent / snapshot.path.stem
+            shutil.copy(snapshot.path, target)
+            _parse_cache.invalidate(target)
+            self._index.add(target.name)
 
     def delete(self) -> None:
         """Delete the configuration file."""
         self.path.unlink(missing_ok=True)
+        _parse_cache.invalidate(self.path)
+        self._index.discard(self.name)
+
+    def _restore_from(self, store: SnapshotStore, snapshot: Snapshot) -> None:
+        """Restore configuration files from a snapshot in a snapshot store."""
+        _logger.debug("restoring `%s` from snapshot %s", self.name, snapshot.id)
+        files = []
+        for file, digest in snapshot.files.items():
+            path = Path(file)
+            manager = self if path == self.path else self.includes[path.name]
+            if digest is None:
+                manager.delete()
+                continue
+
+            content = store.read(digest).decode()
+            try:
+                if path.read_text() == content:
+                    continue
+            except FileNotFoundError:
+                pass
+
+            files.append((manager, content))
+
+        # Include files created after the snapshot was taken are not part of the snapshot.
+        for include in self.includes.values():
+            if str(include.path) not in snapshot.files:
+                include.delete()
+
+        _replace(files)
+
+    def _render(self, config: Any) -> str | None:
+        """Render configuration, or return None if it matches the configuration file."""
+        content = self._editor.dumps(config) + "\n"
+        try:
+            if self.path.read_text() == content:
+                _logger.debug("`%s` is unchanged. skipping write", self.path)
+                return None
+        except FileNotFoundError:
+            pass
+
+        return content
+
+    def _set_permissions(self, file: Path) -> None:
+        """Set the configured mode and ownership on a file."""
+        file.chmod(self._mode)
+        shutil.chown(file, self._user, self._group)
+
+    @staticmethod
+    def cache_info() -> CacheInfo:
+        """Get statistics for the process-wide parsed configuration cache."""
+        return _parse_cache.info()
+
+    @staticmethod
+    def cache_clear() -> None:
+        """Clear the process-wide configuration caches and parsed configuration statistics."""
+        _parse_cache.clear()
+        _directory_indexes.clear()
+
+
+class ConfigTransaction:
+    """Multi-file edit of a configuration file and its includes.
+
+    Args:
+        manager: Manager of the main configuration file.
+
+    Notes:
+        - All staged configuration files are rendered before any file is written. Files whose
+          rendered content is unchanged are not written at all.
+        - Changed files are written to temporary files in the configuration directory and
+          synced to disk, then renamed over their targets. The configuration directory is
+          synced once after all renames.
+        - The names of the files that were written are available from `changed` after the
+          transaction is committed.
+    """
+
+    def __init__(self, manager: SlurmConfigManager) -> None:
+        self._manager = manager
+        self._staged: dict[str, tuple[SlurmConfigManager, Any]] = {}
+        self.changed: list[str] = []
+
+    def edit(self, include: str | None = None) -> Any:
+        """Stage an edit of the main configuration file or one of its includes.
+
+        Args:
+            include:
+                (Optional) Name of the include file to edit, e.g. `slurm.conf.compute`.
+                If not set, the main configuration file will be edited.
+
+        Returns:
+            A configuration model to edit in-place. An empty model will be returned if the
+            configuration file does not exist. Repeated calls for the same file return the
+            same model.
+        """
+        manager = self._manager if include is None else self._manager.includes[include]
+        if manager.name not in self._staged:
+            config = manager.load() if manager.exists() else manager._editor.__model__()
+            self._staged[manager.name] = (manager, config)
+
+        return self._staged[manager.name][1]
+
+    def commit(self) -> list[str]:
+        """Write all changed configuration files.
+
+        Returns:
+            Names of the configuration files that were changed.
+
+        Raises:
+            OSError: Raised if changed configuration files could not be written. No configuration
+                files will have been replaced unless the error occurred while renaming.
+        """
+        rendered = [
+            (manager, content)
+            for manager, config in self._staged.values()
+            if (content := manager._render(config)) is not None
+        ]
+
+        self._staged.clear()
+        self.changed = _replace(rendered)
+        return self.changed
+
+
+def _replace(files: list[tuple[SlurmConfigManager, str]]) -> list[str]:
+    """Atomically replace the content of configuration files.
+
+    Args:
+        files: List of configuration managers and the new content of their configuration file.
+
+    Returns:
+        Names of the configuration files that were replaced.
+    """
+    swaps: list[tuple[SlurmConfigManager, Path]] = []
+    try:
+        for manager, content in files:
+            swap = manager.path.parent / f".{manager.name}.swp"
+            swaps.append((manager, swap))
+            with swap.open("w") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+
+            manager._set_permissions(swap)
+    except OSError:
+        for _, swap in swaps:
+            swap.unlink(missing_ok=True)
+        raise
+
+    for manager, swap in swaps:
+        swap.replace(manager.path)
+        _parse_cache.invalidate(manager.path)
+        manager._index.add(manager.name)
+
+    for directory in {manager.path.parent for manager, _ in swaps}:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    return [manager.name for manager, _ in swaps]
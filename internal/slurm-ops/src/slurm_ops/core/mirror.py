@@ -0,0 +1,224 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Install Debian packages from a local package mirror."""
+
+__all__ = ["PackageMirror"]
+
+import email.utils
+import hashlib
+import logging
+import textwrap
+from dataclasses import dataclass
+from pathlib import Path
+from subprocess import CalledProcessError
+from typing import Self
+
+from charmed_hpc_libs.ops import call
+
+from .errors import SlurmOpsError
+
+_logger = logging.getLogger(__name__)
+
+_MIRROR_ORIGIN = "charmed-hpc-mirror"
+_MIRROR_SOURCES_FILE = Path("/etc/apt/sources.list.d/charmed-hpc-mirror.list")
+_MIRROR_PREFERENCES_FILE = Path("/etc/apt/preferences.d/charmed-hpc-mirror")
+
+
+@dataclass(frozen=True)
+class PackageMirror:
+    """Flat Debian package repository that mirrors the packages installed on Slurm machines.
+
+    Attributes:
+        uri: URI of the mirror, e.g. `file:/srv/slurm-mirror` or `http://mirror.local/slurm`.
+
+    Notes:
+        - Mirrors are populated with `prefetch`, which downloads a set of packages and all of
+          their dependencies into the mirror's `pool` directory and indexes them. Mirrors can
+          be shared by all machines of a site, e.g. on a shared filesystem or behind an HTTP
+          server, so that mass deployments do not download the same packages from upstream.
+        - Packages are not signed, so mirrors are marked as trusted in the apt sources.
+    """
+
+    uri: str
+
+    @classmethod
+    def from_str(cls, value: str) -> Self | None:
+        """Parse a package mirror.
+
+        Args:
+            value:
+                Absolute path to a local directory, or `file:`, `http://`, or `https://` URI of
+                the mirror. An empty string disables the mirror.
+
+        Raises:
+            ValueError: Raised if the package mirror is not a local directory or URI.
+        """
+        value = value.strip().rstrip("/")
+        if not value:
+            return None
+        if value.startswith("/"):
+            return cls(f"file:{value}")
+        if value.startswith("file:"):
+            # Normalize `file:///path` to `file:/path`.
+            return cls(f"file:/{value.removeprefix('file:').lstrip('/')}")
+        if value.startswith(("http://", "https://")):
+            return cls(value)
+
+        raise ValueError(
+            f"invalid package mirror '{value}'. "
+            + "expected an absolute path or a 'file:', 'http://', or 'https://' URI"
+        )
+
+    @property
+    def path(self) -> Path | None:
+        """Get the path to the mirror if it is a local directory, otherwise `None`."""
+        if not self.uri.startswith("file:"):
+            return None
+
+        return Path(self.uri.removeprefix("file:"))
+
+    @property
+    def source(self) -> str:
+        """Get the apt source line of the mirror."""
+        return f"deb [trusted=yes] {self.uri} ./"
+
+    def enable(self) -> None:
+        """Configure `apt` to install packages from the mirror.
+
+        Raises:
+            SlurmOpsError: Raised if the mirror's package index cannot be downloaded.
+
+        Notes:
+            - Only the package index of the mirror is updated so that no upstream package
+              repository is contacted, e.g. at air-gapped sites.
+            - Packages in the mirror are preferred over the same packages from other
+              repositories, but newer versions from other repositories are still installable.
+        """
+        _logger.info("initializing apt to use package mirror: %s", self.uri)
+        _MIRROR_SOURCES_FILE.write_text(f"{self.source}\n")
+        _MIRROR_PREFERENCES_FILE.write_text(
+            textwrap.dedent(f"""\
+                Package: *
+                Pin: release o={_MIRROR_ORIGIN}
+                Pin-Priority: 990
+                """)
+        )
+        try:
+            call(
+                "apt-get",
+                "update",
+                f"--option=Dir::Etc::SourceList={_MIRROR_SOURCES_FILE}",
+                "--option=Dir::Etc::SourceParts=-",
+                "--option=APT::Get::List-Cleanup=0",
+            )
+        except CalledProcessError as e:
+            raise SlurmOpsError(
+                f"failed to initialize apt to use {self.uri} package mirror. reason: {e.stderr}"
+            )
+
+    @staticmethod
+    def disable() -> None:
+        """Stop `apt` from installing packages from any package mirror."""
+        _MIRROR_SOURCES_FILE.unlink(missing_ok=True)
+        _MIRROR_PREFERENCES_FILE.unlink(missing_ok=True)
+
+    def prefetch(self, packages: list[str]) -> dict[str, str]:
+        """Download packages and all of their dependencies into the mirror.
+
+        Args:
+            packages: Debian packages to download, e.g. `slurmd` or `slurmd=25.11.0-1`.
+
+        Returns:
+            Mapping of the names of all packages in the mirror to their versions.
+
+        Raises:
+            SlurmOpsError: Raised if the mirror is not a local directory, or if the packages
+                cannot be downloaded.
+
+        Notes:
+            - Dependencies are downloaded even if they are already installed on this machine,
+              as they may be missing on the machines that install packages from the mirror.
+            - Packages already in the mirror are kept, so packages prefetched on machines with
+              different hardware, such as GPU drivers, can be combined in a single mirror.
+        """
+        if self.path is None:
+            raise SlurmOpsError(f"cannot prefetch packages into remote package mirror {self.uri}")
+
+        pool = self.path / "pool"
+        (pool / "partial").mkdir(mode=0o755, parents=True, exist_ok=True)
+        _logger.info("prefetching packages %s into package mirror %s", packages, self.uri)
+        try:
+            call(
+                "apt-get",
+                "-y",
+                "--download-only",
+                # Treat every package as uninstalled to download the full dependency closure.
+                "--option=Dir::State::status=/dev/null",
+                f"--option=Dir::Cache::archives={pool}",
+                "install",
+                *packages,
+            )
+        except CalledProcessError as e:
+            raise SlurmOpsError(f"failed to prefetch packages {packages}. reason: {e.stderr}")
+
+        return self.index()
+
+    def index(self) -> dict[str, str]:
+        """Index the packages in the mirror's `pool` directory.
+
+        Returns:
+            Mapping of the names of all packages in the mirror to their versions.
+
+        Raises:
+            SlurmOpsError: Raised if the mirror is not a local directory, or if a package in
+                the mirror cannot be read.
+        """
+        if self.path is None:
+            raise SlurmOpsError(f"cannot index remote package mirror {self.uri}")
+
+        entries = []
+        versions = {}
+        for deb in sorted((self.path / "pool").glob("*.deb")):
+            try:
+                control = call("dpkg-deb", "--field", str(deb)).stdout or ""
+            except CalledProcessError as e:
+                raise SlurmOpsError(f"failed to read package {deb.name}. reason: {e.stderr}")
+
+            fields = {
+                key: value.strip()
+                for key, _, value in (line.partition(":") for line in control.splitlines())
+                if not key.startswith(" ")
+            }
+            versions[fields["Package"]] = fields["Version"]
+            with deb.open("rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+            entries.append(
+                f"{control}\n"
+                + f"Filename: pool/{deb.name}\n"
+                + f"Size: {deb.stat().st_size}\n"
+                + f"SHA256: {digest}\n"
+            )
+
+        index = "\n".join(entries).encode()
+        (self.path / "Packages").write_bytes(index)
+        (self.path / "Release").write_text(
+            f"Origin: {_MIRROR_ORIGIN}\n"
+            + f"Label: {_MIRROR_ORIGIN}\n"
+            + f"Date: {email.utils.formatdate(usegmt=True)}\n"
+            + "SHA256:\n"
+            + f" {hashlib.sha256(index).hexdigest()} {len(index)} Packages\n"
+        )
+        _logger.info("indexed %s packages in package mirror %s", len(versions), self.uri)
+        return versions
@@ -0,0 +1,212 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Plan the provisioning of software on machines."""
+
+__all__ = ["InstallPlan"]
+
+import logging
+import os
+import subprocess
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from .errors import SlurmOpsError
+from .mirror import PackageMirror
+
+_logger = logging.getLogger(__name__)
+
+
+class InstallPlan:
+    """Plan the installation of Debian packages and snaps as a single provisioning run.
+
+    Notes:
+        - Steps are executed in four phases, in order:
+            1. `repositories`: Package repositories are configured and the apt cache is updated.
+            2. `resolve`: Resolvers add the packages and snaps that depend on the updated apt
+               cache, such as GPU drivers, to the plan.
+            3. `install`: All Debian packages are installed in a single `apt-get` transaction
+               while all snaps are installed at the same time.
+            4. `configure`: Installed software is configured.
+        - The time taken by each phase is recorded in `timings`.
+        - If a package mirror is set, the mirror replaces the configured package repositories
+          and all Debian packages are installed from the mirror. See `PackageMirror`.
+    """
+
+    def __init__(self, mirror: PackageMirror | None = None) -> None:
+        self.mirror = mirror
+        self._repositories: list[Callable[[], None]] = []
+        self._resolvers: list[Callable[["InstallPlan"], None]] = []
+        self._packages: list[str] = []
+        self._snaps: dict[str, Callable[[], None]] = {}
+        self._configure: list[Callable[[], None]] = []
+        self.timings: dict[str, float] = {}
+
+    @property
+    def packages(self) -> list[str]:
+        """Get the Debian packages to install."""
+        return list(self._packages)
+
+    @property
+    def snaps(self) -> list[str]:
+        """Get the names of the snaps to install."""
+        return list(self._snaps)
+
+    def add_repository(self, step: Callable[[], None]) -> None:
+        """Add a step that configures a package repository."""
+        self._repositories.append(step)
+
+    def add_resolver(self, resolver: Callable[["InstallPlan"], None]) -> None:
+        """Add a resolver that adds to the plan once package repositories are configured."""
+        self._resolvers.append(resolver)
+
+    def add_packages(self, *packages: str) -> None:
+        """Add Debian packages to install. Packages already in the plan are ignored."""
+        self._packages.extend(p for p in dict.fromkeys(packages) if p not in self._packages)
+
+    def add_snap(self, name: str, install: Callable[[], None]) -> None:
+        """Add a snap to install.
+
+        Args:
+            name: Name of the snap.
+            install: Step that installs the snap.
+        """
+        self._snaps[name] = install
+
+    def add_configure(self, step: Callable[[], None]) -> None:
+        """Add a step that configures installed software."""
+        self._configure.append(step)
+
+    def execute(self) -> dict[str, float]:
+        """Execute the plan.
+
+        Returns:
+            Mapping of phase names to the time taken by each phase in seconds.
+
+        Raises:
+            SlurmOpsError: Raised if the Debian packages fail to install.
+
+        Notes:
+            - Errors raised by other steps, such as snap installs, are raised as is. If the
+              Debian packages fail to install, the snap installs are still waited for.
+        """
+        with self._phase("repositories"):
+            if self.mirror is not None:
+                self.mirror.enable()
+            else:
+                for step in self._repositories:
+                    step()
+
+        with self._phase("resolve"):
+            for resolver in self._resolvers:
+                resolver(self)
+
+        with self._phase("install"):
+            self._install()
+
+        with self._phase("configure"):
+            for step in self._configure:
+                step()
+
+        _logger.info(
+            "provisioning completed in %.1f seconds. phase timings: %s",
+            sum(self.timings.values()),
+            ", ".join(f"{phase}={elapsed:.1f}s" for phase, elapsed in self.timings.items()),
+        )
+        return dict(self.timings)
+
+    def prefetch(self, mirror: PackageMirror) -> dict[str, str]:
+        """Download the Debian packages of the plan into a package mirror.
+
+        Args:
+            mirror: Package mirror to download the packages into.
+
+        Returns:
+            Mapping of the names of all packages in the mirror to their versions.
+
+        Raises:
+            SlurmOpsError: Raised if the packages cannot be downloaded into the mirror.
+
+        Notes:
+            - Only the `repositories` and `resolve` phases are executed. Nothing is installed.
+            - Package repositories are always configured, so this machine must be able to
+              reach them even if the plan has a package mirror set.
+        """
+        with self._phase("repositories"):
+            for step in self._repositories:
+                step()
+
+        with self._phase("resolve"):
+            for resolver in self._resolvers:
+                resolver(self)
+
+        with self._phase("prefetch"):
+            return mirror.prefetch(self._packages)
+
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        """Record the time taken by a phase of the plan."""
+        _logger.info("starting provisioning phase `%s`", name)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.monotonic() - start
+
+        _logger.info("provisioning phase `%s` completed in %.1f seconds", name, self.timings[name])
+
+    def _install(self) -> None:
+        """Install all Debian packages while all snaps are installed concurrently."""
+        # Leaving the executor waits for the snap installs, even if the packages fail to install.
+        with ThreadPoolExecutor(max_workers=max(1, len(self._snaps))) as executor:
+            snaps = [executor.submit(install) for install in self._snaps.values()]
+            _apt_install(self._packages)
+
+        for future in snaps:
+            future.result()
+
+
+def _apt_install(packages: list[str]) -> None:
+    """Install Debian packages in a single `apt-get` transaction.
+
+    Raises:
+        SlurmOpsError: Raised if `apt-get` fails to install the packages.
+
+    Notes:
+        - `charmlibs.apt.add_package` runs `apt-get install` once per package. Installing all
+          packages at once lets apt resolve dependencies and run `dpkg` triggers only once.
+    """
+    if not packages:
+        return
+
+    cmd = ["apt-get", "-y", "--option=Dpkg::Options::=--force-confold", "install", *packages]
+    _logger.info("installing packages %s with apt", packages)
+    try:
+        subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "DEBIAN_FRONTEND": "noninteractive"},
+        )
+    except subprocess.CalledProcessError as e:
+        _logger.error(
+            "command '%s' failed with:\nexit code %s\nstderr: %s",
+            " ".join(cmd),
+            e.returncode,
+            e.stderr,
+        )
+        raise SlurmOpsError(f"failed to install packages {packages}. reason: {e.stderr}")
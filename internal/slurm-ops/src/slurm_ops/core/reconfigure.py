@@ -0,0 +1,170 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Classify Slurm configuration changes by the action required to apply them."""
+
+__all__ = [
+    "LIVE_NODE_PARAMETERS",
+    "RESTART_REQUIRED_PARAMETERS",
+    "ReconfigureAction",
+    "classify_changes",
+    "classify_node_changes",
+]
+
+import logging
+from collections.abc import Mapping
+from enum import IntEnum
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+# `slurm.conf` parameters that are not re-read by `scontrol reconfigure`. Changes to any of
+# these parameters require that the Slurm services are restarted.
+RESTART_REQUIRED_PARAMETERS = frozenset(
+    {
+        "authaltparameters",
+        "authinfo",
+        "clustername",
+        "communicationparameters",
+        "maxnodecount",
+        "nodes",
+        "plugindir",
+        "plugstackconfig",
+        "reconfigflags",
+        "slurmctldaddr",
+        "slurmctldhost",
+        "slurmctldpidfile",
+        "slurmctldport",
+        "slurmdpidfile",
+        "slurmdport",
+        "slurmdspooldir",
+        "slurmduser",
+        "slurmuser",
+        "statesavelocation",
+    }
+)
+
+# Node configuration parameters that `scontrol update nodename=...` can change on a registered
+# node. Changes to any other node parameter, e.g. `RealMemory` or `CpuSpecList`, require that
+# dynamic nodes are deleted and registered again.
+LIVE_NODE_PARAMETERS = frozenset({"comment", "extra", "features", "gres", "weight"})
+
+# Plugin selection parameters, e.g. `SelectType` or `TaskPlugin`. Plugins are only loaded
+# when a Slurm service starts, so changing a plugin type always requires a restart.
+_PLUGIN_PARAMETER_SUFFIXES = ("type", "types", "plugin", "plugins")
+
+
+class ReconfigureAction(IntEnum):
+    """Action required to apply a set of Slurm configuration changes.
+
+    Actions are ordered by cost so that the cheapest sufficient action
+    for multiple changes can be selected with `max(...)`.
+    """
+
+    NONE = 0
+    RECONFIGURE = 1
+    RESTART = 2
+
+
+def _is_slurm_config(name: str) -> bool:
+    return name == "slurm.conf" or name.startswith("slurm.conf.")
+
+
+def _requires_restart(parameter: str) -> bool:
+    return parameter in RESTART_REQUIRED_PARAMETERS or parameter.endswith(
+        _PLUGIN_PARAMETER_SUFFIXES
+    )
+
+
+def classify_changes(previous: Mapping[str, Any], current: Mapping[str, Any]) -> ReconfigureAction:
+    """Classify the changes between two sets of Slurm configuration files.
+
+    Args:
+        previous: Mapping of configuration file names to the configuration last applied.
+        current: Mapping of configuration file names to the configuration to apply.
+
+    Returns:
+        The cheapest action that will apply all changes between `previous` and `current`.
+
+    Notes:
+        - `slurm.conf` and its `include` files are expected to be mappings of parameters to
+          values, as returned by `Model.dict()`. Each changed parameter is classified
+          individually.
+        - Changes to other configuration files, such as `gres.conf` or `cgroup.conf`, only
+          require that the Slurm services are reconfigured.
+        - If `previous` is empty, there is no record of the configuration last applied, so
+          a restart is required.
+    """
+    if not previous:
+        _logger.debug("no record of previously applied configuration. restart required")
+        return ReconfigureAction.RESTART
+
+    action = ReconfigureAction.NONE
+    for name in sorted(previous.keys() | current.keys()):
+        old = previous.get(name, {})
+        new = current.get(name, {})
+        if old == new:
+            continue
+
+        if not _is_slurm_config(name):
+            _logger.debug("`%s` has changed. reconfigure required", name)
+            action = max(action, ReconfigureAction.RECONFIGURE)
+            continue
+
+        for parameter in sorted(old.keys() | new.keys()):
+            if old.get(parameter) == new.get(parameter):
+                continue
+
+            if _requires_restart(parameter):
+                _logger.debug(
+                    "parameter `%s` in `%s` has changed. restart required", parameter, name
+                )
+                return ReconfigureAction.RESTART
+
+            _logger.debug(
+                "parameter `%s` in `%s` has changed. reconfigure required", parameter, name
+            )
+            action = ReconfigureAction.RECONFIGURE
+
+    return action
+
+
+def classify_node_changes(
+    previous: Mapping[str, Any], current: Mapping[str, Any]
+) -> ReconfigureAction:
+    """Classify the changes between two configurations of a dynamic compute node.
+
+    Args:
+        previous: Node configuration last applied, as returned by `Node.dict()`.
+        current: Node configuration to apply, as returned by `Node.dict()`.
+
+    Returns:
+        - `NONE` if the node configuration has not changed.
+        - `RECONFIGURE` if all changes can be applied to the registered node with
+          `scontrol update nodename=...`. See `LIVE_NODE_PARAMETERS`.
+        - `RESTART` if the node must be deleted and registered again to apply the changes.
+    """
+    action = ReconfigureAction.NONE
+    for parameter in sorted(previous.keys() | current.keys()):
+        if previous.get(parameter) == current.get(parameter):
+            continue
+
+        if parameter not in LIVE_NODE_PARAMETERS:
+            _logger.debug("node parameter `%s` has changed. re-registration required", parameter)
+            return ReconfigureAction.RESTART
+
+        _logger.debug("node parameter `%s` has changed. live update required", parameter)
+        action = ReconfigureAction.RECONFIGURE
+
+    return action
@@ -0,0 +1,179 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content-addressed store for Slurm configuration snapshots."""
+
+__all__ = ["Snapshot", "SnapshotStore"]
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .errors import SlurmOpsError
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Point-in-time snapshot of a set of configuration files.
+
+    Attributes:
+        id: Unique identifier of the snapshot.
+        label: Label of the configuration set that the snapshot was taken of.
+        created: Unix timestamp of when the snapshot was taken.
+        files:
+            Mapping of file paths to the digest of their content. A digest of `None`
+            means that the file did not exist when the snapshot was taken.
+    """
+
+    id: str
+    label: str
+    created: float
+    files: dict[str, str | None]
+
+
+class SnapshotStore:
+    """Content-addressed store for Slurm configuration snapshots.
+
+    Args:
+        root: Directory to store snapshots in.
+        retention: Maximum number of snapshots to keep for each label. Must be at least 1.
+
+    Notes:
+        - File content is stored once per unique SHA-256 digest and compressed with `gzip`,
+          so identical files are deduplicated across snapshots and labels.
+        - Each snapshot is recorded as a JSON manifest in `<root>/manifests`. Content that is
+          no longer referenced by any manifest is removed when old snapshots are pruned.
+    """
+
+    def __init__(self, root: Path, /, retention: int = 10) -> None:
+        self._root = root
+        self._retention = retention
+
+    @property
+    def _objects(self) -> Path:
+        return self._root / "objects"
+
+    @property
+    def _manifests(self) -> Path:
+        return self._root / "manifests"
+
+    def save(self, files: Iterable[Path], /, label: str) -> Snapshot:
+        """Take a snapshot of a set of configuration files.
+
+        Args:
+            files: Configuration files to snapshot. Files that do not exist are recorded
+                as missing so that they will be removed when the snapshot is restored.
+            label: Label of the configuration set, e.g. `acct_gather.conf`.
+        """
+        # Snapshots may contain credentials, e.g. `acct_gather.conf`,
+        # so only the owner of the store may access it.
+        self._root.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._objects.mkdir(mode=0o700, exist_ok=True)
+        self._manifests.mkdir(mode=0o700, exist_ok=True)
+
+        content: dict[str, str | None] = {}
+        for file in files:
+            try:
+                data = file.read_bytes()
+            except FileNotFoundError:
+                content[str(file)] = None
+                continue
+
+            digest = hashlib.sha256(data).hexdigest()
+            obj = self._objects / f"{digest}.gz"
+            if not obj.exists():
+                self._write(obj, gzip.compress(data))
+
+            content[str(file)] = digest
+
+        snapshot = Snapshot(
+            id=f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}",
+            label=label,
+            created=time.time(),
+            files=content,
+        )
+        self._write(self._manifests / f"{snapshot.id}.json", json.dumps(asdict(snapshot)).encode())
+        _logger.debug("saved snapshot %s of %s", snapshot.id, label)
+
+        self._prune(label)
+        return snapshot
+
+    def snapshots(self, label: str | None = None) -> list[Snapshot]:
+        """List snapshots, oldest first.
+
+        Args:
+            label: (Optional) Only list snapshots with this label.
+        """
+        snapshots = []
+        for manifest in sorted(self._manifests.glob("*.json")):
+            snapshot = Snapshot(**json.loads(manifest.read_text()))
+            if label is None or snapshot.label == label:
+                snapshots.append(snapshot)
+
+        return snapshots
+
+    def latest(self, label: str) -> Snapshot | None:
+        """Get the most recent snapshot with the given label, if any."""
+        snapshots = self.snapshots(label)
+        return snapshots[-1] if snapshots else None
+
+    def get(self, snapshot_id: str) -> Snapshot:
+        """Get a snapshot by its ID.
+
+        Raises:
+            SlurmOpsError: Raised if the snapshot does not exist.
+        """
+        try:
+            return Snapshot(**json.loads((self._manifests / f"{snapshot_id}.json").read_text()))
+        except FileNotFoundError:
+            raise SlurmOpsError(f"snapshot {snapshot_id} does not exist")
+
+    def read(self, digest: str) -> bytes:
+        """Read the content of a file stored with the given digest."""
+        return gzip.decompress((self._objects / f"{digest}.gz").read_bytes())
+
+    def _prune(self, label: str) -> None:
+        """Remove the oldest snapshots of `label` beyond the retention limit."""
+        snapshots = self.snapshots(label)
+        if len(snapshots) <= self._retention:
+            return
+
+        for snapshot in snapshots[: -self._retention]:
+            _logger.debug("removing expired snapshot %s of %s", snapshot.id, label)
+            (self._manifests / f"{snapshot.id}.json").unlink(missing_ok=True)
+
+        referenced = {
+            digest
+            for snapshot in self.snapshots()
+            for digest in snapshot.files.values()
+            if digest is not None
+        }
+        for obj in self._objects.glob("*.gz"):
+            if obj.name.removesuffix(".gz") not in referenced:
+                obj.unlink(missing_ok=True)
+
+    @staticmethod
+    def _write(file: Path, data: bytes) -> None:
+        swap = file.with_name(f".{file.name}.swp")
+        swap.touch(mode=0o600)
+        swap.write_bytes(data)
+        swap.replace(file)
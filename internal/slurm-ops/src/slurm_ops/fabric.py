@@ -0,0 +1,217 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Discover the InfiniBand fabric of compute nodes, and render Slurm network topologies."""
+
+__all__ = [
+    "FabricNode",
+    "discover_leaf_switch",
+    "leaf_switch",
+    "local_node_guids",
+    "parse_ibnetdiscover",
+    "render_topology",
+]
+
+import logging
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import CalledProcessError
+
+from charmed_hpc_libs.ops import call
+
+_logger = logging.getLogger(__name__)
+
+_INFINIBAND_PATH = Path("/sys/class/infiniband")
+# Time in seconds before `ibnetdiscover` is killed. Discovering large fabrics, or fabrics
+# without a responsive subnet manager, can otherwise take minutes and stall the hook.
+_DISCOVERY_TIMEOUT = 60
+# Node records start with the type of the node, its number of ports, its ID, and its
+# description, e.g. `Switch  36 "S-0c42a1030012ab00"  # "leaf01" enhanced port 0 lid 3 lmc 0`.
+_NODE_RECORD = re.compile(r'^(Switch|Ca|Rt)\s+\d+\s+"[SHR]-([0-9a-f]+)"\s*#\s*"([^"]*)"')
+# Each connected port of a node is listed below its record with the ID and port of its peer,
+# e.g. `[1](0c42a1030012ab11)  "S-0c42a1030012ab00"[17]  # lid 14 lmc 0 "leaf01" lid 3 4xHDR`.
+_PORT_RECORD = re.compile(r'^\[(\d+)\](?:\([0-9a-f]+\))?\s+"[SHR]-([0-9a-f]+)"\[\d+\]')
+# Compute nodes without fabric information are grouped under this switch or block so that
+# they can still be allocated when a network topology is configured.
+_UNKNOWN_SWITCH = "unknown"
+_ROOT_SWITCH = "root"
+
+
+@dataclass(frozen=True)
+class FabricNode:
+    """Node of an InfiniBand fabric.
+
+    Attributes:
+        guid: Node GUID as 16 hexadecimal digits, e.g. `0c42a1030012ab00`.
+        type: Type of the node: `Switch`, `Ca` for channel adapters, or `Rt` for routers.
+        description: Description of the node, e.g. the hostname of a compute node.
+        peers: GUIDs of the nodes connected to each port of the node, keyed by port number.
+    """
+
+    guid: str
+    type: str
+    description: str
+    peers: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        """Get the name of the node in Slurm's network topology, e.g. `ib-0c42a1030012ab00`.
+
+        Notes:
+            - Node descriptions are set by the subnet manager or switch firmware, and may be
+              neither unique nor valid Slurm switch names. The node GUID is used instead.
+        """
+        return f"ib-{self.guid}"
+
+
+def parse_ibnetdiscover(output: str) -> dict[str, FabricNode]:
+    """Parse the output of `ibnetdiscover` into the nodes of an InfiniBand fabric.
+
+    Args:
+        output: Output of `ibnetdiscover`, e.g. a captured dump of a fabric.
+
+    Returns:
+        Mapping of node GUIDs to the nodes of the fabric.
+    """
+    fabric = {}
+    node = None
+    for line in output.splitlines():
+        line = line.strip()
+        if match := _NODE_RECORD.match(line):
+            type_, guid, description = match.groups()
+            node = FabricNode(guid=_normalize_guid(guid), type=type_, description=description)
+            fabric[node.guid] = node
+        elif node is not None and (match := _PORT_RECORD.match(line)):
+            port, peer = match.groups()
+            node.peers[int(port)] = _normalize_guid(peer)
+        elif not line:
+            node = None
+
+    return fabric
+
+
+def leaf_switch(fabric: Mapping[str, FabricNode], guids: Iterable[str]) -> FabricNode | None:
+    """Get the leaf switch that a compute node is connected to.
+
+    Args:
+        fabric: Nodes of the InfiniBand fabric. See `parse_ibnetdiscover`.
+        guids: Node GUIDs of the channel adapters of the compute node.
+
+    Notes:
+        - If the compute node has multiple connected ports, the switch connected to the
+          lowest-numbered port of the first channel adapter found in the fabric is used.
+    """
+    for guid in guids:
+        adapter = fabric.get(_normalize_guid(guid))
+        if adapter is None:
+            continue
+
+        for _, peer in sorted(adapter.peers.items()):
+            if (switch := fabric.get(peer)) is not None and switch.type == "Switch":
+                return switch
+
+    return None
+
+
+def local_node_guids() -> list[str]:
+    """Get the node GUIDs of the InfiniBand channel adapters with an active port on this machine.
+
+    Notes:
+        - RDMA over Converged Ethernet (RoCE) devices are also listed under
+          `/sys/class/infiniband`, but are ignored as they are not part of an InfiniBand fabric.
+    """
+    guids = []
+    for device in sorted(_INFINIBAND_PATH.glob("*")):
+        for port in sorted((device / "ports").glob("*")):
+            try:
+                link_layer = (port / "link_layer").read_text().strip()
+                state = (port / "state").read_text().strip()
+            except OSError:
+                continue
+
+            # Port states are reported as `<number>: <name>`, e.g. `4: ACTIVE`.
+            if link_layer == "InfiniBand" and state.endswith("ACTIVE"):
+                guids.append(_normalize_guid((device / "node_guid").read_text().strip()))
+                break
+
+    return guids
+
+
+def discover_leaf_switch() -> str | None:
+    """Discover the name of the InfiniBand leaf switch that this machine is connected to.
+
+    Returns:
+        Name of the leaf switch in Slurm's network topology, or `None` if this machine is not
+        connected to an InfiniBand fabric or the fabric cannot be discovered.
+
+    Notes:
+        - The fabric is discovered with `ibnetdiscover` from `infiniband-diags`. Discovery
+          requires an active port and a running subnet manager, and is abandoned if it does
+          not complete within `_DISCOVERY_TIMEOUT` seconds.
+    """
+    guids = local_node_guids()
+    if not guids:
+        _logger.debug("no active infiniband ports found. skipping fabric discovery")
+        return None
+
+    try:
+        result = call("timeout", str(_DISCOVERY_TIMEOUT), "ibnetdiscover")
+    except (CalledProcessError, FileNotFoundError) as e:
+        _logger.warning("failed to discover infiniband fabric. reason: %s", e)
+        return None
+
+    switch = leaf_switch(parse_ibnetdiscover(result.stdout or ""), guids)
+    if switch is None:
+        _logger.warning("no infiniband switch connected to node guids %s", guids)
+        return None
+
+    _logger.debug("discovered infiniband leaf switch '%s' (%s)", switch.name, switch.description)
+    return switch.name
+
+
+def render_topology(switches: Mapping[str | None, Iterable[str]], *, block: bool = False) -> str:
+    """Render a Slurm network topology configuration file, `topology.conf`.
+
+    Args:
+        switches:
+            Mapping of leaf switch names to the names of the compute nodes connected to them.
+            Compute nodes without fabric information are mapped to `None`.
+        block:
+            If `True`, render a block topology for the `topology/block` plugin. Otherwise,
+            render a tree topology for the `topology/tree` plugin.
+
+    Notes:
+        - Tree topologies are rendered with two levels: each leaf switch, and a root switch that
+          connects all leaf switches. Switches above the leaf switches are not discovered.
+        - Compute nodes without fabric information are grouped under an `unknown` switch or
+          block. Slurm cannot allocate compute nodes that are missing from the topology.
+    """
+    leaves = {
+        name if name is not None else _UNKNOWN_SWITCH: sorted(nodes)
+        for name, nodes in switches.items()
+        if nodes
+    }
+    keyword = "BlockName" if block else "SwitchName"
+    lines = [f"{keyword}={name} Nodes={','.join(nodes)}" for name, nodes in sorted(leaves.items())]
+    if not block and len(leaves) > 1:
+        lines.append(f"SwitchName={_ROOT_SWITCH} Switches={','.join(sorted(leaves))}")
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _normalize_guid(guid: str) -> str:
+    """Normalize a GUID to 16 hexadecimal digits, e.g. `0c42:a103:0012:ab00` or `0xc42a1030012ab00`."""
+    return f"{int(guid.replace(':', ''), 16):016x}"
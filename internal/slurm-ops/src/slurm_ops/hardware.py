@@ -0,0 +1,401 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Discover the hardware of compute nodes."""
+
+__all__ = [
+    "GPUDevice",
+    "HardwareProfile",
+    "LogicalCPU",
+    "MIGDevice",
+    "cpu_topology",
+    "discover_gpus",
+    "hardware_fingerprint",
+]
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, NamedTuple, Self
+
+import pynvml
+
+_logger = logging.getLogger(__name__)
+
+_DMI_PATH = Path("/sys/class/dmi/id")
+_DMI_FIELDS = ("sys_vendor", "product_name", "product_uuid", "board_vendor", "board_name")
+_CPUINFO_PATH = Path("/proc/cpuinfo")
+# Only fields that describe the CPU topology are fingerprinted. Fields such as
+# `cpu MHz` or `bogomips` change between reads and would invalidate the profile.
+_CPUINFO_FIELDS = (
+    "model name",
+    "physical id",
+    "core id",
+    "cpu cores",
+    "siblings",
+    "CPU implementer",
+    "CPU part",
+)
+_MEMINFO_PATH = Path("/proc/meminfo")
+_PCI_DEVICES_PATH = Path("/sys/bus/pci/devices")
+_CPU_DEVICES_PATH = Path("/sys/devices/system/cpu")
+# The NVIDIA driver exposes a capability file for every MIG GPU instance and compute
+# instance, e.g. `gpu0/mig/gi1/ci0/access`. Each file records the minor number of the
+# `/dev/nvidia-caps/nvidia-cap<minor>` device file that grants access to the instance.
+_MIG_CAPS_PATH = Path("/proc/driver/nvidia/capabilities")
+
+
+@dataclass(frozen=True)
+class MIGDevice:
+    """MIG device partitioned from a GPU.
+
+    Attributes:
+        profile: MIG profile of the device, e.g. `1g.10gb`.
+        files:
+            Device files required to access the MIG device: the parent GPU, and the
+            capability files of the MIG GPU instance and compute instance.
+    """
+
+    profile: str
+    files: list[str]
+
+
+@dataclass(frozen=True)
+class GPUDevice:
+    """GPU device of a compute node.
+
+    Attributes:
+        model: Model name of the GPU in GRES-compatible format, e.g. `tesla_t4`.
+        minor: Minor number of the GPU device file, e.g. `0` for `/dev/nvidia0`.
+        cores: Slurm core indices of the CPU cores that have affinity with the GPU.
+        links:
+            Number of NVLinks between the GPU and each GPU of the compute node, ordered by
+            device minor number. The GPU itself is marked with `-1`.
+        mig: MIG devices partitioned from the GPU. Empty if MIG is not enabled.
+    """
+
+    model: str
+    minor: int
+    cores: list[int] = field(default_factory=list)
+    links: list[int] = field(default_factory=list)
+    mig: list[MIGDevice] = field(default_factory=list)
+
+    def __post_init__(self) -> None:  # noqa D105
+        # MIG devices are loaded from persisted hardware profiles as built-in dictionaries.
+        object.__setattr__(
+            self,
+            "mig",
+            [MIGDevice(**mig) if isinstance(mig, dict) else mig for mig in self.mig],
+        )
+
+
+@dataclass(frozen=True)
+class HardwareProfile:
+    """Hardware profile of a compute node.
+
+    Attributes:
+        fingerprint: Fingerprint of the hardware the profile was discovered on.
+        node: Node definition reported by `slurmd -C`.
+        gpus: GPU devices of the compute node, ordered by device minor number.
+        switch: InfiniBand leaf switch that the compute node is connected to, if any.
+    """
+
+    fingerprint: str
+    node: str
+    gpus: list[GPUDevice] = field(default_factory=list)
+    switch: str | None = None
+
+    @classmethod
+    def load(cls, file: Path) -> Self | None:
+        """Load a hardware profile from a file, or `None` if there is no valid profile."""
+        try:
+            data = json.loads(file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # Profiles persisted in an older format are rediscovered.
+        if not isinstance(data, dict) or data.keys() != {f.name for f in fields(cls)}:
+            return None
+
+        try:
+            return cls(
+                fingerprint=data["fingerprint"],
+                node=data["node"],
+                gpus=[GPUDevice(**gpu) for gpu in data["gpus"]],
+                switch=data["switch"],
+            )
+        except TypeError:
+            return None
+
+    def dump(self, file: Path) -> None:
+        """Write the hardware profile to a file."""
+        file.parent.mkdir(parents=True, exist_ok=True)
+        swap = file.with_name(f".{file.name}.swp")
+        swap.write_text(json.dumps(asdict(self)))
+        swap.replace(file)
+
+
+def hardware_fingerprint() -> str:
+    """Compute a fingerprint of the hardware on this machine.
+
+    Notes:
+        - The fingerprint is computed from DMI system information, the CPU topology reported
+          by `/proc/cpuinfo`, total memory, the list of PCI devices, and the MIG instances
+          created on each GPU. It only requires reading a few small files, so it is cheap to
+          compute on every hook.
+    """
+    digest = hashlib.sha256()
+
+    for name in _DMI_FIELDS:
+        digest.update(f"dmi:{name}={_read(_DMI_PATH / name)}\n".encode())
+
+    for line in _read(_CPUINFO_PATH).splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() in _CPUINFO_FIELDS:
+            digest.update(f"cpu:{key.strip()}={value.strip()}\n".encode())
+
+    for line in _read(_MEMINFO_PATH).splitlines():
+        if line.startswith("MemTotal:"):
+            digest.update(f"mem:{line.split()[1]}\n".encode())
+
+    if _PCI_DEVICES_PATH.is_dir():
+        for device in sorted(_PCI_DEVICES_PATH.iterdir()):
+            vendor = _read(device / "vendor")
+            product = _read(device / "device")
+            digest.update(f"pci:{device.name}={vendor}:{product}\n".encode())
+
+    for file in sorted(_MIG_CAPS_PATH.glob("gpu*/mig/gi*/**/access")):
+        digest.update(f"mig:{file.relative_to(_MIG_CAPS_PATH).parent}\n".encode())
+
+    return digest.hexdigest()
+
+
+class _NVMLDevice(NamedTuple):
+    """GPU device information reported by NVML."""
+
+    model: str
+    minor: int
+    bus_id: str
+    cpus: list[int]
+    peers: list[str]
+    mig: list[MIGDevice]
+
+
+def discover_gpus() -> list[GPUDevice]:
+    """Discover the NVIDIA GPUs on this machine with NVML.
+
+    Returns:
+        GPU devices ordered by device minor number. Model names are lowercase with whitespace
+        replaced by underscores, e.g. a "Tesla T4" GPU at `/dev/nvidia0` has the model name
+        `tesla_t4` and the minor number `0`.
+
+    Notes:
+        - The CPU affinity of each GPU is mapped to Slurm core indices so that it can be used
+          as `Cores=` in `gres.conf`. NVLink connections between GPUs are mapped to the
+          `Links=` format used by `gres.conf`.
+        - If MIG is enabled on a GPU, the MIG devices currently partitioned from the GPU are
+          discovered along with the device files required to access them.
+    """
+    devices = []
+    try:
+        pynvml.nvmlInit()
+
+        gpu_count = pynvml.nvmlDeviceGetCount()
+        for i in range(gpu_count):
+            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+
+            # Make model name lowercase and replace whitespace with underscores
+            # to turn into a GRES-compatible format. For example, "Tesla T4" -> "tesla_t4",
+            # which can be added as "Gres=gpu:tesla_t4:1".
+            #
+            # Aims to follow convention set by Slurm autodetect:
+            # https://slurm.schedmd.com/gres.html#AutoDetect
+            model = pynvml.nvmlDeviceGetName(handle)
+            model = "_".join(model.split()).lower()
+
+            minor = pynvml.nvmlDeviceGetMinorNumber(handle)
+            devices.append(
+                _NVMLDevice(
+                    model=model,
+                    minor=minor,
+                    bus_id=_bus_id(pynvml.nvmlDeviceGetPciInfo(handle).busId),
+                    cpus=_cpu_affinity(handle),
+                    peers=_nvlink_peers(handle),
+                    mig=_mig_devices(handle, minor),
+                )
+            )
+
+        pynvml.nvmlShutdown()
+    except pynvml.NVMLError as e:
+        _logger.info("no GPU info gathered: drivers cannot be detected")
+        _logger.debug("NVML init failed with reason: %s", e)
+        return []
+
+    devices.sort(key=lambda device: device.minor)
+    core_indices = _core_indices()
+    gpus = []
+    for device in devices:
+        cores = sorted({core_indices[cpu] for cpu in device.cpus if cpu in core_indices})
+        links = []
+        # `Links=` is only meaningful if there is more than one GPU to connect to.
+        if len(devices) > 1:
+            links = [
+                -1 if peer.bus_id == device.bus_id else device.peers.count(peer.bus_id)
+                for peer in devices
+            ]
+
+        gpus.append(
+            GPUDevice(
+                model=device.model, minor=device.minor, cores=cores, links=links, mig=device.mig
+            )
+        )
+
+    return gpus
+
+
+def _bus_id(bus_id: str | bytes) -> str:
+    """Normalize a PCI bus ID reported by NVML so that bus IDs can be compared."""
+    if isinstance(bus_id, bytes):
+        bus_id = bus_id.decode()
+
+    return bus_id.lower()
+
+
+def _cpu_affinity(handle: Any) -> list[int]:
+    """Get the IDs of the CPUs that have affinity with a GPU."""
+    words = ((os.cpu_count() or 1) + 63) // 64
+    try:
+        masks = pynvml.nvmlDeviceGetCpuAffinity(handle, words)
+    except pynvml.NVMLError:
+        return []
+
+    return [
+        word * 64 + bit for word, mask in enumerate(masks) for bit in range(64) if mask >> bit & 1
+    ]
+
+
+def _nvlink_peers(handle: Any) -> list[str]:
+    """Get the PCI bus IDs at the remote end of each active NVLink of a GPU."""
+    peers = []
+    for link in range(pynvml.NVML_NVLINK_MAX_LINKS):
+        try:
+            if pynvml.nvmlDeviceGetNvLinkState(handle, link) != pynvml.NVML_FEATURE_ENABLED:
+                continue
+
+            peers.append(_bus_id(pynvml.nvmlDeviceGetNvLinkRemotePciInfo(handle, link).busId))
+        except pynvml.NVMLError:
+            # Raised if the GPU does not support NVLink, or the link does not exist.
+            continue
+
+    return peers
+
+
+def _mig_devices(handle: Any, minor: int) -> list[MIGDevice]:
+    """Get the MIG devices partitioned from a GPU, or an empty list if MIG is not enabled."""
+    try:
+        mode, _ = pynvml.nvmlDeviceGetMigMode(handle)
+    except pynvml.NVMLError:
+        # Raised if the GPU does not support MIG.
+        return []
+
+    if mode != pynvml.NVML_DEVICE_MIG_ENABLE:
+        return []
+
+    devices = []
+    for i in range(pynvml.nvmlDeviceGetMaxMigDeviceCount(handle)):
+        try:
+            mig = pynvml.nvmlDeviceGetMigDeviceHandleByIndex(handle, i)
+        except pynvml.NVMLError:
+            # Raised if no MIG device has been created at this index.
+            continue
+
+        # MIG device names have the format "<GPU name> MIG <profile>",
+        # e.g. "NVIDIA A100-SXM4-80GB MIG 1g.10gb".
+        profile = pynvml.nvmlDeviceGetName(mig).rpartition(" MIG ")[2].strip()
+        gi = _MIG_CAPS_PATH / f"gpu{minor}" / "mig" / f"gi{pynvml.nvmlDeviceGetGpuInstanceId(mig)}"
+        ci = gi / f"ci{pynvml.nvmlDeviceGetComputeInstanceId(mig)}"
+        files = [f"/dev/nvidia{minor}"]
+        for cap in (gi / "access", ci / "access"):
+            for line in _read(cap).splitlines():
+                key, _, value = line.partition(":")
+                if key.strip() == "DeviceFileMinor":
+                    files.append(f"/dev/nvidia-caps/nvidia-cap{value.strip()}")
+
+        devices.append(MIGDevice(profile=profile, files=files))
+
+    return devices
+
+
+class LogicalCPU(NamedTuple):
+    """Logical CPU of a compute node.
+
+    Attributes:
+        id: ID of the CPU assigned by the operating system, e.g. `3` for `cpu3`.
+        abstract_id: ID of the CPU in Slurm's abstract numbering, as used by `CpuSpecList=`.
+        socket: ID of the socket the CPU belongs to.
+        core: Slurm core index of the core the CPU belongs to, as used by `Cores=`.
+        numa: ID of the NUMA node the CPU belongs to.
+    """
+
+    id: int
+    abstract_id: int
+    socket: int
+    core: int
+    numa: int
+
+
+def cpu_topology() -> list[LogicalCPU]:
+    """Get the logical CPUs of this machine, ordered by Slurm's abstract CPU ID.
+
+    Notes:
+        - Slurm numbers cores by socket, then by core within the socket. All hardware
+          threads of a core share the same core index. Abstract CPU IDs number the hardware
+          threads of each core consecutively in core index order.
+    """
+    topology = {}
+    for cpu in _CPU_DEVICES_PATH.glob("cpu[0-9]*"):
+        package = _read(cpu / "topology" / "physical_package_id")
+        core = _read(cpu / "topology" / "core_id")
+        if package and core:
+            numa = next((int(n.name.removeprefix("node")) for n in cpu.glob("node[0-9]*")), 0)
+            topology[int(cpu.name.removeprefix("cpu"))] = (int(package), int(core), numa)
+
+    index = {core: i for i, core in enumerate(sorted({(p, c) for p, c, _ in topology.values()}))}
+    cpus = sorted(topology, key=lambda cpu: (index[topology[cpu][:2]], cpu))
+    return [
+        LogicalCPU(
+            id=cpu,
+            abstract_id=i,
+            socket=topology[cpu][0],
+            core=index[topology[cpu][:2]],
+            numa=topology[cpu][2],
+        )
+        for i, cpu in enumerate(cpus)
+    ]
+
+
+def _core_indices() -> dict[int, int]:
+    """Map CPU IDs to the core indices that Slurm uses for `Cores=` in `gres.conf`."""
+    return {cpu.id: cpu.core for cpu in cpu_topology()}
+
+
+def _read(file: Path) -> str:
+    """Read a small system file, returning an empty string if it cannot be read."""
+    try:
+        return file.read_text().strip()
+    except OSError:
+        return ""
@@ -0,0 +1,109 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Inventory of the compute nodes registered with Slurm."""
+
+__all__ = ["NodeInventory"]
+
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from slurm_ops.control import ControlBackend, ScontrolBackend
+
+_logger = logging.getLogger(__name__)
+
+
+class NodeInventory:
+    """Inventory of the compute nodes registered with Slurm.
+
+    Args:
+        node:
+            (Optional) Callable returning the name of a single node to track. If not set,
+            all nodes registered with Slurm are tracked.
+        ttl: Time in seconds before the inventory is refreshed from Slurm.
+        backend: Backend to fetch the inventory with. Default: `ScontrolBackend`.
+
+    Notes:
+        - The inventory is fetched with a single request to the backend, e.g.
+          `scontrol --json show nodes`, or `scontrol --json show node <name>` if tracking a
+          single node, and is indexed by node name, state, and partition.
+        - Call `invalidate` after running commands that modify nodes, such as
+          `scontrol update` or `scontrol delete`, so that the next lookup is up to date.
+    """
+
+    def __init__(
+        self,
+        node: Callable[[], str] | None = None,
+        *,
+        ttl: float = 30,
+        backend: ControlBackend | None = None,
+    ) -> None:
+        self.backend = backend or ScontrolBackend()
+        self._node = node
+        self._ttl = ttl
+        self._expires = 0.0
+        self._nodes: dict[str, dict[str, Any]] = {}
+        self._states: dict[str, list[str]] = {}
+        self._partitions: dict[str, list[str]] = {}
+
+    def __contains__(self, name: object) -> bool:  # noqa D105
+        return name in self.nodes
+
+    @property
+    def nodes(self) -> dict[str, dict[str, Any]]:
+        """Get a mapping of node names to node information from `scontrol --json`."""
+        if time.monotonic() >= self._expires:
+            self.refresh()
+
+        return self._nodes
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        """Get the information of a node, or `None` if the node is not registered."""
+        return self.nodes.get(name)
+
+    def by_state(self, state: str) -> list[str]:
+        """Get the names of nodes with the given state flag, e.g. `idle` or `drain`."""
+        _ = self.nodes
+        return self._states.get(state.lower(), [])
+
+    def by_partition(self, partition: str) -> list[str]:
+        """Get the names of nodes that are members of the given partition."""
+        _ = self.nodes
+        return self._partitions.get(partition, [])
+
+    def invalidate(self) -> None:
+        """Invalidate the inventory so that it is refreshed on the next lookup."""
+        self._expires = 0.0
+
+    def refresh(self) -> None:
+        """Refresh the inventory from Slurm.
+
+        Raises:
+            SlurmOpsError: Raised if all nodes are tracked and the backend fails to list them.
+        """
+        nodes = self.backend.show_nodes(None if self._node is None else self._node())
+
+        self._nodes = {node["name"]: node for node in nodes}
+        self._states = {}
+        self._partitions = {}
+        for name, node in self._nodes.items():
+            for state in node.get("state", []):
+                self._states.setdefault(state.lower(), []).append(name)
+            for partition in node.get("partitions", []):
+                self._partitions.setdefault(partition, []).append(name)
+
+        self._expires = time.monotonic() + self._ttl
+        _logger.debug("refreshed node inventory. %s nodes registered", len(self._nodes))
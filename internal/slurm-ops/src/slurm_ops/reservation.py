@@ -0,0 +1,154 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reserve compute node resources for system services."""
+
+__all__ = ["Reservation", "ReservationPolicy"]
+
+from dataclasses import dataclass, field
+from typing import Self
+
+from slurm_ops.hardware import LogicalCPU
+
+# Nodes with fewer cores than this do not reserve cores for system services by default,
+# as each reserved core is a large share of the node.
+_AUTO_MIN_CORES = 16
+# One core per socket is reserved by default for every `_AUTO_CORES_PER_SOCKET` cores.
+_AUTO_CORES_PER_SOCKET = 32
+_AUTO_MIN_MEMORY = 1024
+_AUTO_MAX_MEMORY = 16384
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Resources reserved for system services on a compute node.
+
+    Attributes:
+        cpus: IDs of the reserved CPUs assigned by the operating system.
+        cpu_spec_list: Slurm abstract IDs of the reserved CPUs, as used by `CpuSpecList=`.
+        memory: Memory in megabytes reserved for system services, as used by `MemSpecLimit=`.
+    """
+
+    cpus: list[int] = field(default_factory=list)
+    cpu_spec_list: list[int] = field(default_factory=list)
+    memory: int | None = None
+
+
+@dataclass(frozen=True)
+class ReservationPolicy:
+    """Policy for reserving compute node resources for system services.
+
+    Attributes:
+        enabled: If `False`, no resources are reserved.
+        cores:
+            Number of cores to reserve per socket. If `None`, the number of cores is derived
+            from the size of the node.
+        memory:
+            Memory in megabytes to reserve. If `None`, the amount of memory is derived from
+            the total memory of the node.
+    """
+
+    enabled: bool = True
+    cores: int | None = None
+    memory: int | None = None
+
+    @classmethod
+    def from_str(cls, value: str) -> Self:
+        """Parse a reservation policy.
+
+        Args:
+            value:
+                `auto` to derive the reservation from the node size, `none` to reserve nothing,
+                or space-separated `cores=<count per socket>` and `memory=<megabytes>`
+                overrides, e.g. `cores=2 memory=4096`. Unset overrides are derived.
+
+        Raises:
+            ValueError: Raised if the reservation policy is invalid.
+        """
+        value = value.strip().lower()
+        if value in ("", "auto"):
+            return cls()
+        if value == "none":
+            return cls(enabled=False)
+
+        overrides = {}
+        for option in value.split():
+            key, sep, amount = option.partition("=")
+            if not sep or key not in ("cores", "memory") or not amount.isdigit():
+                raise ValueError(
+                    f"invalid reservation option '{option}'. "
+                    + "expected 'cores=<count>' or 'memory=<megabytes>'"
+                )
+
+            overrides[key] = int(amount)
+
+        return cls(**overrides)
+
+    def plan(self, topology: list[LogicalCPU], real_memory: int) -> Reservation:
+        """Plan the resources to reserve on a compute node.
+
+        Args:
+            topology: Logical CPUs of the compute node. See `hardware.cpu_topology`.
+            real_memory: Total memory of the compute node in megabytes.
+
+        Notes:
+            - By default, one core per socket is reserved for every 32 cores of the socket on
+              nodes with at least 16 cores. Memory reserved scales with total memory, and is
+              kept between 1 GiB and 16 GiB.
+            - Reserved cores are the highest-numbered cores of each socket, following Slurm's
+              default core specialization. They are spread across the NUMA nodes of the socket,
+              starting from the last NUMA node, so that system services do not crowd a single
+              NUMA node.
+            - All hardware threads of a reserved core are reserved.
+            - At most half of the cores of a socket and half of the memory are reserved.
+        """
+        if not self.enabled:
+            return Reservation()
+
+        memory = self.memory
+        if memory is None:
+            memory = max(_AUTO_MIN_MEMORY, min(real_memory // 32, _AUTO_MAX_MEMORY))
+        memory = min(memory, real_memory // 2)
+
+        sockets: dict[int, dict[int, list[int]]] = {}
+        for cpu in topology:
+            numa = sockets.setdefault(cpu.socket, {}).setdefault(cpu.numa, [])
+            if cpu.core not in numa:
+                numa.append(cpu.core)
+
+        total = len({cpu.core for cpu in topology})
+        cores = set()
+        for numas in sockets.values():
+            available = sum(len(c) for c in numas.values())
+            count = self.cores
+            if count is None:
+                count = 0
+                if total >= _AUTO_MIN_CORES:
+                    count = max(1, available // _AUTO_CORES_PER_SOCKET)
+            count = min(count, available // 2)
+
+            # Take the highest-numbered remaining core of each NUMA node in turn.
+            candidates = [sorted(c, reverse=True) for _, c in sorted(numas.items(), reverse=True)]
+            while count > 0:
+                for numa in candidates:
+                    if count > 0 and numa:
+                        cores.add(numa.pop(0))
+                        count -= 1
+
+        reserved = [cpu for cpu in topology if cpu.core in cores]
+        return Reservation(
+            cpus=sorted(cpu.id for cpu in reserved),
+            cpu_spec_list=sorted(cpu.abstract_id for cpu in reserved),
+            memory=memory,
+        )
@@ -0,0 +1,335 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Query and control a running Slurm cluster through Slurm's REST API, `slurmrestd`."""
+
+__all__ = ["SlurmrestdBackend", "SlurmrestdClient"]
+
+import base64
+import hashlib
+import hmac
+import http.client
+import json
+import logging
+import socket
+import threading
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+from urllib.parse import quote, urlsplit
+
+from slurm_ops.control import ControlBackend, ScontrolBackend
+from slurm_ops.core import SLURM_USER, SlurmOpsError
+
+_logger = logging.getLogger(__name__)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix socket."""
+
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:  # noqa D102
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class SlurmrestdClient:
+    """Client for Slurm's REST API, `slurmrestd`.
+
+    Args:
+        address:
+            Address of `slurmrestd`, e.g. `http://localhost:6820` or
+            `unix:///run/slurmrestd/slurmrestd.socket`.
+        key: Callable returning the JWT signing key, e.g. `SlurmctldManager.jwt.get`.
+        user: User to authenticate as.
+        version: Version of the Slurm REST API to use.
+        timeout: Time in seconds before a request times out.
+        pool_size: Maximum number of idle keep-alive connections to hold open.
+        token_lifetime: Time in seconds that generated JWTs are valid for.
+
+    Notes:
+        - Requests are authenticated with an HS256 JWT signed with the cluster's
+          `jwt_hs256.key`. The JWT is reused until it is close to expiring.
+        - Connections are kept alive and reused across requests. A request sent over a
+          connection that was closed by `slurmrestd` is retried once on a new connection.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        *,
+        key: Callable[[], str],
+        user: str = SLURM_USER,
+        version: str = "v0.0.41",
+        timeout: float = 30,
+        pool_size: int = 4,
+        token_lifetime: int = 300,
+    ) -> None:
+        self._url = urlsplit(address)
+        if self._url.scheme not in ("http", "unix"):
+            raise SlurmOpsError(f"unsupported slurmrestd address {address}")
+
+        self._key = key
+        self._user = user
+        self._version = version
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._token_lifetime = token_lifetime
+        self._token: tuple[str, float] | None = None
+        self._pool: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def request(
+        self, method: str, endpoint: str, body: dict[str, Any] | None = None
+    ) -> tuple[int, dict[str, Any]]:
+        """Send a request to `slurmrestd`.
+
+        Args:
+            method: HTTP method of the request, e.g. `GET`.
+            endpoint: Endpoint relative to `/slurm/<version>/`, e.g. `nodes`.
+            body: (Optional) JSON body of the request.
+
+        Returns:
+            The HTTP status code and decoded JSON body of the response.
+
+        Raises:
+            OSError: Raised if `slurmrestd` cannot be reached.
+            http.client.HTTPException: Raised if the connection to `slurmrestd` fails.
+        """
+        path = f"/slurm/{self._version}/{endpoint}"
+        headers = {
+            "Accept": "application/json",
+            "X-SLURM-USER-NAME": self._user,
+            "X-SLURM-USER-TOKEN": self.token(),
+        }
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                content = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                # The keep-alive connection may have been closed by `slurmrestd`.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            self._release(conn, response)
+            _logger.debug("slurmrestd %s %s returned %s", method, path, response.status)
+            return response.status, json.loads(content) if content else {}
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def token(self) -> str:
+        """Get a JWT for authenticating with `slurmrestd`, generating a new one if needed."""
+        now = time.time()
+        if self._token is not None and self._token[1] - 30 > now:
+            return self._token[0]
+
+        header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        expires = int(now) + self._token_lifetime
+        payload = _b64encode(
+            json.dumps({"iat": int(now), "exp": expires, "sun": self._user}).encode()
+        )
+        signature = hmac.new(
+            self._key().encode(), f"{header}.{payload}".encode(), hashlib.sha256
+        ).digest()
+
+        token = f"{header}.{payload}.{_b64encode(signature)}"
+        self._token = (token, expires)
+        return token
+
+    def close(self) -> None:
+        """Close all idle connections to `slurmrestd`."""
+        with self._lock:
+            pool, self._pool = self._pool, []
+
+        for conn in pool:
+            conn.close()
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Get an idle connection from the pool, or open a new connection."""
+        with self._lock:
+            if self._pool:
+                return self._pool.pop(), True
+
+        if self._url.scheme == "unix":
+            return _UnixHTTPConnection(self._url.path, self._timeout), False
+
+        return http.client.HTTPConnection(
+            self._url.hostname or "localhost", self._url.port, timeout=self._timeout
+        ), False
+
+    def _release(
+        self, conn: http.client.HTTPConnection, response: http.client.HTTPResponse
+    ) -> None:
+        """Return a connection to the pool if it can be kept alive."""
+        with self._lock:
+            if not response.will_close and len(self._pool) < self._pool_size:
+                self._pool.append(conn)
+                return
+
+        conn.close()
+
+
+class _UnreachableError(Exception):
+    """Raised if `slurmrestd` cannot be reached."""
+
+
+class SlurmrestdBackend(ControlBackend):
+    """Query and control a running Slurm cluster through `slurmrestd`.
+
+    Args:
+        client: Client for the `slurmrestd` service.
+        fallback:
+            Backend to use if `slurmrestd` cannot be reached. Default: `ScontrolBackend`.
+
+    Notes:
+        - Only failures to reach `slurmrestd` fall back to `fallback`. Errors reported by
+          `slurmrestd`, e.g. an invalid node state, are raised as `SlurmOpsError`.
+    """
+
+    def __init__(
+        self, client: SlurmrestdClient, *, fallback: ControlBackend | None = None
+    ) -> None:
+        self.client = client
+        self._fallback = fallback or ScontrolBackend()
+
+    def ping(self) -> list[dict[str, Any]]:
+        """Get the ping status of all controllers."""
+        return self._with_fallback(
+            lambda: self._request("GET", "ping")["pings"],
+            self._fallback.ping,
+        )
+
+    def show_nodes(self, name: str | None = None) -> list[dict[str, Any]]:
+        """Get the information of all nodes, or of a single node if `name` is set."""
+        if name is None:
+            return self._with_fallback(
+                lambda: self._request("GET", "nodes")["nodes"],
+                self._fallback.show_nodes,
+            )
+
+        return self._with_fallback(
+            lambda: self._request("GET", f"node/{quote(name)}", missing_ok=True).get("nodes", []),
+            lambda: self._fallback.show_nodes(name),
+        )
+
+    def update_node(self, name: str, *, state: str, reason: str = "") -> None:
+        """Update the state of a node."""
+        update: dict[str, Any] = {"state": [state.upper()]}
+        if reason:
+            update["reason"] = reason.strip("'\"")
+
+        self._with_fallback(
+            lambda: self._request("POST", f"node/{quote(name)}", update),
+            lambda: self._fallback.update_node(name, state=state, reason=reason),
+        )
+
+    def configure_node(self, name: str, config: Mapping[str, Any]) -> None:
+        """Update the configuration of a registered node."""
+        update = {
+            parameter: ",".join(value) if parameter == "gres" else value
+            for parameter, value in config.items()
+        }
+
+        self._with_fallback(
+            lambda: self._request("POST", f"node/{quote(name)}", update),
+            lambda: self._fallback.configure_node(name, config),
+        )
+
+    def delete_node(self, name: str) -> None:
+        """Delete a node."""
+        self._with_fallback(
+            lambda: self._request("DELETE", f"node/{quote(name)}"),
+            lambda: self._fallback.delete_node(name),
+        )
+
+    def reconfigure(self) -> None:
+        """Instruct all Slurm daemons to re-read their configuration files."""
+        self._with_fallback(
+            lambda: self._request("GET", "reconfigure/"),
+            self._fallback.reconfigure,
+        )
+
+    def _with_fallback[T](self, request: Callable[[], T], fallback: Callable[[], T]) -> T:
+        """Run `request`, or `fallback` if `slurmrestd` cannot be reached."""
+        try:
+            return request()
+        except _UnreachableError as e:
+            _logger.warning(
+                "failed to reach slurmrestd. falling back to %s. reason: %s",
+                type(self._fallback).__name__,
+                e,
+            )
+            return fallback()
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        body: dict[str, Any] | None = None,
+        *,
+        missing_ok: bool = False,
+    ) -> dict[str, Any]:
+        """Send a request to `slurmrestd`.
+
+        Args:
+            method: HTTP method of the request.
+            endpoint: Endpoint relative to `/slurm/<version>/`.
+            body: (Optional) JSON body of the request.
+            missing_ok: If `True`, return an empty body if `slurmrestd` reports an error.
+
+        Raises:
+            SlurmOpsError: Raised if `slurmrestd` reports an error.
+        """
+        try:
+            status, response = self.client.request(method, endpoint, body)
+        except (OSError, http.client.HTTPException, json.JSONDecodeError) as e:
+            raise _UnreachableError(str(e) or type(e).__name__)
+
+        # A server error without an error report means that `slurmrestd` itself is unhealthy.
+        if status >= 500 and not response.get("errors"):
+            raise _UnreachableError(f"slurmrestd returned status {status}")
+
+        if status >= 400:
+            if missing_ok:
+                return {}
+
+            errors = "; ".join(
+                e.get("description") or e.get("error", "") for e in response.get("errors", [])
+            )
+            raise SlurmOpsError(
+                f"slurmrestd request '{method} {endpoint}' failed with status {status}. "
+                + f"reason: {errors}"
+            )
+
+        return response
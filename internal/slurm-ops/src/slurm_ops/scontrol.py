@@ -14,34 +14,206 @@
 
 """Control Slurm using `scontrol ...` commands."""
 
-__all__ = ["scontrol"]
+__all__ = ["LatencyInfo", "ScontrolRunner", "scontrol"]
 
-from subprocess import CalledProcessError
-from typing import Any
-
-from charmed_hpc_libs.ops import call
+import logging
+import random
+import subprocess
+import threading
+import time
+from typing import NamedTuple
 
 from slurm_ops.core import SlurmOpsError
 
+_logger = logging.getLogger(__name__)
+
+# Errors reported by `scontrol` when the request did not reach an active controller, e.g.
+# while the controller is unreachable, failing over, or overloaded with RPCs. Commands that
+# fail with one of these errors are retried.
+_TRANSIENT_ERRORS = (
+    "backup controller in standby mode",
+    "connection refused",
+    "resource temporarily unavailable",
+    "unable to contact slurm controller",
+)
+
+# Errors reported by `scontrol` when the request may have been processed by the controller,
+# but no response was received. Only read-only commands are retried on these errors or on a
+# timeout, as retrying a command that modifies the cluster may apply it twice.
+_AMBIGUOUS_ERRORS = (
+    "socket timed out",
+    "zero bytes were transmitted or received",
+)
+
+# `scontrol` subcommands that do not modify the cluster.
+_READ_ONLY_COMMANDS = frozenset({"ping", "show"})
+
+
+class LatencyInfo(NamedTuple):
+    """Latency statistics for an `scontrol` command.
+
+    Attributes:
+        count: Number of times the command has been run.
+        total: Total time in seconds spent running the command, including retries.
+        max: Longest time in seconds spent running the command.
+    """
+
+    count: int
+    total: float
+    max: float
 
-def scontrol(*args: str, **kwargs: Any) -> tuple[str, int]:  # noqa D417
-    """Control Slurm using `scontrol ...` commands.
 
-    Keyword Args:
-        stdin: Standard input to pipe to the `snap` command.
-        check:
-            If set to `True`, raise an error if the `snap` command
-            exits with a non-zero exit code. Default: True
+class ScontrolRunner:
+    """Run `scontrol ...` commands with timeouts and retries.
 
-    Raises:
-        SlurmOpsError: Raised if a `scontrol` command fails and check is set to `True`.
+    Args:
+        timeout: Time in seconds before an `scontrol` command is killed.
+        retries: Number of times to retry a command that fails with a transient error.
+        backoff: Initial time in seconds to wait before retrying a command.
+        max_backoff: Maximum time in seconds to wait before retrying a command.
+
+    Notes:
+        - Commands that fail because the controller is unreachable or a backup controller
+          is in standby mode are retried with jittered exponential backoff.
+        - Read-only commands, such as `show` and `ping`, are also retried if they time out
+          or if the connection to the controller is lost before a response is received.
+          Commands that modify the cluster are not retried in these cases as the controller
+          may have already applied them.
+        - The latency of each command is recorded by its `scontrol` subcommand,
+          e.g. `update` or `show`. See `latency`.
     """
-    try:
-        result = call("scontrol", *args, **kwargs)
-    except CalledProcessError as e:
-        raise SlurmOpsError(
-            f"scontrol command '{e.cmd}' failed with exit code {e.returncode}. "
-            + f"reason: {e.stderr}"
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30,
+        retries: int = 3,
+        backoff: float = 1,
+        max_backoff: float = 10,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._latency: dict[str, LatencyInfo] = {}
+
+    def __call__(
+        self,
+        *args: str,
+        stdin: str | None = None,
+        check: bool = True,
+        timeout: float | None = None,
+        retries: int | None = None,
+    ) -> tuple[str, int]:
+        """Control Slurm using `scontrol ...` commands.
+
+        Args:
+            *args: Arguments to pass to `scontrol`.
+            stdin: Standard input to pipe to the `scontrol` command.
+            check:
+                If set to `True`, raise an error if the `scontrol` command
+                exits with a non-zero exit code. Default: True
+            timeout: (Optional) Override the timeout of the runner for this command.
+            retries: (Optional) Override the number of retries of the runner for this command.
+
+        Raises:
+            SlurmOpsError:
+                Raised if a `scontrol` command fails and check is set to `True`,
+                or if a `scontrol` command times out on every attempt.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        read_only = self._command(args) in _READ_ONLY_COMMANDS
+
+        start = time.monotonic()
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    result = self._run(list(args), stdin, timeout)
+                except subprocess.TimeoutExpired as e:
+                    if attempt == retries or not read_only:
+                        raise SlurmOpsError(
+                            f"scontrol command '{e.cmd}' timed out after {timeout} seconds"
+                        )
+                else:
+                    if attempt == retries or not self._is_transient(result, read_only):
+                        break
+
+                delay = min(self.max_backoff, self.backoff * 2**attempt)
+                delay = random.uniform(delay / 2, delay)
+                _logger.warning(
+                    "scontrol command %s failed with a transient error. retrying in %.1f seconds",
+                    list(args),
+                    delay,
+                )
+                time.sleep(delay)
+        finally:
+            self._record(args, time.monotonic() - start)
+
+        if check and result.returncode != 0:
+            raise SlurmOpsError(
+                f"scontrol command '{result.args}' failed with exit code {result.returncode}. "
+                + f"reason: {result.stderr}"
+            )
+
+        return result.stdout, result.returncode
+
+    @property
+    def latency(self) -> dict[str, LatencyInfo]:
+        """Get latency statistics for each `scontrol` subcommand that has been run."""
+        with self._lock:
+            return dict(self._latency)
+
+    @staticmethod
+    def _command(args: tuple[str, ...]) -> str:
+        """Get the subcommand of an `scontrol` command, e.g. `show` for `--json show nodes`."""
+        return next((arg for arg in args if not arg.startswith("-")), "")
+
+    @staticmethod
+    def _is_transient(result: subprocess.CompletedProcess, read_only: bool) -> bool:
+        """Check if an `scontrol` command failed with an error that is worth retrying."""
+        if result.returncode == 0:
+            return False
+
+        stderr = (result.stderr or "").lower()
+        errors = _TRANSIENT_ERRORS + _AMBIGUOUS_ERRORS if read_only else _TRANSIENT_ERRORS
+        return any(error in stderr for error in errors)
+
+    def _record(self, args: tuple[str, ...], elapsed: float) -> None:
+        """Record the latency of an `scontrol` command."""
+        command = self._command(args)
+        with self._lock:
+            count, total, longest = self._latency.get(command, LatencyInfo(0, 0.0, 0.0))
+            self._latency[command] = LatencyInfo(count + 1, total + elapsed, max(longest, elapsed))
+
+        _logger.debug("scontrol command %s completed in %.3f seconds", list(args), elapsed)
+
+    @staticmethod
+    def _run(args: list[str], stdin: str | None, timeout: float) -> subprocess.CompletedProcess:
+        """Run an `scontrol` command once."""
+        cmd = ["scontrol", *args]
+        _logger.debug("running command %s", cmd)
+        try:
+            result = subprocess.run(
+                cmd, input=stdin, capture_output=True, text=True, check=True, timeout=timeout
+            )
+        except subprocess.CalledProcessError as e:
+            _logger.error(
+                "command '%s' failed with:\nexit code %s\nstderr: %s",
+                " ".join(cmd),
+                e.returncode,
+                e.stderr,
+            )
+            result = subprocess.CompletedProcess(e.cmd, e.returncode, e.stdout, e.stderr)
+
+        return subprocess.CompletedProcess(
+            args=result.args,
+            stdout=result.stdout.strip() if result.stdout else None,
+            stderr=result.stderr.strip() if result.stderr else None,
+            returncode=result.returncode,
         )
 
-    return result.stdout, result.returncode
+
+scontrol = ScontrolRunner()
+"""Default runner for `scontrol ...` commands."""
@@ -14,9 +14,17 @@
 
 """Manage Slurm's controller service, `slurmctld`."""
 
-__all__ = ["SlurmctldManager"]
+__all__ = ["PartitionEntry", "SlurmctldManager"]
 
+import hashlib
 import json
+import logging
+import shutil
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
 
 from slurmutils import (
     AcctGatherConfigEditor,
@@ -26,15 +34,171 @@ from slurmutils import (
     SlurmConfigEditor,
 )
 
-from slurm_ops import scontrol
-from slurm_ops.core import SLURM_GROUP, SLURM_USER, SlurmConfigManager, SlurmManager
+from slurm_ops import ControlBackend, ScontrolBackend
+from slurm_ops.core import (
+    SLURM_GROUP,
+    SLURM_USER,
+    SlurmConfigManager,
+    SlurmManager,
+    SlurmOpsError,
+    SnapshotStore,
+)
+from slurm_ops.fabric import render_topology
+
+_logger = logging.getLogger(__name__)
+
+# Version of the on-disk partition index format. Bump this if the format changes so that
+# existing indexes are rebuilt rather than misread.
+_PARTITION_INDEX_VERSION = 2
+
+
+@dataclass(frozen=True)
+class PartitionEntry:
+    """Indexed information about a partition configured in a `slurm.conf` include file.
+
+    Attributes:
+        include: Name of the include file that the partition is configured in.
+        default: Whether the partition is the default partition.
+        nodes: Nodes, or node sets, that are members of the partition.
+    """
+
+    include: str
+    default: bool = False
+    nodes: list[str] = field(default_factory=list)
+
+
+class _PartitionIndex:
+    """Index of the partitions configured across `slurm.conf` include files.
+
+    Notes:
+        - The index is persisted outside of the configuration directory so that it survives
+          across hooks without changing the modification time of the directory.
+        - The modification time of the configuration directory is recorded with the index.
+          Include files are replaced atomically by renaming, which updates the modification
+          time of the directory, so the index is valid as long as the directory is unchanged.
+        - If the directory has changed, each include file is checked against its recorded
+          inode, modification time, and size, and is only parsed again if it has changed.
+          The index is only persisted again if an include file has changed.
+    """
+
+    def __init__(self, config: SlurmConfigManager, file: Path, *, user: str, group: str) -> None:
+        self._config = config
+        self._file = file
+        self._user = user
+        self._group = group
+        self._directory: int | None = None
+        self._includes: dict[str, dict[str, Any]] = {}
+        self._partitions: dict[str, PartitionEntry] = {}
+        self._read()
+
+    @property
+    def partitions(self) -> dict[str, PartitionEntry]:
+        """Get the indexed partitions, re-indexing any include files that have changed."""
+        self.refresh()
+        return self._partitions
+
+    def refresh(self) -> None:
+        """Re-index include files that have been created, modified, or removed."""
+        directory = self._config.path.parent.stat().st_mtime_ns
+        if directory == self._directory:
+            _logger.debug("configuration directory is unchanged. skipping partition re-index")
+            return
+
+        includes = {n: i for n, i in self._config.includes.items() if i.exists()}
+        changed = False
+        for name in self._includes.keys() - includes.keys():
+            del self._includes[name]
+            changed = True
+
+        for name, include in includes.items():
+            signature = self._signature(include.path)
+            entry = self._includes.get(name)
+            if entry is not None and entry["signature"] == signature:
+                continue
+
+            _logger.debug("indexing partitions in `%s`", name)
+            self._includes[name] = {
+                "signature": signature,
+                "partitions": self._partitions_of(include.load()),
+            }
+            changed = True
+
+        # Record the new modification time of the directory even if no include file has
+        # changed so that the include files are not checked again while this index is loaded.
+        self._directory = directory
+        if changed:
+            self._rebuild()
+            self._write()
+
+    def update(self, include: str, config: Any) -> None:
+        """Re-index an include file from a configuration model that was just written to it."""
+        path = self._config.includes[include].path
+        self._includes[include] = {
+            "signature": self._signature(path),
+            "partitions": self._partitions_of(config),
+        }
+        # Other include files may have changed since the directory was last checked,
+        # so check each include file again on the next refresh.
+        self._directory = None
+        self._rebuild()
+        self._write()
+
+    @staticmethod
+    def _signature(path: Path) -> list[int]:
+        info = path.stat()
+        return [info.st_ino, info.st_mtime_ns, info.st_size]
+
+    @staticmethod
+    def _partitions_of(config: Any) -> dict[str, dict[str, Any]]:
+        return {
+            name: {"default": bool(partition.default), "nodes": list(partition.nodes or [])}
+            for name, partition in config.partitions.items()
+        }
+
+    def _rebuild(self) -> None:
+        self._partitions = {
+            name: PartitionEntry(include=include, **partition)
+            for include, entry in sorted(self._includes.items())
+            for name, partition in entry["partitions"].items()
+        }
+
+    def _read(self) -> None:
+        try:
+            index = json.loads(self._file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        if index.get("version") != _PARTITION_INDEX_VERSION:
+            _logger.debug("partition index version has changed. rebuilding index")
+            return
+
+        self._directory = index["directory"]
+        self._includes = index["includes"]
+        self._rebuild()
+
+    def _write(self) -> None:
+        swap = self._file.with_name(self._file.name + ".swp")
+        swap.write_text(
+            json.dumps(
+                {
+                    "version": _PARTITION_INDEX_VERSION,
+                    "directory": self._directory,
+                    "includes": self._includes,
+                }
+            )
+        )
+        swap.chmod(0o644)
+        shutil.chown(swap, self._user, self._group)
+        swap.replace(self._file)
 
 
 class SlurmctldManager(SlurmManager):
     """Manage Slurm's controller service, `slurmctld`."""
 
-    def __init__(self, snap: bool = False) -> None:
+    def __init__(self, snap: bool = False, *, backend: ControlBackend | None = None) -> None:
         super().__init__("slurmctld", snap)
+        self._partition_index: _PartitionIndex | None = None
+        self.backend = backend or ScontrolBackend()
 
     @property
     def config(self) -> SlurmConfigManager[SlurmConfigEditor]:
@@ -71,6 +235,7 @@ class SlurmctldManager(SlurmManager):
             mode=0o600,
             user=self.user,
             group=self.group,
+            store=SnapshotStore(self._ops_manager.var_lib_path / "snapshots"),
         )
 
     @property
@@ -106,6 +271,50 @@ class SlurmctldManager(SlurmManager):
             group=self.group,
         )
 
+    @property
+    def topology(self) -> Path:
+        """Get the path to the `topology.conf` file."""
+        return self._ops_manager.etc_path / "topology.conf"
+
+    def set_topology(
+        self, switches: Mapping[str | None, Iterable[str]], *, block: bool = False
+    ) -> bool:
+        """Set the network topology of the cluster in the `topology.conf` file.
+
+        Args:
+            switches:
+                Mapping of leaf switch names to the names of the compute nodes connected to
+                them. See `fabric.render_topology`. If empty, `topology.conf` is removed.
+            block: If `True`, configure a block topology rather than a tree topology.
+
+        Returns:
+            `True` if the `topology.conf` file has changed.
+
+        Notes:
+            - Slurm does not provide a data model for `topology.conf`, so the file is rendered
+              in full and only rewritten if its contents have changed.
+        """
+        content = render_topology(switches, block=block)
+        try:
+            current = self.topology.read_text()
+        except FileNotFoundError:
+            current = None
+
+        if content == (current or ""):
+            return False
+
+        if not content:
+            _logger.info("removing `%s` as no network topology is configured", self.topology.name)
+            self.topology.unlink()
+            return True
+
+        swap = self.topology.with_name(f".{self.topology.name}.swp")
+        swap.write_text(content)
+        swap.chmod(0o644)
+        shutil.chown(swap, self.user, self.group)
+        swap.replace(self.topology)
+        return True
+
     @property
     def user(self) -> str:
         """Get the user that the `slurmctld` service runs as."""
@@ -116,6 +325,11 @@ class SlurmctldManager(SlurmManager):
         """Get the group that the `slurmctld` service runs as."""
         return SLURM_GROUP
 
+    @property
+    def partitions(self) -> dict[str, PartitionEntry]:
+        """Get the partitions configured in `slurm.conf` include files."""
+        return self._get_partition_index().partitions
+
     def get_default_partition(self) -> str:
         """Get the name of the default partition.
 
@@ -123,11 +337,9 @@ class SlurmctldManager(SlurmManager):
             Name of the default partition. An empty string is returned if there is
             no configured default partition.
         """
-        for include in self.config.includes.values():
-            config = include.load()
-            for partition in config.partitions.values():
-                if partition.default:
-                    return partition.partition_name
+        for name, partition in self.partitions.items():
+            if partition.default:
+                return name
 
         return ""
 
@@ -142,17 +354,17 @@ class SlurmctldManager(SlurmManager):
             - If `new` is an empty string, the default partition will be unset and the
               Slurm cluster will have no default partition.
         """
-        includes = self.config.includes
-        new_default_include = includes[f"slurm.conf.{new}"]
-        previous_default_include = includes[f"slurm.conf.{previous}"]
+        index = self._get_partition_index()
+        partitions = index.partitions
+        for name, default in [(new, True), (previous, False)]:
+            if name == "" or name not in partitions:
+                continue
 
-        if new != "" and new_default_include.exists():
-            with new_default_include.edit() as config:
-                config.partitions[new].default = True
+            include = partitions[name].include
+            with self.config.includes[include].edit() as config:
+                config.partitions[name].default = default
 
-        if previous != "" and previous_default_include.exists():
-            with previous_default_include.edit() as config:
-                config.partitions[previous].default = False
+            index.update(include, config)
 
     def get_controllers(self) -> list[str]:
         """Get hostnames for all controllers defined in the slurm.conf file."""
@@ -164,6 +376,31 @@ class SlurmctldManager(SlurmManager):
 
         return controllers
 
+    def get_config_state(self) -> dict[str, Any]:
+        """Get the current state of all configuration files managed by `slurmctld`.
+
+        Returns:
+            Mapping of configuration file names to their state. `slurm.conf` and its `include`
+            files are mapped to their parsed parameters. All other configuration files are mapped
+            to a checksum of their contents, as they may contain credentials. Configuration files
+            that do not exist are omitted.
+        """
+        state: dict[str, Any] = {}
+        if self.config.exists():
+            state[self.config.name] = self.config.load().dict()
+
+        for name, include in self.config.includes.items():
+            state[name] = include.load().dict()
+
+        for manager in (self.acct_gather, self.cgroup, self.gres, self.oci):
+            if manager.exists():
+                state[manager.name] = hashlib.sha256(manager.path.read_bytes()).hexdigest()
+
+        if self.topology.exists():
+            state[self.topology.name] = hashlib.sha256(self.topology.read_bytes()).hexdigest()
+
+        return state
+
     def get_controller_status(self) -> str:
         """Get the status of the current controller instance."""
         # Example snippet of ping output:
@@ -181,22 +418,52 @@ class SlurmctldManager(SlurmManager):
         #       "mode": "backup"
         #     }
         #   ],
-        stdout, _ = scontrol("ping", "--json")
-        ping_output = json.loads(stdout)
-
-        for ping in ping_output["pings"]:
+        for ping in self._ping():
             if ping["hostname"] == self.hostname:
                 return f"{ping['mode']} - {ping['pinged']}"
 
         return ""
 
+    def wait_for_ping(self, *, timeout: float = 60, interval: float = 2) -> bool:
+        """Wait for the current controller instance to respond to `scontrol ping`.
+
+        Args:
+            timeout: Maximum time in seconds to wait for the controller to respond.
+            interval: Time in seconds to wait between each `scontrol ping`.
+
+        Returns:
+            `True` if the controller is pinged as `UP` before the timeout expires,
+            otherwise `False`.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if any(
+                    ping["hostname"] == self.hostname and ping["pinged"] == "UP"
+                    for ping in self._ping()
+                ):
+                    return True
+            except SlurmOpsError as e:
+                _logger.debug("failed to ping controller. reason:\n%s", e.message)
+
+            if time.monotonic() >= deadline:
+                _logger.debug("controller did not respond within %s seconds", timeout)
+                return False
+
+            time.sleep(interval)
+
+    def _ping(self) -> list[dict[str, Any]]:
+        """Get the ping status of all controllers."""
+        return self.backend.ping()
+
     def reconfigure(self, *, restart: bool = False) -> None:
         """Reconfigure the `slurmctld` service running on the machine.
 
         Args:
             restart:
                 If `True`, restart the `slurmctld` service.
-                If `False`, reconfigure the `slurmctld` service with `scontrol reconfigure`.
+                If `False`, reconfigure the `slurmctld` service through the control backend,
+                e.g. with `scontrol reconfigure`.
 
         Raises:
             SlurmOpsError: Raised if a failure occurs when reconfiguring the `slurmctld` service.
@@ -204,4 +471,16 @@ class SlurmctldManager(SlurmManager):
         if restart:
             super().reconfigure()
         else:
-            scontrol("reconfigure")
+            self.backend.reconfigure()
+
+    def _get_partition_index(self) -> _PartitionIndex:
+        """Get the partition index, loading it from disk if it has not been loaded yet."""
+        if self._partition_index is None:
+            self._partition_index = _PartitionIndex(
+                self.config,
+                self._ops_manager.var_lib_path / "partitions.json",
+                user=self.user,
+                group=self.group,
+            )
+
+        return self._partition_index
@@ -16,28 +16,60 @@
 
 __all__ = ["SlurmdManager"]
 
-import json
 import logging
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
+from itertools import groupby
+from pathlib import Path
 from subprocess import CalledProcessError
 from typing import Any, cast
 
-import pynvml
-from charmed_hpc_libs.ops import call
-from slurmutils import Node
+from charmed_hpc_libs.ops import call, systemctl
+from slurmutils import Gres, Node
 
-from slurm_ops import SlurmOpsError, scontrol
-from slurm_ops.core import SLURMD_GROUP, SLURMD_USER, SlurmManager
+from slurm_ops import ControlBackend, NodeInventory, ScontrolBackend, SlurmOpsError
+from slurm_ops.core import LIVE_NODE_PARAMETERS, SLURMD_GROUP, SLURMD_USER, SlurmManager
+from slurm_ops.fabric import discover_leaf_switch
+from slurm_ops.hardware import (
+    HardwareProfile,
+    cpu_topology,
+    discover_gpus,
+    hardware_fingerprint,
+)
+from slurm_ops.reservation import Reservation, ReservationPolicy
 
 _logger = logging.getLogger(__name__)
 
+# Values that node parameters are reset to when they are removed from the node configuration.
+_NODE_DEFAULTS = {"comment": "", "extra": "", "features": [], "gres": [], "weight": 1}
+
 
 class SlurmdManager(SlurmManager):
     """Manage Slurm's compute service, `slurmd`."""
 
-    def __init__(self, partition_name: str, *, snap: bool = False) -> None:
+    def __init__(
+        self,
+        partition_name: str,
+        *,
+        snap: bool = False,
+        backend: ControlBackend | None = None,
+        reservation_policy: ReservationPolicy | None = None,
+    ) -> None:
         super().__init__("slurmd", snap)
         self._partition_name = partition_name
+        self._inventory = NodeInventory(lambda: self.name, backend=backend or ScontrolBackend())
+        self.reservation_policy = reservation_policy or ReservationPolicy()
+
+    @property
+    def backend(self) -> ControlBackend:
+        """Get the backend used to query and control the Slurm cluster."""
+        return self._inventory.backend
+
+    @backend.setter
+    def backend(self, value: ControlBackend) -> None:
+        self._inventory.backend = value
+        self._inventory.invalidate()
 
     @property
     def conf(self) -> Node:
@@ -108,53 +140,42 @@ class SlurmdManager(SlurmManager):
         """Get the group that the `slurmd` service runs as."""
         return SLURMD_GROUP
 
-    def get_gpu_info(self) -> list[str]:
-        """Get the GPU devices on this node.
-
-        Returns:
-            A dict mapping model names to a list of device minor numbers. Model names are lowercase
-            with whitespace replaced by underscores. For example:
+    @property
+    def _hardware_file(self) -> Path:
+        """Get the path to the persisted hardware profile of this compute node."""
+        return self._ops_manager.var_lib_path / "hardware.json"
 
-            {'tesla_t4': [0, 1], 'l40s': [2, 3]}
+    def get_gpu_info(self) -> list[str]:
+        """Get the GPU devices on this node as `gpu:<model>:<count>` GRES strings.
 
-            represents a node with two Tesla T4 GPUs at /dev/nvidia0 and /dev/nvidia1, and two L40S
-            GPUs at /dev/nvidia2 and /dev/nvidia3.
+        Notes:
+            - GPU models and device minor numbers are read from the persisted hardware profile.
+              See `hardware_profile` for when the profile is rediscovered.
+            - MIG devices are counted in place of the GPU they are partitioned from. Each
+              MIG profile is a distinct GRES type, e.g. `gpu:a100_1g.10gb:7`.
         """
-        gpu_info = {}
-        try:
-            pynvml.nvmlInit()
-
-            gpu_count = pynvml.nvmlDeviceGetCount()
-            for i in range(gpu_count):
-                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+        return _gpu_gres(self.hardware_profile())
 
-                # Make model name lowercase and replace whitespace with underscores
-                # to turn into a GRES-compatible format. For example, "Tesla T4" -> "tesla_t4",
-                # which can be added as "Gres=gpu:tesla_t4:1".
-                #
-                # Aims to follow convention set by Slurm autodetect:
-                # https://slurm.schedmd.com/gres.html#AutoDetect
-                model = pynvml.nvmlDeviceGetName(handle)
-                model = "_".join(model.split()).lower()
+    def hardware_profile(self, *, refresh: bool = False) -> HardwareProfile:
+        """Get the hardware profile of this compute node.
 
-                minor_number = pynvml.nvmlDeviceGetMinorNumber(handle)
-                gpu_info[model] = gpu_info.get(model, []) + [minor_number]
-
-            pynvml.nvmlShutdown()
-        except pynvml.NVMLError as e:
-            _logger.info("no GPU info gathered: drivers cannot be detected")
-            _logger.debug("NVML init failed with reason: %s", e)
-
-        return [f"gpu:{model}:{len(devices)}" for model, devices in gpu_info.items()]
-
-    def build_node(self) -> Node:
-        """Build a new `Node` object from the output of `slurmd -C`.
-
-        For details see: https://slurm.schedmd.com/slurmd.html
+        Args:
+            refresh: If `True`, rediscover the hardware profile even if it has not changed.
 
         Raises:
             SlurmOpsError: Raised if the command `slurmd -C` fails.
+
+        Notes:
+            - Discovering the hardware profile requires running `slurmd -C`, querying NVML,
+              and discovering the InfiniBand fabric. The profile is persisted with a fingerprint
+              of the hardware, and is only rediscovered if the fingerprint changes.
         """
+        fingerprint = hardware_fingerprint()
+        profile = HardwareProfile.load(self._hardware_file)
+        if not refresh and profile is not None and profile.fingerprint == fingerprint:
+            return profile
+
+        _logger.info("discovering hardware profile of compute node")
         try:
             result = call("slurmd", "-C")
         except CalledProcessError as e:
@@ -166,15 +187,41 @@ class SlurmdManager(SlurmManager):
                 )
             )
 
-        node = Node.from_str(result.stdout.splitlines()[:-1][0])
+        profile = HardwareProfile(
+            fingerprint=fingerprint,
+            node=result.stdout.splitlines()[:-1][0],
+            gpus=discover_gpus(),
+            switch=discover_leaf_switch(),
+        )
+        profile.dump(self._hardware_file)
+        return profile
 
-        # Set the `MemSpecLimit` for this node. This memory allocation will be reserved for
-        # the services and other operations-related routines running on this unit.
-        # We know `RealMemory` is type `int` because it is returned by `slurmd -C`.
-        node.mem_spec_limit = min(1024, cast(int, node.real_memory) // 2)
+    def hardware_changed(self) -> bool:
+        """Check if the hardware of this compute node has changed since it was last discovered."""
+        profile = HardwareProfile.load(self._hardware_file)
+        return profile is None or profile.fingerprint != hardware_fingerprint()
+
+    def build_node(self) -> Node:
+        """Build a new `Node` object from the hardware profile of this compute node.
+
+        For details see: https://slurm.schedmd.com/slurmd.html
+
+        Raises:
+            SlurmOpsError: Raised if the command `slurmd -C` fails.
+        """
+        profile = self.hardware_profile()
+        node = Node.from_str(profile.node)
+
+        # Set the `CpuSpecList` and `MemSpecLimit` for this node. These resources will be
+        # reserved for the services and other operations-related routines running on this unit.
+        reservation = self.reservation()
+        if reservation.cpu_spec_list:
+            node.cpu_spec_list = reservation.cpu_spec_list
+        if reservation.memory is not None:
+            node.mem_spec_limit = reservation.memory
 
-        # Detect if there are any additional GPU resources on this unit.
-        node.gres = self.get_gpu_info()
+        # Add any additional GPU resources on this unit.
+        node.gres = _gpu_gres(profile)
 
         # Delete `NodeName` as it cannot be set in the `--conf` flag.
         del node.node_name
@@ -185,20 +232,131 @@ class SlurmdManager(SlurmManager):
 
         return node
 
+    def reservation(self) -> Reservation:
+        """Get the resources reserved for system services on this compute node.
+
+        Raises:
+            SlurmOpsError: Raised if the command `slurmd -C` fails.
+
+        Notes:
+            - The reservation is planned from the CPU topology and the `RealMemory` of this
+              compute node with `reservation_policy`.
+        """
+        node = Node.from_str(self.hardware_profile().node)
+        # We know `RealMemory` is type `int` because it is returned by `slurmd -C`.
+        return self.reservation_policy.plan(cpu_topology(), cast(int, node.real_memory))
+
+    def pin_services(self, services: Iterable[str]) -> None:
+        """Pin system services to the CPUs reserved for system services.
+
+        Args:
+            services: Names of the systemd units to pin, e.g. `snap.node-exporter.node-exporter`.
+
+        Notes:
+            - Services are pinned by setting `AllowedCPUs=` on their cgroup with
+              `systemctl set-property`. This applies immediately without restarting the
+              services, and persists across reboots. Services are unpinned if no CPUs are
+              reserved.
+            - `slurmd` itself is not pinned here. Slurm confines `slurmd` to the CPUs in
+              `CpuSpecList` when the `task/cgroup` plugin is enabled. Pinning `slurmd` with
+              systemd would also pin the jobs it launches.
+            - Services that do not exist on this compute node are skipped.
+        """
+        cpus = ",".join(_ranges(self.reservation().cpus))
+        for service in services:
+            _, returncode = systemctl("set-property", service, f"AllowedCPUs={cpus}", check=False)
+            if returncode != 0:
+                _logger.warning("failed to pin service '%s' to CPUs '%s'", service, cpus)
+
+    def build_gres(self) -> list[Gres]:
+        """Build `gres.conf` entries for the GPUs of this compute node.
+
+        Notes:
+            - Each GPU gets its own entry with `Cores=` set to the CPU cores local to the GPU,
+              and `Links=` set to its NVLink connections to the other GPUs of this compute node.
+              This enables Slurm to allocate GPU-local cores and NVLink-connected GPU sets.
+            - Entries are scoped to this compute node with `NodeName=` so that entries for
+              every compute node can be merged into a single `gres.conf` file.
+            - Each MIG device of a MIG-enabled GPU gets its own entry with `MultipleFiles=` set
+              to the device files required to access the MIG device, and `Cores=` set to the
+              CPU cores local to its parent GPU.
+        """
+        entries = []
+        for gpu in self.hardware_profile().gpus:
+            cores = _ranges(gpu.cores) if gpu.cores else None
+            if gpu.mig:
+                for mig in gpu.mig:
+                    entry = Gres(
+                        name="gpu",
+                        type=_mig_type(gpu.model, mig.profile),
+                        multiplefiles=mig.files,
+                        nodename=self.name,
+                    )
+                    if cores:
+                        entry.cores = cores
+
+                    entries.append(entry)
+
+                continue
+
+            entry = Gres(
+                name="gpu", type=gpu.model, file=f"/dev/nvidia{gpu.minor}", nodename=self.name
+            )
+            if cores:
+                entry.cores = cores
+            if gpu.links:
+                entry.links = gpu.links
+
+            entries.append(entry)
+
+        return entries
+
+    def leaf_switch(self, *, refresh: bool = False) -> str | None:
+        """Get the InfiniBand leaf switch that this compute node is connected to.
+
+        Args:
+            refresh: If `True`, rediscover the leaf switch even if the hardware has not changed.
+
+        Returns:
+            Name of the leaf switch in Slurm's network topology, or `None` if this compute node
+            is not connected to an InfiniBand fabric.
+
+        Raises:
+            SlurmOpsError: Raised if the command `slurmd -C` fails.
+
+        Notes:
+            - The leaf switch is persisted with the hardware profile. Compute nodes may be
+              recabled without any change to their hardware, so callers should refresh the
+              leaf switch periodically. See `fabric.discover_leaf_switch`.
+        """
+        profile = self.hardware_profile()
+        if refresh:
+            switch = discover_leaf_switch()
+            if switch != profile.switch:
+                _logger.info(
+                    "infiniband leaf switch changed from '%s' to '%s'", profile.switch, switch
+                )
+                profile = replace(profile, switch=switch)
+                profile.dump(self._hardware_file)
+
+        return profile.switch
+
     def show_node(self) -> dict[str, Any]:
         """Get the output of `scontrol show node <nodename>` for this compute node.
 
         Raises:
-            SlurmOpsError: Raised if `scontrol` fails to retrieve this compute node's information.
+            SlurmOpsError: Raised if this compute node's information cannot be retrieved.
 
         Warnings:
             This method will always fail if this compute node is not registered with
             a Slurm controller.
         """
-        result = scontrol("--json", "show", "node", self.name)
-        info = json.loads(result[0])["nodes"][0]
+        info = self._inventory.get(self.name)
+        if info is None:
+            raise SlurmOpsError(f"node '{self.name}' is not registered with slurm")
+
         _logger.debug(
-            "retrieved configuration for node '%s' from slurm with scontrol:\n%s",
+            "retrieved configuration for node '%s' from slurm:\n%s",
             self.name,
             info,
         )
@@ -215,12 +373,45 @@ class SlurmdManager(SlurmManager):
         #   the `slurmd` units still have running jobs, but the cluster administrator
         #   is applying updates to the node configuration, or removing the node from the
         #   Charmed HPC cluster. Is it a documentation or technical issue?
-        scontrol("delete", f"nodename={self.name}")
+        try:
+            self.backend.delete_node(self.name)
+        finally:
+            self._inventory.invalidate()
+
+    def update(self, changes: Mapping[str, Any]) -> None:
+        """Update the configuration of this compute node in Slurm without re-registering it.
+
+        Args:
+            changes: Node parameters to update, as returned by `Node.dict()`.
+                Parameters set to `None` are reset to their default values.
+
+        Raises:
+            SlurmOpsError: Raised if a parameter cannot be updated on a registered node, or if
+                a failure occurs when updating this compute node.
+
+        Notes:
+            - Only parameters in `LIVE_NODE_PARAMETERS` can be updated. Changes to other
+              parameters require that this compute node is deleted and registered again.
+              See `classify_node_changes`.
+        """
+        if unsupported := sorted(changes.keys() - LIVE_NODE_PARAMETERS):
+            raise SlurmOpsError(
+                f"cannot update parameters {unsupported} of registered node '{self.name}'"
+            )
+
+        config = {
+            parameter: _NODE_DEFAULTS[parameter] if value is None else value
+            for parameter, value in changes.items()
+        }
+        _logger.info("updating configuration of node %s to %s", self.name, config)
+        try:
+            self.backend.configure_node(self.name, config)
+        finally:
+            self._inventory.invalidate()
 
     def exists(self) -> bool:
         """Check if this compute node already exists in Slurm."""
-        # A non-zero returncode means that the compute node doesn't exist in Slurm.
-        return scontrol("show", "node", self.name, check=False)[1] == 0
+        return self.name in self._inventory
 
     def reconfigure(self, *, state: str = "", reason: str = "") -> None:
         """Reconfigure the `slurmd` service running on the machine.
@@ -233,25 +424,49 @@ class SlurmdManager(SlurmManager):
             SlurmOpsError: Raised if a failure occurs when reconfiguring the `slurmd` service.
         """
         super().reconfigure()
+        self._inventory.invalidate()
         if not state:
             return
 
-        cmd = ["update", f"nodename={self.name}", f"state={state}"]
         if state != "idle":
-            if reason:
-                # Wrap reason with quotes if it isn't. Slurm requires reasons to be in quotes.
-                if not (reason.startswith(("'", '"')) and reason.endswith(("'", '"'))):
-                    reason = f"'{reason}'"
-            else:
-                reason = "'n/a'"
-
-            cmd.append(f"reason={reason}")
-        elif state == "idle" and reason:
+            reason = reason or "n/a"
+        elif reason:
             _logger.warning(
                 "the 'idle' state does not require a reason to be set. "
                 f"not updating node's {self.name} 'reason' field to '{reason}'."
             )
+            reason = ""
 
         _logger.info("setting state of node %s to state '%s'", self.name, state)
-        scontrol(*cmd)
+        try:
+            self.backend.update_node(self.name, state=state, reason=reason)
+        finally:
+            self._inventory.invalidate()
         _logger.info("successfully updated state of node %s to '%s'", self.name, state)
+
+
+def _gpu_gres(profile: HardwareProfile) -> list[str]:
+    """Get the GPUs and MIG devices of a hardware profile as `gpu:<type>:<count>` GRES strings."""
+    counts: Counter[str] = Counter()
+    for gpu in profile.gpus:
+        counts.update([_mig_type(gpu.model, mig.profile) for mig in gpu.mig] or [gpu.model])
+
+    return [f"gpu:{model}:{count}" for model, count in counts.items()]
+
+
+def _mig_type(model: str, profile: str) -> str:
+    """Get the GRES type of a MIG device, e.g. `a100_1g.10gb`.
+
+    Aims to follow the naming convention used by Slurm's NVML autodetection for MIG devices.
+    """
+    return f"{model}_{profile}"
+
+
+def _ranges(values: list[int]) -> list[str]:
+    """Compress a sorted list of integers into ranges, e.g. `[0, 1, 2, 5]` -> `["0-2", "5"]`."""
+    ranges = []
+    for _, group in groupby(enumerate(values), key=lambda item: item[1] - item[0]):
+        items = [value for _, value in group]
+        ranges.append(f"{items[0]}-{items[-1]}" if len(items) > 1 else f"{items[0]}")
+
+    return ranges
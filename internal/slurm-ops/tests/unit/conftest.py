@@ -19,6 +19,13 @@ from unittest.mock import Mock
 
 import pytest
 from pytest_mock import MockerFixture
+from slurm_ops.core import SlurmConfigManager
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_config_cache() -> None:
+    """Clear the parsed configuration cache so that each test starts cold."""
+    SlurmConfigManager.cache_clear()
 
 
 @pytest.fixture(scope="function")
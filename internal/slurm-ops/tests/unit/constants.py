@@ -312,3 +312,58 @@ SCONTROL_SHOW_NODE_OUTPUT = r"""
   "warnings": []
 }
 """
+
+# Two leaf switches connected through a spine switch. `node-0` and `node-1` are connected to
+# `leaf01`, and `node-2` is connected to `leaf02`.
+IBNETDISCOVER_OUTPUT = """
+#
+# Topology file: generated on Mon Mar  2 10:15:42 2026
+#
+# Initiated from node 0c42a10300a0b010 port 0c42a10300a0b010
+
+vendid=0x2c9
+devid=0xd2f0
+sysimgguid=0xb83fd20300f1a000
+switchguid=0xb83fd20300f1a000(b83fd20300f1a000)
+Switch\t41 "S-b83fd20300f1a000"\t\t# "spine01" enhanced port 0 lid 1 lmc 0
+[1]\t"S-b83fd20300f1b000"[33]\t\t# "leaf01" lid 2 4xHDR
+[2]\t"S-b83fd20300f1c000"[33]\t\t# "leaf02" lid 3 4xHDR
+
+vendid=0x2c9
+devid=0xd2f0
+sysimgguid=0xb83fd20300f1b000
+switchguid=0xb83fd20300f1b000(b83fd20300f1b000)
+Switch\t41 "S-b83fd20300f1b000"\t\t# "leaf01" enhanced port 0 lid 2 lmc 0
+[1]\t"H-0c42a10300a0b010"[1](c42a10300a0b010) \t\t# "node-0 mlx5_0" lid 4 4xHDR
+[2]\t"H-0c42a10300a0b020"[1](c42a10300a0b020) \t\t# "node-1 mlx5_0" lid 5 4xHDR
+[33]\t"S-b83fd20300f1a000"[1]\t\t# "spine01" lid 1 4xHDR
+
+vendid=0x2c9
+devid=0xd2f0
+sysimgguid=0xb83fd20300f1c000
+switchguid=0xb83fd20300f1c000(b83fd20300f1c000)
+Switch\t41 "S-b83fd20300f1c000"\t\t# "leaf02" enhanced port 0 lid 3 lmc 0
+[1]\t"H-0c42a10300a0b030"[1](c42a10300a0b030) \t\t# "node-2 mlx5_0" lid 6 4xHDR
+[33]\t"S-b83fd20300f1a000"[2]\t\t# "spine01" lid 1 4xHDR
+
+vendid=0x2c9
+devid=0x101b
+sysimgguid=0xc42a10300a0b010
+caguid=0xc42a10300a0b010
+Ca\t1 "H-0c42a10300a0b010"\t\t# "node-0 mlx5_0"
+[1](c42a10300a0b010) \t"S-b83fd20300f1b000"[1]\t\t# lid 4 lmc 0 "leaf01" lid 2 4xHDR
+
+vendid=0x2c9
+devid=0x101b
+sysimgguid=0xc42a10300a0b020
+caguid=0xc42a10300a0b020
+Ca\t1 "H-0c42a10300a0b020"\t\t# "node-1 mlx5_0"
+[1](c42a10300a0b020) \t"S-b83fd20300f1b000"[2]\t\t# lid 5 lmc 0 "leaf01" lid 2 4xHDR
+
+vendid=0x2c9
+devid=0x101b
+sysimgguid=0xc42a10300a0b030
+caguid=0xc42a10300a0b030
+Ca\t1 "H-0c42a10300a0b030"\t\t# "node-2 mlx5_0"
+[1](c42a10300a0b030) \t"S-b83fd20300f1c000"[1]\t\t# lid 6 lmc 0 "leaf02" lid 3 4xHDR
+"""
@@ -15,6 +15,7 @@
 
 """Unit tests for the classes and functions in the `slurm_ops.core.base` module."""
 
+import os
 import stat
 from pathlib import Path
 from subprocess import CalledProcessError, CompletedProcess
@@ -30,6 +31,7 @@ from constants import (
 from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
 from slurm_ops import (
+    InstallPlan,
     SackdManager,
     SlurmctldManager,
     SlurmdbdManager,
@@ -84,6 +86,24 @@ class TestAptManager:
         f_info = Path("/var/lib/slurm/checkpoint").stat()
         assert stat.filemode(f_info.st_mode) == "drwxr-xr-x"
 
+    def test_plan_install(self, mock_manager, mocker: MockerFixture) -> None:
+        """Test the `plan_install` method."""
+        manager, service = mock_manager
+        mock_init_ppa = mocker.patch("slurm_ops.core.base._AptManager._init_ppa")
+        mock_apt_install = mocker.patch("slurm_ops.core.provision._apt_install")
+        mock_overrides = mocker.patch("slurm_ops.core.base._AptManager._apply_overrides")
+        mocker.patch("shutil.chown")
+
+        plan = InstallPlan()
+        manager.plan_install(plan)
+        assert plan.packages[0] == service
+
+        plan.execute()
+        mock_init_ppa.assert_called_once_with(UBUNTU_HPC_SLURM_PPA_URI)
+        mock_apt_install.assert_called_once_with(plan.packages)
+        mock_overrides.assert_called_once()
+        assert Path("/var/lib/slurm/checkpoint").exists()
+
     def test_version(self, mock_manager, mock_run) -> None:
         """Test the `version` method."""
         manager, service = mock_manager
@@ -112,6 +132,30 @@ class TestAptManager:
             + f"reason: Package {service}.amd64 is not installed!"
         )
 
+    def test_version_cache(
+        self, mock_manager, mock_run, mocker: MockerFixture, fs: FakeFilesystem
+    ) -> None:
+        """Test that `version` is cached until the dpkg status file is modified."""
+        manager, service = mock_manager
+        mocker.patch.dict("slurm_ops.core.base._version_cache", clear=True)
+        fs.create_file("/var/lib/dpkg/status")
+        mock_run.side_effect = [
+            CompletedProcess([], returncode=0, stdout="amd64"),
+            CompletedProcess([], returncode=1),
+            CompletedProcess([], returncode=0, stdout="amd64"),
+            CompletedProcess([], returncode=0, stdout=SLURM_APT_INFO.substitute(service=service)),
+        ]
+
+        assert manager.is_installed() is False
+        assert manager.is_installed() is False
+        assert mock_run.call_count == 2
+
+        # Installing packages modifies the dpkg status file.
+        os.utime("/var/lib/dpkg/status", ns=(1, 1))
+        assert manager.version() == "23.11.7-2ubuntu1"
+        assert manager.version() == "23.11.7-2ubuntu1"
+        assert mock_run.call_count == 4
+
     def test_is_installed(self, mock_manager, mock_run) -> None:
         """Test the `is_installed` method."""
         manager, service = mock_manager
@@ -313,6 +357,25 @@ class TestSnapManager:
             "unable to retrieve snap info. ensure slurm is correctly installed"
         )
 
+    def test_version_cache(
+        self, mock_manager, mock_run, mocker: MockerFixture, fs: FakeFilesystem
+    ) -> None:
+        """Test that `version` is cached until the revision of the `slurm` snap changes."""
+        manager, _ = mock_manager
+        mocker.patch.dict("slurm_ops.core.base._version_cache", clear=True)
+        fs.create_symlink("/snap/slurm/current", "x1")
+        mock_run.return_value = CompletedProcess([], returncode=0, stdout=SLURM_SNAP_INFO_ACTIVE)
+
+        assert manager.version() == "23.11.7"
+        assert manager.is_installed() is True
+        assert mock_run.call_count == 1
+
+        # Refreshing the snap changes the current revision.
+        Path("/snap/slurm/current").unlink()
+        fs.create_symlink("/snap/slurm/current", "x2")
+        assert manager.version() == "23.11.7"
+        assert mock_run.call_count == 2
+
     def test_is_installed(self, mock_manager, mock_run) -> None:
         """Test the `is_installed` method."""
         manager, _ = mock_manager
@@ -15,6 +15,7 @@
 
 """Unit tests for the Slurm service configuration managers."""
 
+import os
 import stat
 from pathlib import Path
 
@@ -88,6 +89,41 @@ class TestSlurmConfigManager:
         include = includes[f"{mock_config_manager.name}.profiling"]
         assert isinstance(include, SlurmConfigManager)
 
+    def test_includes_index(
+        self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem
+    ) -> None:
+        """Test that `includes` is only rebuilt when the configuration directory changes."""
+        mock_config_manager.create()
+        includes = mock_config_manager.includes
+        assert len(includes) == 0
+        assert mock_config_manager.includes is includes
+
+        # Includes created and deleted through a manager update the index.
+        includes[f"{mock_config_manager.name}.compute"].create()
+        includes = mock_config_manager.includes
+        assert list(includes) == [f"{mock_config_manager.name}.compute"]
+        assert mock_config_manager.includes is includes
+
+        includes[f"{mock_config_manager.name}.compute"].delete()
+        assert len(mock_config_manager.includes) == 0
+
+        # Includes created by other processes are detected.
+        fs.create_file(mock_config_manager.path.with_suffix(".conf.overrides"))
+        # `pyfakefs` does not update the modification time of directories, so
+        # bump it manually as a real filesystem would.
+        parent = mock_config_manager.path.parent
+        mtime = parent.stat().st_mtime_ns + 1
+        os.utime(parent, ns=(mtime, mtime))
+        assert list(mock_config_manager.includes) == [f"{mock_config_manager.name}.overrides"]
+
+        # Snapshots are indexed as they are saved.
+        mock_config_manager.save()
+        assert list(mock_config_manager.snapshots) == [
+            f"{mock_config_manager.name}.overrides.snapshot",
+            f"{mock_config_manager.name}.snapshot",
+        ]
+        assert list(mock_config_manager.includes) == [f"{mock_config_manager.name}.overrides"]
+
     def test_snapshots(self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem) -> None:
         """Test the `snapshots` property."""
         fs.create_file(mock_config_manager.path.with_suffix(".conf.overrides.snapshot"))
@@ -113,17 +149,55 @@ class TestSlurmConfigManager:
         assert file_info.st_uid == FAKE_USER_UID
         assert file_info.st_gid == FAKE_GROUP_GID
 
+        # Existing files are not overwritten, but their mode is corrected.
+        mock_config_manager.path.write_text("clustername=charmed-hpc\n")
+        mock_config_manager.path.chmod(0o600)
+        mock_config_manager.create()
+        assert mock_config_manager.path.read_text() == "clustername=charmed-hpc\n"
+        assert stat.filemode(mock_config_manager.path.stat().st_mode) == "-rw-r--r--"
+
     def test_load(self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem) -> None:
         """Test the `load` method."""
         fs.create_file(mock_config_manager.path, contents=SLURM_CONF_EXAMPLE)
 
         assert mock_config_manager.load().dict() == SlurmConfig.from_str(SLURM_CONF_EXAMPLE).dict()
 
+    def test_load_cache(self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem) -> None:
+        """Test that `load` caches parsed configuration until the file is modified."""
+        fs.create_file(mock_config_manager.path, contents=SLURM_CONF_EXAMPLE)
+
+        config = mock_config_manager.load()
+        assert mock_config_manager.cache_info() == (0, 1, 1)
+
+        # Mutating a loaded configuration must not affect the cached configuration.
+        config.slurmctld_host.pop(1)
+        assert len(mock_config_manager.load().slurmctld_host) == 2
+        assert mock_config_manager.cache_info() == (1, 1, 1)
+
+        # `edit` loads through the cache, and `edit` and `dump` invalidate the cached configuration.
+        with mock_config_manager.edit() as config:
+            config.slurmctld_host.pop(1)
+        assert mock_config_manager.cache_info().size == 0
+        assert mock_config_manager.load().slurmctld_host == ["juju-c9fc6f-0(10.152.28.20)"]
+        assert mock_config_manager.cache_info() == (2, 2, 1)
+
+        mock_config_manager.dump(SlurmConfig.from_str(SLURM_CONF_EXAMPLE))
+        assert len(mock_config_manager.load().slurmctld_host) == 2
+        assert mock_config_manager.cache_info() == (2, 3, 1)
+
+        # Modifications made outside of the manager are detected by the change in file size.
+        mock_config_manager.path.write_text("clustername=external\n")
+        assert mock_config_manager.load().cluster_name == "external"
+        assert mock_config_manager.cache_info() == (2, 4, 1)
+
+        mock_config_manager.cache_clear()
+        assert mock_config_manager.cache_info() == (0, 0, 0)
+
     def test_dump(self, mock_config_manager: SlurmConfigManager) -> None:
         """Test the `dump` method."""
         config = SlurmConfig.from_str(SLURM_CONF_EXAMPLE)
 
-        mock_config_manager.dump(config)
+        assert mock_config_manager.dump(config) is True
         assert SLURM_CONF_PATH.read_text() == SLURM_CONF_EXAMPLE
 
         f_info = mock_config_manager.path.stat()
@@ -131,6 +205,10 @@ class TestSlurmConfigManager:
         assert f_info.st_uid == FAKE_USER_UID
         assert f_info.st_gid == FAKE_GROUP_GID
 
+        # Identical configuration is not rewritten.
+        assert mock_config_manager.dump(config) is False
+        assert mock_config_manager.path.stat().st_ino == f_info.st_ino
+
     def test_edit(self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem) -> None:
         """Test the `edit` context manager."""
         fs.create_file(mock_config_manager.path, contents=SLURM_CONF_EXAMPLE)
@@ -145,6 +223,43 @@ class TestSlurmConfigManager:
         config = mock_config_manager.load()
         assert config.slurmctld_host == ["juju-c9fc6f-0(10.152.28.20)"]
 
+    def test_transaction(
+        self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem
+    ) -> None:
+        """Test the `transaction` context manager."""
+        fs.create_file(mock_config_manager.path, contents=SLURM_CONF_EXAMPLE)
+        include = f"{mock_config_manager.name}.compute"
+
+        with mock_config_manager.transaction() as transaction:
+            config = transaction.edit()
+            config.include = [include]
+            transaction.edit(include).max_node_count = 100
+            assert transaction.edit() is config
+
+        assert transaction.changed == [mock_config_manager.name, include]
+        assert mock_config_manager.load().include == [include]
+        assert mock_config_manager.includes[include].load().max_node_count == 100
+
+        f_info = mock_config_manager.includes[include].path.stat()
+        assert stat.filemode(f_info.st_mode) == "-rw-r--r--"
+        assert f_info.st_uid == FAKE_USER_UID
+        assert f_info.st_gid == FAKE_GROUP_GID
+        assert not list(mock_config_manager.path.parent.glob("*.swp"))
+
+        # Unchanged files are not rewritten.
+        with mock_config_manager.transaction() as transaction:
+            transaction.edit().include = [include]
+            transaction.edit(include).max_node_count = 200
+
+        assert transaction.changed == [include]
+
+        # Staged edits are discarded if the transaction is interrupted.
+        with pytest.raises(ValueError), mock_config_manager.transaction() as transaction:
+            transaction.edit(include).max_node_count = 300
+            raise ValueError
+
+        assert mock_config_manager.includes[include].load().max_node_count == 200
+
     def test_merge(self, mock_config_manager: SlurmConfigManager, fs: FakeFilesystem) -> None:
         """Test the `merge` method."""
         fs.create_file(SLURM_CONF_PATH.with_suffix(".conf.overrides1"), contents="waittime=9000")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the InfiniBand fabric discovery functions."""
+
+import subprocess
+
+import pytest
+from constants import IBNETDISCOVER_OUTPUT
+from pyfakefs.fake_filesystem import FakeFilesystem
+from slurm_ops.fabric import (
+    discover_leaf_switch,
+    leaf_switch,
+    local_node_guids,
+    parse_ibnetdiscover,
+    render_topology,
+)
+
+
+def _create_port(fs: FakeFilesystem, device: str, guid: str, link_layer: str, state: str) -> None:
+    """Create the sysfs entries of an RDMA device with a single port."""
+    fs.create_file(f"/sys/class/infiniband/{device}/node_guid", contents=f"{guid}\n")
+    fs.create_file(
+        f"/sys/class/infiniband/{device}/ports/1/link_layer", contents=f"{link_layer}\n"
+    )
+    fs.create_file(f"/sys/class/infiniband/{device}/ports/1/state", contents=f"{state}\n")
+
+
+def test_parse_ibnetdiscover() -> None:
+    """Test parsing a captured `ibnetdiscover` fabric dump."""
+    fabric = parse_ibnetdiscover(IBNETDISCOVER_OUTPUT)
+
+    assert len(fabric) == 6
+    assert {node.description for node in fabric.values() if node.type == "Switch"} == {
+        "spine01",
+        "leaf01",
+        "leaf02",
+    }
+
+    leaf = fabric["b83fd20300f1b000"]
+    assert leaf.name == "ib-b83fd20300f1b000"
+    assert leaf.peers == {
+        1: "0c42a10300a0b010",
+        2: "0c42a10300a0b020",
+        33: "b83fd20300f1a000",
+    }
+    # GUIDs printed without leading zeros are normalized.
+    assert fabric["0c42a10300a0b030"].peers == {1: "b83fd20300f1c000"}
+
+
+@pytest.mark.parametrize(
+    "guids,expected",
+    (
+        pytest.param(["0c42a10300a0b010"], "leaf01", id="ibnetdiscover guid"),
+        pytest.param(["0c42:a103:00a0:b030"], "leaf02", id="sysfs guid"),
+        pytest.param(["0c42a10300a0b0ff", "0c42a10300a0b020"], "leaf01", id="multiple guids"),
+        pytest.param(["0c42a10300a0b0ff"], None, id="not in fabric"),
+    ),
+)
+def test_leaf_switch(guids, expected) -> None:
+    """Test finding the leaf switch that a compute node is connected to."""
+    switch = leaf_switch(parse_ibnetdiscover(IBNETDISCOVER_OUTPUT), guids)
+
+    assert (switch.description if switch else None) == expected
+
+
+def test_local_node_guids(fs: FakeFilesystem) -> None:
+    """Test that only InfiniBand devices with an active port are listed."""
+    _create_port(fs, "mlx5_0", "0c42:a103:00a0:b010", "InfiniBand", "4: ACTIVE")
+    _create_port(fs, "mlx5_1", "0c42:a103:00a0:b011", "Ethernet", "4: ACTIVE")
+    _create_port(fs, "mlx5_2", "0c42:a103:00a0:b012", "InfiniBand", "1: DOWN")
+
+    assert local_node_guids() == ["0c42a10300a0b010"]
+
+
+def test_discover_leaf_switch(fs: FakeFilesystem, mock_run) -> None:
+    """Test discovering the leaf switch of this machine."""
+    # No fabric is discovered if there are no active InfiniBand ports.
+    assert discover_leaf_switch() is None
+    mock_run.assert_not_called()
+
+    _create_port(fs, "mlx5_0", "0c42:a103:00a0:b030", "InfiniBand", "4: ACTIVE")
+    mock_run.return_value = subprocess.CompletedProcess(
+        args=[], returncode=0, stdout=IBNETDISCOVER_OUTPUT
+    )
+    assert discover_leaf_switch() == "ib-b83fd20300f1c000"
+    assert mock_run.call_args[0][0] == ["timeout", "60", "ibnetdiscover"]
+
+    # Fabric discovery fails if no subnet manager is running.
+    mock_run.side_effect = subprocess.CalledProcessError(
+        cmd="ibnetdiscover", returncode=1, stderr="ibnetdiscover: iberror: failed: discover failed"
+    )
+    assert discover_leaf_switch() is None
+
+
+@pytest.mark.parametrize(
+    "block,expected",
+    (
+        pytest.param(
+            False,
+            (
+                "SwitchName=ib-1 Nodes=node-0,node-1\n"
+                + "SwitchName=ib-2 Nodes=node-2\n"
+                + "SwitchName=unknown Nodes=node-3\n"
+                + "SwitchName=root Switches=ib-1,ib-2,unknown\n"
+            ),
+            id="tree",
+        ),
+        pytest.param(
+            True,
+            (
+                "BlockName=ib-1 Nodes=node-0,node-1\n"
+                + "BlockName=ib-2 Nodes=node-2\n"
+                + "BlockName=unknown Nodes=node-3\n"
+            ),
+            id="block",
+        ),
+    ),
+)
+def test_render_topology(block, expected) -> None:
+    """Test rendering tree and block network topologies."""
+    switches = {"ib-2": ["node-2"], "ib-1": ["node-1", "node-0"], None: ["node-3"], "ib-3": []}
+
+    assert render_topology(switches, block=block) == expected
+    assert render_topology({"ib-1": ["node-0"]}) == "SwitchName=ib-1 Nodes=node-0\n"
+    assert render_topology({}) == ""
@@ -17,8 +17,10 @@
 
 import base64
 import json
+import os
 import subprocess
 import textwrap
+from pathlib import Path
 
 import pytest
 from constants import (
@@ -34,8 +36,18 @@ from constants import (
 from dotenv import dotenv_values
 from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
-from slurm_ops import SackdManager, SlurmdbdManager, SlurmdManager
-from slurm_ops.core import SlurmManager
+from slurm_ops import (
+    GPUDevice,
+    MIGDevice,
+    PartitionEntry,
+    Reservation,
+    SackdManager,
+    SlurmctldManager,
+    SlurmdbdManager,
+    SlurmdManager,
+    SlurmOpsError,
+)
+from slurm_ops.core import SlurmConfigManager, SlurmManager
 from slurmutils import Node
 
 
@@ -291,6 +303,187 @@ class TestSackdManager:
         assert env["SACKD_OPTIONS"] == ""
 
 
+class TestSlurmctldManager:
+    """Test additional behavior of the `SlurmctldManager` class."""
+
+    @pytest.fixture
+    def mock_manager(self, fs: FakeFilesystem) -> SlurmctldManager:
+        """Request a mocked `SlurmctldManager` instance."""
+        fs.create_file(
+            "/etc/slurm/slurm.conf",
+            contents=textwrap.dedent("""
+                clustername=charmed-hpc
+                slurmctldhost=juju-c9c6f-0
+                include slurm.conf.compute
+                """),
+        )
+        fs.create_file(
+            "/etc/slurm/slurm.conf.compute",
+            contents="partitionname=compute nodes=compute\n",
+        )
+        fs.create_file("/etc/slurm/gres.conf", contents="autodetect=nvidia\n")
+        return SlurmctldManager()
+
+    # Test manager methods.
+
+    def test_get_config_state(self, mock_manager) -> None:
+        """Test the `get_config_state` method."""
+        state = mock_manager.get_config_state()
+
+        assert state.keys() == {"slurm.conf", "slurm.conf.compute", "gres.conf"}
+        assert state["slurm.conf"] == {
+            "clustername": "charmed-hpc",
+            "slurmctldhost": ["juju-c9c6f-0"],
+            "include": ["slurm.conf.compute"],
+        }
+        assert state["slurm.conf.compute"] == {
+            "partitions": {"compute": {"partitionname": "compute", "nodes": ["compute"]}}
+        }
+        # Checksums are used for configuration files that may contain credentials.
+        assert len(state["gres.conf"]) == 64
+
+        # Checksums change when the contents of a configuration file change.
+        Path("/etc/slurm/gres.conf").write_text("autodetect=off\n")
+        assert mock_manager.get_config_state()["gres.conf"] != state["gres.conf"]
+
+    def test_set_topology(self, mocker: MockerFixture, mock_manager) -> None:
+        """Test the `set_topology` method."""
+        mocker.patch("shutil.chown")
+        switches = {"ib-1": ["compute-0"], "ib-2": ["compute-1"]}
+
+        assert mock_manager.set_topology(switches) is True
+        assert Path("/etc/slurm/topology.conf").read_text() == (
+            "SwitchName=ib-1 Nodes=compute-0\n"
+            + "SwitchName=ib-2 Nodes=compute-1\n"
+            + "SwitchName=root Switches=ib-1,ib-2\n"
+        )
+        assert "topology.conf" in mock_manager.get_config_state()
+
+        # Unchanged topologies are not rewritten.
+        assert mock_manager.set_topology(switches) is False
+
+        assert mock_manager.set_topology(switches, block=True) is True
+        assert Path("/etc/slurm/topology.conf").read_text().startswith("BlockName=ib-1")
+
+        assert mock_manager.set_topology({}) is True
+        assert not Path("/etc/slurm/topology.conf").exists()
+        assert mock_manager.set_topology({}) is False
+
+    def test_partitions(self, fs: FakeFilesystem, mocker: MockerFixture, mock_manager) -> None:
+        """Test that partitions are indexed and only re-indexed when include files change."""
+        fs.create_dir("/var/lib/slurm")
+        mocker.patch("shutil.chown")
+        assert mock_manager.partitions == {
+            "compute": PartitionEntry(include="slurm.conf.compute", nodes=["compute"])
+        }
+        assert mock_manager.get_default_partition() == ""
+        index = Path("/var/lib/slurm/partitions.json")
+        assert index.exists()
+        assert index.stat().st_mode & 0o777 == 0o644
+
+        # A new manager loads the persisted index instead of parsing each include file.
+        SlurmConfigManager.cache_clear()
+        manager = SlurmctldManager()
+        assert manager.get_default_partition() == ""
+        assert SlurmConfigManager.cache_info().misses == 0
+
+        manager.set_default_partition("compute", "")
+        assert manager.get_default_partition() == "compute"
+        assert SlurmConfigManager.cache_info().misses == 1
+
+        # Include files are not checked while the configuration directory is unchanged.
+        Path("/etc/slurm/slurm.conf.gpu").write_text("partitionname=gpu nodes=gpu default=True\n")
+        Path("/etc/slurm/slurm.conf.compute").unlink()
+        assert "compute" in manager.partitions
+
+        # Include files modified by other processes are re-indexed once the directory changes.
+        # `pyfakefs` does not update the modification time of directories.
+        os.utime("/etc/slurm", ns=(0, 0))
+        assert manager.partitions == {
+            "gpu": PartitionEntry(include="slurm.conf.gpu", default=True, nodes=["gpu"])
+        }
+
+    def test_partitions_index(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that persisting the partition index does not invalidate it."""
+        etc, var_lib = tmp_path / "etc", tmp_path / "var_lib"
+        etc.mkdir()
+        var_lib.mkdir()
+        (etc / "slurm.conf").write_text("clustername=charmed-hpc\ninclude slurm.conf.compute\n")
+        (etc / "slurm.conf.compute").write_text("partitionname=compute nodes=compute\n")
+        manager = SlurmctldManager()
+        ops_manager = type(manager._ops_manager)
+        mocker.patch.object(ops_manager, "etc_path", new=etc)
+        mocker.patch.object(ops_manager, "var_lib_path", new=var_lib)
+        mocker.patch("shutil.chown")
+
+        assert "compute" in manager.partitions
+        index = var_lib / "partitions.json"
+        directory, inode = etc.stat().st_mtime_ns, index.stat().st_ino
+
+        # Writing the index does not change the configuration directory, so a new manager
+        # loads the persisted index without checking each include file.
+        SlurmConfigManager.cache_clear()
+        assert "compute" in SlurmctldManager().partitions
+        assert SlurmConfigManager.cache_info().misses == 0
+        assert etc.stat().st_mtime_ns == directory
+
+        # The index is not rewritten if the directory changes but the include files do not.
+        (etc / "gres.conf").write_text("autodetect=off\n")
+        assert "compute" in SlurmctldManager().partitions
+        assert index.stat().st_ino == inode
+
+    @pytest.mark.parametrize(
+        "pinged,expected",
+        (
+            pytest.param("UP", True, id="controller up"),
+            pytest.param("DOWN", False, id="controller down"),
+        ),
+    )
+    def test_wait_for_ping(
+        self, mocker: MockerFixture, mock_manager, mock_run, pinged, expected
+    ) -> None:
+        """Test the `wait_for_ping` method."""
+        mocker.patch("socket.gethostname", return_value="juju-c9c6f-1")
+        mock_sleep = mocker.patch("time.sleep")
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[],
+            returncode=0,
+            stdout=json.dumps(
+                {
+                    "pings": [
+                        {"hostname": "juju-c9c6f-0", "pinged": "UP", "mode": "primary"},
+                        {"hostname": "juju-c9c6f-1", "pinged": pinged, "mode": "backup"},
+                    ]
+                }
+            ),
+        )
+
+        assert mock_manager.wait_for_ping(timeout=0) == expected
+        assert mock_run.call_args[0][0] == ["scontrol", "ping", "--json"]
+        mock_sleep.assert_not_called()
+
+    def test_wait_for_ping_retry(self, mocker: MockerFixture, mock_manager, mock_run) -> None:
+        """Test that the `wait_for_ping` method retries until the controller responds."""
+        mocker.patch("socket.gethostname", return_value="juju-c9c6f-0")
+        mock_sleep = mocker.patch("time.sleep")
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(
+                cmd="scontrol ping --json", returncode=1, stderr="Unable to contact slurm"
+            ),
+            subprocess.CompletedProcess(
+                args=[],
+                returncode=0,
+                stdout=json.dumps(
+                    {"pings": [{"hostname": "juju-c9c6f-0", "pinged": "UP", "mode": "primary"}]}
+                ),
+            ),
+        ]
+
+        assert mock_manager.wait_for_ping(interval=5) is True
+        assert mock_run.call_count == 2
+        mock_sleep.assert_called_once_with(5)
+
+
 class TestSlurmdManager:
     """Test additional behavior of the `SlurmdManager` class."""
 
@@ -373,6 +566,35 @@ class TestSlurmdManager:
         assert "SLURMD_OPTIONS" in env
         assert env["SLURMD_OPTIONS"] == "-N compute-0"
 
+    def test_options_session(self, mock_manager, mocker: MockerFixture) -> None:
+        """Test that `options_session` writes the environment file once."""
+        save = mocker.spy(mock_manager, "_save_options")
+
+        with mock_manager.options_session():
+            mock_manager.conf = Node(cpus=8)
+            mock_manager.dynamic = True
+            mock_manager.name = "compute-0"
+            # Options set within the session are visible, but not yet written.
+            assert mock_manager.name == "compute-0"
+            assert "SLURMD_OPTIONS" not in dotenv_values("/etc/default/slurmd")
+
+        save.assert_called_once()
+        env = dotenv_values("/etc/default/slurmd")
+        assert env["SLURMD_OPTIONS"] == "--conf cpus=8 -Z -N compute-0"
+
+        # Unchanged options are not written.
+        with mock_manager.options_session():
+            mock_manager.name = "compute-0"
+
+        save.assert_called_once()
+
+        # Changes are discarded if the session exits with an error.
+        with pytest.raises(ValueError), mock_manager.options_session():
+            mock_manager.name = "compute-1"
+            raise ValueError
+
+        assert mock_manager.name == "compute-0"
+
     # Test manager methods.
 
     def test_delete(self, mock_manager, mock_run) -> None:
@@ -383,6 +605,24 @@ class TestSlurmdManager:
 
         assert mock_run.call_args[0][0] == ["scontrol", "delete", "nodename=compute-0"]
 
+    def test_update(self, mock_manager, mock_run) -> None:
+        """Test the `update` method."""
+        mock_manager.name = "compute-0"
+
+        mock_manager.update({"weight": 200, "features": None})
+
+        assert mock_run.call_args[0][0] == [
+            "scontrol",
+            "update",
+            "nodename=compute-0",
+            "weight=200",
+            "features=",
+        ]
+
+        # Parameters that cannot be changed live are rejected.
+        with pytest.raises(SlurmOpsError):
+            mock_manager.update({"realmemory": 4096})
+
     @pytest.mark.parametrize(
         "exists",
         (
@@ -392,7 +632,10 @@ class TestSlurmdManager:
     )
     def tests_exists(self, mock_manager, mock_run, exists) -> None:
         """Test the `exists` method."""
-        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0 if exists else 1)
+        mock_manager.name = "compute-0"
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0 if exists else 1, stdout=SCONTROL_SHOW_NODE_OUTPUT
+        )
 
         assert mock_manager.exists() == exists
 
@@ -408,6 +651,148 @@ class TestSlurmdManager:
         assert node.features == ["compute"]
         assert node.node_name is None
 
+    def test_hardware_profile(self, mocker: MockerFixture, mock_manager, mock_run) -> None:
+        """Test that the hardware profile is only rediscovered if the hardware changes."""
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=SLURMD_C_OUTPUT
+        )
+        mock_gpus = mocker.patch(
+            "slurm_ops.slurmd.discover_gpus",
+            return_value=[GPUDevice("tesla_t4", 0), GPUDevice("tesla_t4", 1)],
+        )
+        mock_fingerprint = mocker.patch(
+            "slurm_ops.slurmd.hardware_fingerprint", return_value="f1b5a2"
+        )
+
+        assert mock_manager.hardware_changed()
+        assert mock_manager.build_node().gres == ["gpu:tesla_t4:2"]
+        assert mock_manager.get_gpu_info() == ["gpu:tesla_t4:2"]
+        assert not mock_manager.hardware_changed()
+        assert mock_run.call_count == 1
+        assert mock_gpus.call_count == 1
+        assert Path("/var/lib/slurm/hardware.json").exists()
+
+        mock_fingerprint.return_value = "0c4a9e"
+        assert mock_manager.hardware_changed()
+        mock_manager.build_node()
+        assert mock_run.call_count == 2
+        assert mock_manager.hardware_profile().fingerprint == "0c4a9e"
+
+    def test_leaf_switch(self, mocker: MockerFixture, mock_manager, mock_run) -> None:
+        """Test that the leaf switch is persisted with the hardware profile."""
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=SLURMD_C_OUTPUT
+        )
+        mocker.patch("slurm_ops.slurmd.discover_gpus", return_value=[])
+        mocker.patch("slurm_ops.slurmd.hardware_fingerprint", return_value="f1b5a2")
+        mock_discover = mocker.patch(
+            "slurm_ops.slurmd.discover_leaf_switch", return_value="ib-b83fd20300f1c000"
+        )
+
+        assert mock_manager.leaf_switch() == "ib-b83fd20300f1c000"
+        assert mock_manager.leaf_switch() == "ib-b83fd20300f1c000"
+        assert mock_discover.call_count == 1
+
+        # Recabled compute nodes are only detected when the leaf switch is refreshed.
+        mock_discover.return_value = "ib-b83fd20300f1d000"
+        assert mock_manager.leaf_switch() == "ib-b83fd20300f1c000"
+        assert mock_manager.leaf_switch(refresh=True) == "ib-b83fd20300f1d000"
+        assert mock_manager.hardware_profile().switch == "ib-b83fd20300f1d000"
+        assert mock_run.call_count == 1
+
+    def test_build_gres(self, mocker: MockerFixture, mock_manager, mock_run) -> None:
+        """Test that GPUs are mapped to `gres.conf` entries with core affinity and NVLinks."""
+        mock_manager.name = "compute-0"
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=SLURMD_C_OUTPUT
+        )
+        mocker.patch("slurm_ops.slurmd.hardware_fingerprint", return_value="f1b5a2")
+        mocker.patch(
+            "slurm_ops.slurmd.discover_gpus",
+            return_value=[
+                GPUDevice("a100", 0, cores=[0, 1, 2, 3, 8], links=[-1, 4]),
+                GPUDevice("a100", 1, cores=[4, 5, 6, 7], links=[4, -1]),
+            ],
+        )
+
+        gres = mock_manager.build_gres()
+
+        assert [entry.dict() for entry in gres] == [
+            {
+                "name": "gpu",
+                "type": "a100",
+                "file": "/dev/nvidia0",
+                "cores": ["0-3", "8"],
+                "links": [-1, 4],
+                "nodename": "compute-0",
+            },
+            {
+                "name": "gpu",
+                "type": "a100",
+                "file": "/dev/nvidia1",
+                "cores": ["4-7"],
+                "links": [4, -1],
+                "nodename": "compute-0",
+            },
+        ]
+        assert mock_manager.get_gpu_info() == ["gpu:a100:2"]
+
+    def test_build_gres_mig(self, mocker: MockerFixture, mock_manager, mock_run) -> None:
+        """Test that MIG devices are published as distinct GRES types."""
+        mock_manager.name = "compute-0"
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=SLURMD_C_OUTPUT
+        )
+        mocker.patch("slurm_ops.slurmd.hardware_fingerprint", return_value="f1b5a2")
+        mig = [
+            MIGDevice(
+                "1g.10gb",
+                [
+                    "/dev/nvidia0",
+                    f"/dev/nvidia-caps/nvidia-cap{i}",
+                    f"/dev/nvidia-caps/nvidia-cap{i + 1}",
+                ],
+            )
+            for i in (30, 39)
+        ] + [MIGDevice("3g.40gb", ["/dev/nvidia0", "/dev/nvidia-caps/nvidia-cap21"])]
+        mocker.patch(
+            "slurm_ops.slurmd.discover_gpus",
+            return_value=[
+                GPUDevice("a100", 0, cores=[0, 1, 2, 3], mig=mig),
+                GPUDevice("a100", 1, cores=[4, 5, 6, 7]),
+            ],
+        )
+
+        gres = mock_manager.build_gres()
+
+        assert mock_manager.get_gpu_info() == [
+            "gpu:a100_1g.10gb:2",
+            "gpu:a100_3g.40gb:1",
+            "gpu:a100:1",
+        ]
+        assert [(entry.type, entry.multiplefiles, entry.file) for entry in gres] == [
+            ("a100_1g.10gb", mig[0].files, None),
+            ("a100_1g.10gb", mig[1].files, None),
+            ("a100_3g.40gb", mig[2].files, None),
+            ("a100", None, "/dev/nvidia1"),
+        ]
+        assert {entry.cores[0] for entry in gres[:3]} == {"0-3"}
+
+    def test_pin_services(self, mocker: MockerFixture, mock_manager, mock_run) -> None:
+        """Test that system services are pinned to the CPUs reserved for system services."""
+        mocker.patch.object(
+            mock_manager, "reservation", return_value=Reservation(cpus=[14, 15, 30, 31])
+        )
+
+        mock_manager.pin_services(["snap.node-exporter.node-exporter"])
+
+        assert mock_run.call_args[0][0] == [
+            "systemctl",
+            "set-property",
+            "snap.node-exporter.node-exporter",
+            "AllowedCPUs=14-15,30-31",
+        ]
+
     def test_show_node(self, mock_manager, mock_run) -> None:
         """Test the `show_node` method."""
         mock_manager.name = "compute-0"
@@ -420,6 +805,21 @@ class TestSlurmdManager:
         assert mock_run.call_args[0][0] == ["scontrol", "--json", "show", "node", "compute-0"]
         assert info == json.loads(SCONTROL_SHOW_NODE_OUTPUT)["nodes"][0]
 
+        # Node information is cached until the node is modified.
+        assert mock_manager.exists()
+        assert mock_run.call_count == 1
+        mock_manager.reconfigure(state="idle")
+        mock_manager.show_node()
+        assert mock_run.call_args[0][0] == ["scontrol", "--json", "show", "node", "compute-0"]
+
+    def test_show_node_not_registered(self, mock_manager, mock_run) -> None:
+        """Test that `show_node` fails if the node is not registered with Slurm."""
+        mock_manager.name = "compute-0"
+        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=1)
+
+        with pytest.raises(SlurmOpsError):
+            mock_manager.show_node()
+
 
 class TestSlurmdbdManager:
     """Test additional behavior of the `SlurmdbdManager` class."""
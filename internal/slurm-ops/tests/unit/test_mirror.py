@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `PackageMirror` class."""
+
+import hashlib
+import subprocess
+from pathlib import Path
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from slurm_ops import PackageMirror, SlurmOpsError
+
+SLURMD_CONTROL = """\
+Package: slurmd
+Version: 25.11.0-1
+Architecture: amd64
+Depends: slurm-wlm-basic-plugins (= 25.11.0-1)
+Description: SLURM compute node daemon
+ SLURM, the Simple Linux Utility for Resource Management."""
+
+
+class TestPackageMirror:
+    """Test the `PackageMirror` class."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        (
+            pytest.param("/srv/slurm-mirror/", "file:/srv/slurm-mirror", id="path"),
+            pytest.param("file:///srv/slurm-mirror", "file:/srv/slurm-mirror", id="file uri"),
+            pytest.param("http://mirror.local/slurm", "http://mirror.local/slurm", id="http"),
+        ),
+    )
+    def test_from_str(self, value, expected) -> None:
+        """Test parsing package mirrors."""
+        assert PackageMirror.from_str(value) == PackageMirror(expected)
+        assert PackageMirror.from_str("") is None
+
+        with pytest.raises(ValueError):
+            PackageMirror.from_str("srv/slurm-mirror")
+
+    def test_enable(self, fs: FakeFilesystem, mock_run) -> None:
+        """Test that only the package index of the mirror is updated."""
+        fs.create_dir("/etc/apt/sources.list.d")
+        fs.create_dir("/etc/apt/preferences.d")
+        mirror = PackageMirror.from_str("/srv/slurm-mirror")
+
+        mirror.enable()
+
+        sources = Path("/etc/apt/sources.list.d/charmed-hpc-mirror.list")
+        assert sources.read_text() == "deb [trusted=yes] file:/srv/slurm-mirror ./\n"
+        assert (
+            "o=charmed-hpc-mirror" in Path("/etc/apt/preferences.d/charmed-hpc-mirror").read_text()
+        )
+        args = mock_run.call_args[0][0]
+        assert args[:2] == ["apt-get", "update"]
+        assert f"--option=Dir::Etc::SourceList={sources}" in args
+
+        PackageMirror.disable()
+        assert not sources.exists()
+
+    def test_prefetch(self, fs: FakeFilesystem, mock_run) -> None:
+        """Test prefetching packages into a local file-based repository."""
+        deb = Path("/srv/slurm-mirror/pool/slurmd_25.11.0-1_amd64.deb")
+        fs.create_file(deb, contents="slurmd")
+        mock_run.side_effect = [
+            subprocess.CompletedProcess([], returncode=0),
+            subprocess.CompletedProcess([], returncode=0, stdout=SLURMD_CONTROL),
+        ]
+        mirror = PackageMirror.from_str("/srv/slurm-mirror")
+
+        assert mirror.prefetch(["slurmd", "slurm-client"]) == {"slurmd": "25.11.0-1"}
+
+        args = mock_run.call_args_list[0][0][0]
+        assert "--download-only" in args
+        assert "--option=Dir::State::status=/dev/null" in args
+        assert args[-3:] == ["install", "slurmd", "slurm-client"]
+        assert Path("/srv/slurm-mirror/pool/partial").is_dir()
+
+        index = Path("/srv/slurm-mirror/Packages").read_text()
+        assert index.startswith(SLURMD_CONTROL)
+        assert "Filename: pool/slurmd_25.11.0-1_amd64.deb\nSize: 6\n" in index
+        assert f"SHA256: {hashlib.sha256(b'slurmd').hexdigest()}\n" in index
+        release = Path("/srv/slurm-mirror/Release").read_text()
+        assert release.startswith("Origin: charmed-hpc-mirror\n")
+        assert f" {hashlib.sha256(index.encode()).hexdigest()} {len(index)} Packages" in release
+
+    def test_prefetch_fail(self, fs: FakeFilesystem, mock_run) -> None:
+        """Test that prefetching fails for remote mirrors and unavailable packages."""
+        with pytest.raises(SlurmOpsError):
+            PackageMirror.from_str("http://mirror.local/slurm").prefetch(["slurmd"])
+
+        mock_run.side_effect = subprocess.CalledProcessError(
+            cmd=["apt-get"], returncode=100, stderr="E: Unable to locate package slurmd"
+        )
+        with pytest.raises(SlurmOpsError) as exec_info:
+            PackageMirror.from_str("/srv/slurm-mirror").prefetch(["slurmd"])
+
+        assert exec_info.value.message == (
+            "failed to prefetch packages ['slurmd']. reason: E: Unable to locate package slurmd"
+        )
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `NodeInventory` class."""
+
+import json
+import subprocess
+
+import pytest
+from pytest_mock import MockerFixture
+from slurm_ops import NodeInventory, SlurmOpsError
+
+SCONTROL_SHOW_NODES_OUTPUT = json.dumps(
+    {
+        "nodes": [
+            {"name": "compute-0", "state": ["IDLE"], "partitions": ["compute"]},
+            {"name": "compute-1", "state": ["IDLE", "DRAIN"], "partitions": ["compute"]},
+            {"name": "gpu-0", "state": ["MIXED"], "partitions": ["gpu", "compute"]},
+        ]
+    }
+)
+
+
+@pytest.fixture(scope="function")
+def mock_nodes(mock_run) -> NodeInventory:
+    mock_run.return_value = subprocess.CompletedProcess(
+        args=[], returncode=0, stdout=SCONTROL_SHOW_NODES_OUTPUT
+    )
+    return NodeInventory(ttl=30)
+
+
+class TestNodeInventory:
+    """Test the `NodeInventory` class."""
+
+    def test_index(self, mock_nodes, mock_run) -> None:
+        """Test that nodes are indexed by name, state, and partition with a single call."""
+        assert "compute-0" in mock_nodes
+        assert mock_nodes.get("compute-2") is None
+        assert mock_nodes.by_state("idle") == ["compute-0", "compute-1"]
+        assert mock_nodes.by_state("DRAIN") == ["compute-1"]
+        assert mock_nodes.by_partition("compute") == ["compute-0", "compute-1", "gpu-0"]
+        assert mock_nodes.by_partition("gpu") == ["gpu-0"]
+        assert mock_nodes.by_partition("debug") == []
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0] == ["scontrol", "--json", "show", "nodes"]
+
+    def test_ttl(self, mocker: MockerFixture, mock_nodes, mock_run) -> None:
+        """Test that the inventory is refreshed once its TTL expires."""
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        assert "compute-0" in mock_nodes
+
+        monotonic.return_value = 129.0
+        assert "gpu-0" in mock_nodes
+        assert mock_run.call_count == 1
+
+        monotonic.return_value = 130.0
+        assert "gpu-0" in mock_nodes
+        assert mock_run.call_count == 2
+
+    def test_invalidate(self, mock_nodes, mock_run) -> None:
+        """Test that the inventory is refreshed after it is invalidated."""
+        assert "compute-0" in mock_nodes
+        mock_nodes.invalidate()
+        assert "compute-0" in mock_nodes
+        assert mock_run.call_count == 2
+
+    def test_single_node(self, mock_run) -> None:
+        """Test tracking a single node that is not registered with Slurm."""
+        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=1)
+        nodes = NodeInventory(lambda: "compute-0")
+
+        assert "compute-0" not in nodes
+        assert mock_run.call_args[0][0] == ["scontrol", "--json", "show", "node", "compute-0"]
+
+    def test_refresh_error(self, mock_run) -> None:
+        """Test that `refresh` fails if `scontrol` returns malformed output."""
+        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout="{}")
+
+        with pytest.raises(SlurmOpsError):
+            NodeInventory().refresh()
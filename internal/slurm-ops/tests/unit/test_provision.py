@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `InstallPlan` class."""
+
+import subprocess
+
+import pytest
+from slurm_ops import InstallPlan, PackageMirror, SlurmOpsError
+
+
+class TestInstallPlan:
+    """Test the `InstallPlan` class."""
+
+    def test_execute(self, mock_run) -> None:
+        """Test that all packages are installed in a single transaction after resolution."""
+        steps = []
+        plan = InstallPlan()
+        plan.add_repository(lambda: steps.append("repository"))
+        plan.add_packages("slurmd", "slurm-client")
+        plan.add_resolver(lambda p: p.add_packages("nvidia-headless-no-dkms-580", "slurmd"))
+        plan.add_snap("node-exporter", lambda: steps.append("node-exporter"))
+        plan.add_configure(lambda: steps.append("configure"))
+
+        timings = plan.execute()
+
+        assert list(timings) == ["repositories", "resolve", "install", "configure"]
+        assert plan.packages == ["slurmd", "slurm-client", "nvidia-headless-no-dkms-580"]
+        assert plan.snaps == ["node-exporter"]
+        assert steps == ["repository", "node-exporter", "configure"]
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][-4:] == [
+            "install",
+            "slurmd",
+            "slurm-client",
+            "nvidia-headless-no-dkms-580",
+        ]
+        assert mock_run.call_args[1]["env"]["DEBIAN_FRONTEND"] == "noninteractive"
+
+    def test_execute_package_error(self, mock_run) -> None:
+        """Test that snaps are still installed if the packages fail to install."""
+        steps = []
+        plan = InstallPlan()
+        plan.add_packages("slurmd")
+        plan.add_snap("node-exporter", lambda: steps.append("node-exporter"))
+        plan.add_configure(lambda: steps.append("configure"))
+        mock_run.side_effect = subprocess.CalledProcessError(
+            cmd=["apt-get"], returncode=100, stderr="E: Unable to locate package slurmd"
+        )
+
+        with pytest.raises(SlurmOpsError) as exec_info:
+            plan.execute()
+
+        assert exec_info.value.message == (
+            "failed to install packages ['slurmd']. reason: E: Unable to locate package slurmd"
+        )
+        assert steps == ["node-exporter"]
+        assert "install" in plan.timings
+
+    def test_execute_snap_error(self, mock_run) -> None:
+        """Test that snap install errors are raised as is."""
+        plan = InstallPlan()
+
+        def fail() -> None:
+            raise RuntimeError("snap install failed")
+
+        plan.add_snap("dcgm", fail)
+
+        with pytest.raises(RuntimeError):
+            plan.execute()
+
+        # No packages were added, so `apt-get` is not run.
+        mock_run.assert_not_called()
+
+    def test_execute_mirror(self, mocker, mock_run) -> None:
+        """Test that package repositories are replaced by a package mirror."""
+        steps = []
+        mirror = PackageMirror("file:/srv/slurm-mirror")
+        mock_enable = mocker.patch.object(PackageMirror, "enable")
+        plan = InstallPlan(mirror=mirror)
+        plan.add_repository(lambda: steps.append("repository"))
+        plan.add_packages("slurmd")
+
+        plan.execute()
+
+        mock_enable.assert_called_once()
+        assert steps == []
+        mock_run.assert_called_once()
+
+    def test_prefetch(self, mocker) -> None:
+        """Test that the packages of a plan are prefetched into a mirror without installing."""
+        steps = []
+        mock_prefetch = mocker.patch.object(
+            PackageMirror, "prefetch", return_value={"slurmd": "25.11.0-1"}
+        )
+        mock_apt_install = mocker.patch("slurm_ops.core.provision._apt_install")
+        plan = InstallPlan()
+        plan.add_repository(lambda: steps.append("repository"))
+        plan.add_packages("slurmd")
+        plan.add_resolver(lambda p: p.add_packages("nvidia-headless-no-dkms-580"))
+        plan.add_configure(lambda: steps.append("configure"))
+
+        assert plan.prefetch(PackageMirror("file:/srv/slurm-mirror")) == {"slurmd": "25.11.0-1"}
+        mock_prefetch.assert_called_once_with(["slurmd", "nvidia-headless-no-dkms-580"])
+        mock_apt_install.assert_not_called()
+        assert steps == ["repository"]
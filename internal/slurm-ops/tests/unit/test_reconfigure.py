@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `classify_changes` and `classify_node_changes` utility functions."""
+
+import pytest
+from slurm_ops import ReconfigureAction, classify_changes, classify_node_changes
+
+PREVIOUS = {
+    "slurm.conf": {
+        "clustername": "charmed-hpc",
+        "slurmctldhost": ["juju-c9c6f-0"],
+        "slurmctldport": 6817,
+        "selecttype": "select/cons_tres",
+        "include": ["slurm.conf.compute", "slurm.conf.overrides"],
+    },
+    "slurm.conf.compute": {
+        "nodesets": {"compute": {"nodeset": "compute", "feature": "compute"}},
+        "partitions": {"compute": {"partitionname": "compute", "nodes": ["compute"]}},
+    },
+    "slurm.conf.overrides": {"defaulttime": "01:00:00"},
+    "gres.conf": "f1b5a2",
+}
+
+
+@pytest.mark.parametrize(
+    "current,expected",
+    (
+        pytest.param(PREVIOUS, ReconfigureAction.NONE, id="no changes"),
+        pytest.param(
+            PREVIOUS | {"slurm.conf.overrides": {"defaulttime": "02:00:00"}},
+            ReconfigureAction.RECONFIGURE,
+            id="reconfigurable parameter changed",
+        ),
+        pytest.param(
+            PREVIOUS
+            | {
+                "slurm.conf.compute": {
+                    "nodesets": {"compute": {"nodeset": "compute", "feature": "compute"}},
+                    "partitions": {
+                        "compute": {
+                            "partitionname": "compute",
+                            "nodes": ["compute"],
+                            "default": True,
+                        }
+                    },
+                },
+            },
+            ReconfigureAction.RECONFIGURE,
+            id="partition changed",
+        ),
+        pytest.param(
+            PREVIOUS | {"gres.conf": "0c4a9e"},
+            ReconfigureAction.RECONFIGURE,
+            id="other configuration file changed",
+        ),
+        pytest.param(
+            {k: v for k, v in PREVIOUS.items() if k != "slurm.conf.compute"},
+            ReconfigureAction.RECONFIGURE,
+            id="include file removed",
+        ),
+        pytest.param(
+            PREVIOUS
+            | {
+                "slurm.conf": PREVIOUS["slurm.conf"]
+                | {"slurmctldhost": ["juju-c9c6f-0", "juju-c9c6f-1"]}
+            },
+            ReconfigureAction.RESTART,
+            id="controller added",
+        ),
+        pytest.param(
+            PREVIOUS
+            | {"slurm.conf": PREVIOUS["slurm.conf"] | {"slurmctldport": 6820}}
+            | {"slurm.conf.overrides": {"defaulttime": "02:00:00"}},
+            ReconfigureAction.RESTART,
+            id="port changed",
+        ),
+        pytest.param(
+            PREVIOUS | {"slurm.conf.overrides": {"schedulertype": "sched/builtin"}},
+            ReconfigureAction.RESTART,
+            id="plugin type changed",
+        ),
+    ),
+)
+def test_classify_changes(current, expected) -> None:
+    """Test that `classify_changes` selects the cheapest sufficient action."""
+    assert classify_changes(PREVIOUS, current) == expected
+
+
+def test_classify_changes_no_previous() -> None:
+    """Test that `classify_changes` requires a restart if no configuration has been applied."""
+    assert classify_changes({}, PREVIOUS) == ReconfigureAction.RESTART
+
+
+@pytest.mark.parametrize(
+    "current,expected",
+    (
+        pytest.param({"cpus": 8, "weight": 10}, ReconfigureAction.NONE, id="no changes"),
+        pytest.param(
+            {"cpus": 8, "weight": 200, "features": ["nvme"]},
+            ReconfigureAction.RECONFIGURE,
+            id="live parameters changed",
+        ),
+        pytest.param({"cpus": 8}, ReconfigureAction.RECONFIGURE, id="weight removed"),
+        pytest.param(
+            {"cpus": 8, "weight": 200, "realmemory": 4096},
+            ReconfigureAction.RESTART,
+            id="memory changed",
+        ),
+    ),
+)
+def test_classify_node_changes(current, expected) -> None:
+    """Test that `classify_node_changes` only re-registers nodes when required."""
+    assert classify_node_changes({"cpus": 8, "weight": 10}, current) == expected
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `ReservationPolicy` class."""
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+from slurm_ops import LogicalCPU, ReservationPolicy
+from slurm_ops.hardware import cpu_topology
+
+
+def _topology(sockets: int, numas: int, cores: int, threads: int = 2) -> list[LogicalCPU]:
+    """Build the topology of a node with `cores` cores on each of its NUMA nodes.
+
+    CPU IDs are assigned like Linux does on x86: first threads of all cores, then siblings.
+    """
+    total = sockets * numas * cores
+    return [
+        LogicalCPU(
+            id=thread * total + core,
+            abstract_id=core * threads + thread,
+            socket=core // (numas * cores),
+            core=core,
+            numa=core // cores,
+        )
+        for core in range(total)
+        for thread in range(threads)
+    ]
+
+
+class TestReservationPolicy:
+    """Test the `ReservationPolicy` class."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        (
+            pytest.param("auto", ReservationPolicy(), id="auto"),
+            pytest.param("", ReservationPolicy(), id="empty"),
+            pytest.param("none", ReservationPolicy(enabled=False), id="none"),
+            pytest.param("cores=2", ReservationPolicy(cores=2), id="cores"),
+            pytest.param(
+                "cores=0 memory=4096", ReservationPolicy(cores=0, memory=4096), id="overrides"
+            ),
+        ),
+    )
+    def test_from_str(self, value, expected) -> None:
+        """Test parsing reservation policies."""
+        assert ReservationPolicy.from_str(value) == expected
+
+    @pytest.mark.parametrize("value", ("cores", "cores=-1", "threads=2", "memory=4G"))
+    def test_from_str_invalid(self, value) -> None:
+        """Test that invalid reservation policies are rejected."""
+        with pytest.raises(ValueError):
+            ReservationPolicy.from_str(value)
+
+    def test_plan_small_node(self) -> None:
+        """Test that no cores are reserved on small nodes."""
+        reservation = ReservationPolicy().plan(_topology(1, 1, 8), 15986)
+
+        assert reservation.cpus == []
+        assert reservation.cpu_spec_list == []
+        assert reservation.memory == 1024
+
+    def test_plan_large_node(self) -> None:
+        """Test that reserved cores are spread across the sockets and NUMA nodes of a node."""
+        # 2 sockets, each with 4 NUMA nodes of 16 cores, and 2 threads per core.
+        reservation = ReservationPolicy().plan(_topology(2, 4, 16), 1031000)
+
+        # Cores 63 and 47 on socket 0, and cores 127 and 111 on socket 1.
+        assert reservation.cpu_spec_list == [94, 95, 126, 127, 222, 223, 254, 255]
+        assert reservation.cpus == [47, 63, 111, 127, 175, 191, 239, 255]
+        assert reservation.memory == 16384
+
+    def test_plan_overrides(self) -> None:
+        """Test that explicit core and memory reservations are capped at half of the node."""
+        reservation = ReservationPolicy(cores=16, memory=65536).plan(_topology(1, 1, 8), 15986)
+
+        assert reservation.cpu_spec_list == list(range(8, 16))
+        assert reservation.memory == 7993
+
+    def test_plan_disabled(self) -> None:
+        """Test that nothing is reserved if reservations are disabled."""
+        reservation = ReservationPolicy(enabled=False).plan(_topology(2, 4, 16), 1031000)
+
+        assert reservation.cpus == []
+        assert reservation.memory is None
+
+
+def test_cpu_topology(fs: FakeFilesystem) -> None:
+    """Test that CPUs are numbered following Slurm's abstract CPU numbering."""
+    # 2 sockets with 2 cores each and 2 threads per core. Core IDs are not contiguous.
+    layout = {
+        0: (0, 0),
+        1: (0, 4),
+        2: (1, 0),
+        3: (1, 4),
+        4: (0, 0),
+        5: (0, 4),
+        6: (1, 0),
+        7: (1, 4),
+    }
+    for cpu, (package, core) in layout.items():
+        fs.create_file(
+            f"/sys/devices/system/cpu/cpu{cpu}/topology/physical_package_id", contents=str(package)
+        )
+        fs.create_file(f"/sys/devices/system/cpu/cpu{cpu}/topology/core_id", contents=str(core))
+        fs.create_dir(f"/sys/devices/system/cpu/cpu{cpu}/node{package}")
+
+    topology = cpu_topology()
+
+    assert [(cpu.id, cpu.core) for cpu in topology] == [
+        (0, 0),
+        (4, 0),
+        (1, 1),
+        (5, 1),
+        (2, 2),
+        (6, 2),
+        (3, 3),
+        (7, 3),
+    ]
+    assert [cpu.abstract_id for cpu in topology] == list(range(8))
+    assert {cpu.numa for cpu in topology if cpu.socket == 1} == {1}
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `SlurmrestdClient` and `SlurmrestdBackend` classes."""
+
+import base64
+import hashlib
+import hmac
+import json
+import subprocess
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from constants import SCONTROL_SHOW_NODE_OUTPUT
+from slurm_ops import SlurmctldManager, SlurmOpsError, SlurmrestdBackend, SlurmrestdClient
+
+JWT_KEY = "not-a-real-key"
+NODES = json.loads(SCONTROL_SHOW_NODE_OUTPUT)["nodes"]
+
+
+class _StubSlurmrestd(BaseHTTPRequestHandler):
+    """Stub `slurmrestd` server that records the requests it receives."""
+
+    protocol_version = "HTTP/1.1"
+    requests: list[tuple] = []
+
+    def do_GET(self) -> None:  # noqa N802
+        match self.path:
+            case "/slurm/v0.0.41/ping":
+                self._reply(200, {"pings": [{"hostname": "juju-c9c6f-0", "pinged": "UP"}]})
+            case "/slurm/v0.0.41/nodes":
+                self._reply(200, {"nodes": NODES})
+            case "/slurm/v0.0.41/node/compute-0":
+                self._reply(200, {"nodes": NODES})
+            case _:
+                self._reply(404, {"errors": [{"description": "Unable to query node"}]})
+
+    def do_POST(self) -> None:  # noqa N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if body.get("state") == ["INVALID"]:
+            self._reply(500, {"errors": [{"description": "Invalid node state specified"}]})
+        else:
+            self._reply(200, {"errors": []}, body)
+
+    def _reply(self, status: int, content: dict, body: dict | None = None) -> None:
+        self.requests.append(
+            (
+                self.command,
+                self.path,
+                body or {},
+                self.headers["X-SLURM-USER-TOKEN"],
+                self.client_address[1],
+            )
+        )
+        data = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:  # noqa D102
+        pass
+
+
+@pytest.fixture(scope="function")
+def stub_server() -> Iterator[ThreadingHTTPServer]:
+    _StubSlurmrestd.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSlurmrestd)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="function")
+def client(stub_server) -> Iterator[SlurmrestdClient]:
+    host, port = stub_server.server_address[:2]
+    client = SlurmrestdClient(f"http://{host}:{port}", key=lambda: JWT_KEY)
+    yield client
+    client.close()
+
+
+class TestSlurmrestdClient:
+    """Test the `SlurmrestdClient` class."""
+
+    def test_token(self, client) -> None:
+        """Test that requests are authenticated with a JWT signed with the JWT key."""
+        client.request("GET", "ping")
+
+        token = _StubSlurmrestd.requests[0][3]
+        header, payload, signature = token.split(".")
+        expected = hmac.new(JWT_KEY.encode(), f"{header}.{payload}".encode(), hashlib.sha256)
+        assert base64.urlsafe_b64decode(signature + "==") == expected.digest()
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=="))
+        assert claims["sun"] == "slurm"
+        assert claims["exp"] - claims["iat"] == 300
+
+        # The token is reused until it is close to expiring.
+        assert client.token() == token
+
+    def test_keep_alive(self, client) -> None:
+        """Test that connections to `slurmrestd` are reused across requests."""
+        for _ in range(3):
+            assert client.request("GET", "ping")[0] == 200
+
+        ports = {request[4] for request in _StubSlurmrestd.requests}
+        assert len(ports) == 1
+
+    def test_unsupported_address(self) -> None:
+        """Test that the client only accepts `http` and `unix` addresses."""
+        with pytest.raises(SlurmOpsError):
+            SlurmrestdClient("https://localhost:6820", key=lambda: JWT_KEY)
+
+
+class TestSlurmrestdBackend:
+    """Test the `SlurmrestdBackend` class."""
+
+    def test_show_nodes(self, client, mock_run) -> None:
+        """Test getting node information from `slurmrestd`."""
+        backend = SlurmrestdBackend(client)
+
+        assert backend.show_nodes() == NODES
+        assert backend.show_nodes("compute-0") == NODES
+        assert backend.show_nodes("compute-1") == []
+        mock_run.assert_not_called()
+
+    def test_update_node(self, client) -> None:
+        """Test updating the state of a node through `slurmrestd`."""
+        backend = SlurmrestdBackend(client)
+
+        backend.update_node("compute-0", state="down", reason="'maintenance'")
+        assert _StubSlurmrestd.requests[-1][:3] == (
+            "POST",
+            "/slurm/v0.0.41/node/compute-0",
+            {"state": ["DOWN"], "reason": "maintenance"},
+        )
+
+        with pytest.raises(SlurmOpsError) as exec_info:
+            backend.update_node("compute-0", state="invalid")
+
+        assert exec_info.value.message == (
+            "slurmrestd request 'POST node/compute-0' failed with status 500. "
+            + "reason: Invalid node state specified"
+        )
+
+    def test_configure_node(self, client) -> None:
+        """Test updating the configuration of a node through `slurmrestd`."""
+        backend = SlurmrestdBackend(client)
+
+        backend.configure_node("compute-0", {"weight": 200, "gres": ["gpu:a100:2", "shard:8"]})
+        assert _StubSlurmrestd.requests[-1][:3] == (
+            "POST",
+            "/slurm/v0.0.41/node/compute-0",
+            {"weight": 200, "gres": "gpu:a100:2,shard:8"},
+        )
+
+    def test_fallback(self, mock_run) -> None:
+        """Test that the backend falls back to `scontrol` if `slurmrestd` is unreachable."""
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=SCONTROL_SHOW_NODE_OUTPUT
+        )
+        client = SlurmrestdClient("unix:///nonexistent/slurmrestd.socket", key=lambda: JWT_KEY)
+        slurmctld = SlurmctldManager(backend=SlurmrestdBackend(client))
+
+        assert [node["name"] for node in slurmctld.backend.show_nodes()] == ["compute-0"]
+        assert mock_run.call_args[0][0] == ["scontrol", "--json", "show", "nodes"]
@@ -13,12 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Unit tests for the `scontrol` utility function."""
+"""Unit tests for the `scontrol` utility function and `ScontrolRunner` class."""
 
+import subprocess
 from subprocess import CalledProcessError
 
 import pytest
-from slurm_ops import SlurmOpsError, scontrol
+from pytest_mock import MockerFixture
+from slurm_ops import LatencyInfo, ScontrolRunner, SlurmOpsError, scontrol
 
 
 def test_scontrol_reconfigure(mock_run) -> None:
@@ -53,3 +55,78 @@ def test_scontrol_error(mock_run) -> None:
         "scontrol command 'scontrol ping' failed with exit code 1. "
         + "reason: timeout connecting to controller"
     )
+
+
+def test_scontrol_retry(mocker: MockerFixture, mock_run) -> None:
+    """Test that `scontrol` retries commands that fail with a transient error."""
+    sleep = mocker.patch("time.sleep")
+    mock_run.side_effect = [
+        CalledProcessError(
+            cmd=["scontrol", "show", "nodes"],
+            returncode=1,
+            stderr="slurm_load_node error: Slurm backup controller in standby mode",
+        ),
+        subprocess.CompletedProcess(args=[], returncode=0, stdout="{}\n"),
+    ]
+
+    runner = ScontrolRunner(backoff=2)
+    assert runner("show", "nodes") == ("{}", 0)
+    assert mock_run.call_count == 2
+    assert 1 <= sleep.call_args[0][0] <= 2
+    assert runner.latency["show"].count == 1
+
+
+def test_scontrol_no_retry(mocker: MockerFixture, mock_run) -> None:
+    """Test that `scontrol` does not retry commands that fail with a permanent error."""
+    sleep = mocker.patch("time.sleep")
+    mock_run.side_effect = CalledProcessError(
+        cmd=["scontrol", "show", "node", "compute-0"],
+        returncode=1,
+        stderr="Node compute-0 not found",
+    )
+
+    assert ScontrolRunner()("show", "node", "compute-0", check=False)[1] == 1
+    mock_run.assert_called_once()
+    sleep.assert_not_called()
+
+
+def test_scontrol_timeout(mocker: MockerFixture, mock_run) -> None:
+    """Test that `scontrol` fails if a command times out on every attempt."""
+    sleep = mocker.patch("time.sleep")
+    mock_run.side_effect = subprocess.TimeoutExpired(cmd=["scontrol", "ping"], timeout=5)
+
+    runner = ScontrolRunner(timeout=5, retries=2)
+    with pytest.raises(SlurmOpsError) as exec_info:
+        runner("ping")
+
+    assert "timed out after 5 seconds" in exec_info.value.message
+    assert mock_run.call_count == 3
+    assert mock_run.call_args.kwargs["timeout"] == 5
+    assert sleep.call_count == 2
+    assert runner.latency["ping"] == LatencyInfo(1, mocker.ANY, mocker.ANY)
+
+
+@pytest.mark.parametrize(
+    "args,calls,returncode",
+    (
+        pytest.param(("--json", "show", "nodes"), 3, 0, id="read-only command"),
+        pytest.param(("update", "nodename=compute-0", "state=idle"), 1, 1, id="update command"),
+    ),
+)
+def test_scontrol_ambiguous_error(
+    mocker: MockerFixture, mock_run, args, calls, returncode
+) -> None:
+    """Test that only read-only commands are retried if the controller's response is lost."""
+    mocker.patch("time.sleep")
+    mock_run.side_effect = [
+        CalledProcessError(
+            cmd=["scontrol", *args],
+            returncode=1,
+            stderr="slurm_update error: Socket timed out on send/recv operation",
+        ),
+        subprocess.TimeoutExpired(cmd=["scontrol", *args], timeout=30),
+        subprocess.CompletedProcess(args=[], returncode=0, stdout=""),
+    ]
+
+    assert ScontrolRunner()(*args, check=False)[1] == returncode
+    assert mock_run.call_count == calls
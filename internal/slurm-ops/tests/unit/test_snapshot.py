@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the `SnapshotStore` class."""
+
+from pathlib import Path
+
+import pytest
+from constants import FAKE_GROUP, FAKE_USER
+from pyfakefs.fake_filesystem import FakeFilesystem
+from slurm_ops.core import SlurmConfigManager, SlurmOpsError, SnapshotStore
+from slurmutils import SlurmConfigEditor
+
+SLURM_CONF_PATH = Path("/etc/slurm/slurm.conf")
+STORE_PATH = Path("/var/lib/slurm/snapshots")
+
+
+@pytest.fixture(scope="function")
+def mock_store(fs: FakeFilesystem) -> SnapshotStore:
+    fs.create_file(SLURM_CONF_PATH, contents="clustername=charmed-hpc\n")
+    fs.create_file(SLURM_CONF_PATH.with_suffix(".conf.overrides"), contents="maxnodecount=10\n")
+    return SnapshotStore(STORE_PATH, retention=2)
+
+
+class TestSnapshotStore:
+    """Test the `SnapshotStore` class."""
+
+    def test_save(self, mock_store: SnapshotStore) -> None:
+        """Test that `save` deduplicates file content across snapshots."""
+        files = [SLURM_CONF_PATH, SLURM_CONF_PATH.with_suffix(".conf.overrides")]
+        first = mock_store.save(files, label="slurm.conf")
+        second = mock_store.save(files, label="slurm.conf")
+
+        assert first.files == second.files
+        assert len(list((STORE_PATH / "objects").iterdir())) == 2
+        assert mock_store.snapshots("slurm.conf") == [first, second]
+        assert mock_store.latest("slurm.conf") == second
+        assert mock_store.latest("acct_gather.conf") is None
+        assert mock_store.read(first.files[str(SLURM_CONF_PATH)]) == b"clustername=charmed-hpc\n"
+
+    def test_save_retention(self, mock_store: SnapshotStore) -> None:
+        """Test that `save` prunes old snapshots and unreferenced content."""
+        for count in range(3):
+            SLURM_CONF_PATH.write_text(f"maxnodecount={count}\n")
+            mock_store.save([SLURM_CONF_PATH], label="slurm.conf")
+
+        snapshots = mock_store.snapshots()
+        assert len(snapshots) == 2
+        assert {mock_store.read(s.files[str(SLURM_CONF_PATH)]) for s in snapshots} == {
+            b"maxnodecount=1\n",
+            b"maxnodecount=2\n",
+        }
+        assert len(list((STORE_PATH / "objects").iterdir())) == 2
+
+    def test_get(self, mock_store: SnapshotStore) -> None:
+        """Test that `get` fails if the snapshot does not exist."""
+        snapshot = mock_store.save([SLURM_CONF_PATH], label="slurm.conf")
+        assert mock_store.get(snapshot.id) == snapshot
+
+        with pytest.raises(SlurmOpsError):
+            mock_store.get("missing")
+
+    def test_manager_restore(self, mock_store: SnapshotStore) -> None:
+        """Test restoring a configuration set from the store with `SlurmConfigManager`."""
+        manager = SlurmConfigManager(
+            SlurmConfigEditor,
+            file=SLURM_CONF_PATH,
+            mode=0o644,
+            user=FAKE_USER,
+            group=FAKE_GROUP,
+            store=mock_store,
+        )
+        manager.save()
+        snapshot = mock_store.latest("slurm.conf")
+        assert snapshot is not None
+
+        SLURM_CONF_PATH.write_text("clustername=broken\n")
+        manager.includes["slurm.conf.overrides"].delete()
+        manager.includes["slurm.conf.profiling"].create()
+        manager.save()
+        assert not list(SLURM_CONF_PATH.parent.glob("*.snapshot"))
+
+        manager.restore(snapshot.id)
+        assert SLURM_CONF_PATH.read_text() == "clustername=charmed-hpc\n"
+        assert manager.includes["slurm.conf.overrides"].load().max_node_count == 10
+        # Include files created after the snapshot was taken are removed.
+        assert not manager.includes["slurm.conf.profiling"].exists()
+
+        # The most recent snapshot is restored by default.
+        manager.restore()
+        assert SLURM_CONF_PATH.read_text() == "clustername=broken\n"
+        assert not manager.includes["slurm.conf.overrides"].exists()
+        assert manager.includes["slurm.conf.profiling"].exists()
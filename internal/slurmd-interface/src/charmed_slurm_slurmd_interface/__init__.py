@@ -16,6 +16,7 @@
 __all__ = [
     "AUTH_KEY_LABEL",
     "ComputeData",
+    "NodeData",
     "SlurmdConnectedEvent",
     "SlurmdReadyEvent",
     "SlurmdDisconnectedEvent",
@@ -28,7 +29,7 @@ __all__ = [
     "partition_ready",
 ]
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import ops
 from charmed_hpc_libs.ops import ConditionEvaluation, leader
@@ -42,7 +43,7 @@ from charmed_slurm_slurmctld_interface import (
     controller_ready,
     encoder,
 )
-from slurmutils import Partition
+from slurmutils import Gres, Partition
 
 _REQUIRED_APP_DATA = {
     "auth_secret_id": lambda value: value != '""',
@@ -69,6 +70,33 @@ class ComputeData:
             object.__setattr__(self, "partition", Partition(self.partition))
 
 
+@dataclass(frozen=True)
+class NodeData:
+    """Data provided by each Slurm compute service, `slurmd`, unit.
+
+    Attributes:
+        gres:
+            List of node-specific `gres.conf` entries for the unit's compute node, e.g.
+            GPUs with their core affinity and NVLink connections.
+        node_name: Name of the unit's compute node.
+        switch:
+            Name of the InfiniBand leaf switch that the unit's compute node is connected to,
+            or `None` if the compute node is not connected to an InfiniBand fabric.
+    """
+
+    gres: list[Gres] = field(default_factory=list)
+    node_name: str = ""
+    switch: str | None = None
+
+    def __post_init__(self) -> None:  # noqa D105
+        # `gres` entries are deserialized from integration data as built-in dictionary objects.
+        object.__setattr__(
+            self,
+            "gres",
+            [Gres(entry) if isinstance(entry, dict) else entry for entry in self.gres],
+        )
+
+
 def partition_ready(charm: ops.CharmBase) -> ConditionEvaluation:
     """Check if compute - `slurmd` - data is available.
 
@@ -144,6 +172,17 @@ class SlurmdProvider(SlurmctldRequirer):
         """
         self._save_integration_data(data, self.app, integration_id, encoder=encoder)
 
+    def set_node_data(self, data: NodeData, /, integration_id: int | None = None) -> None:
+        """Set node data in the `slurmd` unit databag.
+
+        Args:
+            data: Node data to set on an integrations' unit databag.
+            integration_id:
+                ID of integration to update. If no integration ID is passed,
+                all integrations will be updated.
+        """
+        self._save_integration_data(data, self.unit, integration_id, encoder=encoder)
+
 
 class SlurmdRequirer(SlurmctldProvider):
     """Integration interface implementation for `slurmd` service requirers.
@@ -195,3 +234,11 @@ class SlurmdRequirer(SlurmctldProvider):
             integration_id: ID of integration to pull compute data from.
         """
         return self._load_integration_data(ComputeData, integration_id=integration_id).pop()
+
+    def get_node_data(self, integration_id: int | None = None) -> list[NodeData]:
+        """Get node data from each unit databag of a `slurmd` application.
+
+        Args:
+            integration_id: ID of integration to pull node data from.
+        """
+        return self._load_integration_data(NodeData, integration_id=integration_id, target="unit")
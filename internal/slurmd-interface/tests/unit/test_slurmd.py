@@ -24,6 +24,7 @@ from charmed_slurm_slurmctld_interface import ControllerData
 from charmed_slurm_slurmd_interface import (
     AUTH_KEY_LABEL,
     ComputeData,
+    NodeData,
     SlurmctldConnectedEvent,
     SlurmctldReadyEvent,
     SlurmdDisconnectedEvent,
@@ -34,13 +35,21 @@ from charmed_slurm_slurmd_interface import (
     partition_ready,
 )
 from ops import testing
-from slurmutils import Partition
+from slurmutils import Gres, Partition
 
 SLURMD_INTEGRATION_NAME = "slurmd"
 EXAMPLE_AUTH_KEY = "xyz123=="
 EXAMPLE_AUTH_KEY_ID = "12345678-90ab-cdef-1234-567890abcdef"
 EXAMPLE_CONTROLLERS = ["127.0.0.1", "127.0.1.1"]
 EXAMPLE_PARTITION_CONFIG = Partition(partitionname="polaris")
+EXAMPLE_GRES = Gres(
+    name="gpu",
+    type="a100",
+    file="/dev/nvidia0",
+    cores=["0-7"],
+    links=[-1, 4],
+    nodename="compute-0",
+)
 
 
 class MockSlurmdProviderCharm(ops.CharmBase):
@@ -283,6 +292,30 @@ class TestSlurmdInterface:
             assert len(state.deferred) == 1
             assert state.unit_status == ops.WaitingStatus("Waiting for controller data")
 
+    def test_provider_set_node_data(self, provider_ctx, leader) -> None:
+        """Test that every `slurmd` provider unit can set node data."""
+        slurmd_integration_id = 22
+        slurmd_integration = testing.Relation(
+            endpoint=SLURMD_INTEGRATION_NAME,
+            interface="slurmd",
+            id=slurmd_integration_id,
+            remote_app_name="slurmd-requirer",
+        )
+
+        with provider_ctx(
+            provider_ctx.on.update_status(),
+            testing.State(leader=leader, relations={slurmd_integration}),
+        ) as manager:
+            manager.charm.slurmctld.set_node_data(
+                NodeData(gres=[EXAMPLE_GRES], node_name="juju-c9fc6f-2", switch="ib-1")
+            )
+            state = manager.run()
+
+        integration = state.get_relation(slurmd_integration_id)
+        assert json.loads(integration.local_unit_data["gres"]) == [EXAMPLE_GRES.dict()]
+        assert json.loads(integration.local_unit_data["node_name"]) == "juju-c9fc6f-2"
+        assert json.loads(integration.local_unit_data["switch"]) == "ib-1"
+
     # Test requires-side of `slurmd` interface.
 
     @pytest.mark.parametrize(
@@ -374,3 +407,36 @@ class TestSlurmdInterface:
             assert not any(
                 isinstance(event, SlurmdDisconnectedEvent) for event in requirer_ctx.emitted_events
             )
+
+    def test_requirer_get_node_data(self, requirer_ctx, leader) -> None:
+        """Test that the `slurmd` requirer loads node data from each `slurmd` unit."""
+        slurmd_integration_id = 22
+        slurmd_integration = testing.Relation(
+            endpoint=SLURMD_INTEGRATION_NAME,
+            interface="slurmd",
+            id=slurmd_integration_id,
+            remote_app_name="slurmd-provider",
+            remote_units_data={
+                0: {
+                    "gres": json.dumps([EXAMPLE_GRES.dict()]),
+                    "node_name": json.dumps("juju-c9fc6f-2"),
+                    "switch": json.dumps("ib-1"),
+                },
+                1: {},
+            },
+        )
+
+        with requirer_ctx(
+            requirer_ctx.on.update_status(),
+            testing.State(leader=leader, relations={slurmd_integration}),
+        ) as manager:
+            data = manager.charm.slurmd.get_node_data(integration_id=slurmd_integration_id)
+
+        # Units without node data are loaded with no `gres.conf` entries.
+        gres = sorted(([entry.dict() for entry in node.gres] for node in data), key=len)
+        assert gres == [[], [EXAMPLE_GRES.dict()]]
+        # Units not connected to an InfiniBand fabric are loaded with no switch.
+        assert sorted((node.node_name, node.switch or "") for node in data) == [
+            ("", ""),
+            ("juju-c9fc6f-2", "ib-1"),
+        ]
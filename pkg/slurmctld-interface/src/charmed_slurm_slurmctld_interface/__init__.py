@@ -27,10 +27,13 @@ __all__ = [
     "encoder",
 ]
 
+import base64
+import hashlib
 import json
 import logging
-from collections.abc import Callable, Iterable
-from dataclasses import dataclass, field
+import zlib
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field, replace
 from typing import Any
 
 import ops
@@ -55,6 +58,25 @@ class _SlurmJSONEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+def _dumps_slurmconfig(slurmconfig: Mapping[str, Any]) -> str:
+    """Serialize Slurm configuration to canonical JSON so that equal configurations hash equally."""
+    return json.dumps(slurmconfig, cls=_SlurmJSONEncoder, sort_keys=True, separators=(",", ":"))
+
+
+def _is_slurmconfig(value: Any) -> bool:
+    """Check if a value is a non-empty mapping of file names to `SlurmConfig` objects."""
+    return (
+        isinstance(value, Mapping)
+        and len(value) > 0
+        and all(isinstance(v, SlurmConfig) for v in value.values())
+    )
+
+
+def _compress_slurmconfig(slurmconfig: Mapping[str, Any]) -> str:
+    """Compress Slurm configuration with `zlib` and base64-encode it for integration data."""
+    return base64.b64encode(zlib.compress(_dumps_slurmconfig(slurmconfig).encode())).decode()
+
+
 def encoder(value: Any) -> str:
     """Encode Slurm integration data."""
     return json.dumps(value, cls=_SlurmJSONEncoder)
@@ -75,12 +97,16 @@ class ControllerData:
         jwt_key: String containing the Slurm JWT key material, often a PEM block.
         jwt_secret_id: ID of the Slurm JWT key Juju secret for this integration instance.
         slurmconfig: Mapping containing the `slurm.conf` and other included configuration files.
+        slurmconfig_hash: SHA-256 digest of `slurmconfig`. Computed automatically if not set.
+        slurmconfig_z: `slurmconfig` compressed with `zlib` and base64-encoded.
 
     Notes:
         - `sackd` requires:         `auth_secret_id`, `controllers`
         - `slurmd` requires:        `auth_secret_id`, `controllers`
         - `slurmdbd` requires:      `auth_secret_id`, `jwt_secret_id`
-        - `slurmrestd` requires:    `auth_secret_id`, `slurmconfig`
+        - `slurmrestd` requires:    `auth_secret_id`, `slurmconfig` or `slurmconfig_z`
+        - `slurmconfig` is still published uncompressed alongside `slurmconfig_z` so that
+          requirers that only read `slurmconfig` keep working until they are upgraded.
     """
 
     auth_key: str = ""
@@ -90,8 +116,18 @@ class ControllerData:
     jwt_key: str = ""
     jwt_secret_id: str = ""
     slurmconfig: dict[str, SlurmConfig] = field(default_factory=dict)
+    slurmconfig_hash: str = ""
+    slurmconfig_z: str = ""
 
     def __post_init__(self) -> None:  # noqa D105
+        # Fall back to the compressed `slurmconfig_z` if `slurmconfig` is not published.
+        if self.slurmconfig_z and not self.slurmconfig:
+            object.__setattr__(
+                self,
+                "slurmconfig",
+                json.loads(zlib.decompress(base64.b64decode(self.slurmconfig_z))),
+            )
+
         # If the value of a key in `slurmconfig` is determined to be a built-in dictionary
         # object when deserializing integration data, the dictionary value will be automatically
         # parsed into a `SlurmConfig` object.
@@ -99,6 +135,10 @@ class ControllerData:
             if isinstance(v, dict):
                 self.slurmconfig[k] = SlurmConfig(v)
 
+        if self.slurmconfig and not self.slurmconfig_hash:
+            digest = hashlib.sha256(_dumps_slurmconfig(self.slurmconfig).encode()).hexdigest()
+            object.__setattr__(self, "slurmconfig_hash", digest)
+
 
 def controller_ready(charm: ops.CharmBase) -> ConditionEvaluation:
     """Check if controller - `slurmctld` - data is available.
@@ -182,9 +222,15 @@ class SlurmctldProvider(Interface):
                 (Optional) ID of integration to update. If no integration id is passed,
                 all integrations will be updated. This argument must be set for a
                 integration to be granted access to the `auth_key` and `jwt_key` secrets.
+
+        Notes:
+            - `slurmconfig` and `slurmconfig_z` are not re-encoded if an integration has
+              already been provided Slurm configuration with the same `slurmconfig_hash`.
         """
+        integrations = self.integrations
         if integration_id is not None:
             integration = self.get_integration(integration_id)
+            integrations = [integration]
 
             if data.auth_secret_id:
                 secret = self.model.get_secret(id=data.auth_secret_id)
@@ -194,7 +240,37 @@ class SlurmctldProvider(Interface):
                 secret = self.model.get_secret(id=data.jwt_secret_id)
                 secret.grant(integration)
 
-        self._save_integration_data(data, self.app, integration_id, encoder=encoder)
+        compressed = None
+        for integration in integrations:
+            published = integration.data[self.app]
+            if (
+                data.slurmconfig_hash
+                and "slurmconfig" in published
+                and "slurmconfig_z" in published
+                and published.get("slurmconfig_hash") == encoder(data.slurmconfig_hash)
+            ):
+                _logger.debug(
+                    "`slurmconfig` for integration %s has not changed. skipping update",
+                    integration.id,
+                )
+                unchanged = published["slurmconfig"]
+                integration.save(
+                    replace(data, slurmconfig_z=json.loads(published["slurmconfig_z"])),
+                    self.app,
+                    encoder=lambda v: unchanged if _is_slurmconfig(v) else encoder(v),
+                )
+                continue
+
+            if compressed is None:
+                compressed = data
+                if data.slurmconfig and not data.slurmconfig_z:
+                    compressed = replace(
+                        data, slurmconfig_z=_compress_slurmconfig(data.slurmconfig)
+                    )
+
+            # TODO: Stop publishing the uncompressed `slurmconfig` once all requirers read
+            #  `slurmconfig_z`.
+            integration.save(compressed, self.app, encoder=encoder)
 
 
 class SlurmctldRequirer(Interface):
@@ -14,7 +14,9 @@
 
 """Unit tests for the `slurmctld` integration interface implementation."""
 
+import base64
 import json
+import zlib
 from collections import defaultdict
 
 import ops
@@ -30,6 +32,7 @@ from charmed_slurm_slurmctld_interface import (
     SlurmctldReadyEvent,
     SlurmctldRequirer,
     controller_ready,
+    encoder,
 )
 from ops import testing
 from slurmutils import SlurmConfig
@@ -170,7 +173,17 @@ class TestSlurmctldInterface:
 
             # Verify controllers and slurmconfig are set correctly.
             assert json.loads(integration.local_app_data["controllers"]) == EXAMPLE_CONTROLLERS
-            assert "slurmconfig" in integration.local_app_data
+            # `slurmconfig` is published both uncompressed and compressed.
+            published = ControllerData(
+                slurmconfig=json.loads(integration.local_app_data["slurmconfig"])
+            )
+            assert published.slurmconfig_hash == json.loads(
+                integration.local_app_data["slurmconfig_hash"]
+            )
+            compressed = ControllerData(
+                slurmconfig_z=json.loads(integration.local_app_data["slurmconfig_z"])
+            )
+            assert compressed.slurmconfig_hash == published.slurmconfig_hash
         else:
             # Non-leader units must not write to the application databag.
             assert integration.local_app_data == {}
@@ -254,6 +267,39 @@ class TestSlurmctldInterface:
             else:
                 assert integration.local_app_data["jwt_secret_id"] == '""'
 
+    def test_provider_set_controller_data_unchanged_slurmconfig(
+        self, provider_ctx, leader
+    ) -> None:
+        """Test that `set_controller_data` skips re-encoding an unchanged `slurmconfig`."""
+        published = {
+            "slurmconfig": '"published"',
+            "slurmconfig_z": '"compressed"',
+            "slurmconfig_hash": encoder(
+                ControllerData(slurmconfig=EXAMPLE_SLURM_CONFIG).slurmconfig_hash
+            ),
+        }
+        slurmctld_integration_id = 1
+        slurmctld_integration = testing.Relation(
+            endpoint=SLURMCTLD_INTEGRATION_NAME,
+            interface="slurmctld",
+            id=slurmctld_integration_id,
+            remote_app_name="slurmctld-requirer",
+            local_app_data=published,
+        )
+
+        state = provider_ctx.run(
+            provider_ctx.on.relation_created(slurmctld_integration),
+            testing.State(leader=leader, relations={slurmctld_integration}),
+        )
+
+        integration = state.get_relation(slurmctld_integration_id)
+        # The published `slurmconfig` is left untouched as its hash has not changed.
+        assert integration.local_app_data["slurmconfig"] == published["slurmconfig"]
+        assert integration.local_app_data["slurmconfig_z"] == published["slurmconfig_z"]
+        assert integration.local_app_data["slurmconfig_hash"] == published["slurmconfig_hash"]
+        if leader:
+            assert json.loads(integration.local_app_data["controllers"]) == EXAMPLE_CONTROLLERS
+
     # Test requirer-side of the `slurmctld` interface.
 
     def test_requirer_on_slurmctld_connected_event(self, requirer_ctx, leader) -> None:
@@ -427,3 +473,23 @@ class TestSlurmctldInterface:
         assert data.controllers == EXAMPLE_CONTROLLERS
         assert "slurm.conf" in data.slurmconfig
         assert data.slurmconfig["slurm.conf"].dict() == EXAMPLE_SLURM_CONFIG["slurm.conf"].dict()
+
+
+def test_controller_data_slurmconfig_encoding() -> None:
+    """Test that `slurmconfig` is hashed and restored from its compressed form."""
+    data = ControllerData(slurmconfig=EXAMPLE_SLURM_CONFIG)
+    assert len(data.slurmconfig_hash) == 64
+
+    # Requirers fall back to `slurmconfig_z` if `slurmconfig` is not published.
+    compressed = base64.b64encode(zlib.compress(encoder(data.slurmconfig).encode())).decode()
+    decoded = ControllerData(slurmconfig_z=compressed, slurmconfig_hash=data.slurmconfig_hash)
+    assert decoded.slurmconfig["slurm.conf"].dict() == EXAMPLE_SLURM_CONFIG["slurm.conf"].dict()
+    assert decoded.slurmconfig_hash == data.slurmconfig_hash
+
+    # Equal configurations produce equal hashes.
+    assert (
+        ControllerData(slurmconfig=decoded.slurmconfig).slurmconfig_hash == data.slurmconfig_hash
+    )
+    # `slurmconfig` is still encoded as a JSON object for requirers that do not read
+    # `slurmconfig_z`.
+    assert isinstance(json.loads(encoder(data.slurmconfig)), dict)